@@ -0,0 +1,139 @@
+"""
+Measures AnomalyDetector throughput when replaying a shipyard dataset, and its detection of injected anomalies.
+
+The default stream is synthetic: equipment performing agent actions that follow a fixed
+lift -> move -> place -> inspect cycle, with attack-flagged rows, bursts (one equipment emitting
+many events in one time unit) and out-of-order actions injected at known rows. A CSV with
+timestamp/equipment/action columns can be replayed instead with --dataset. The shipped datasets
+have none of those columns (their rows replay as one event per work order, timed by row position),
+so replaying them raises no alerts and measures the per-event cost only.
+
+Two throughputs are reported on one core, each against TARGET_EVENTS_PER_SECOND: the detector
+alone (events already converted) and the whole replay path (replay_shipyard_events ->
+AnomalyDetector.observe), which includes turning dataset rows into events.
+
+Run from the repository root:
+    python -m benchmarks.bench_anomaly_detector --rows 50000
+    python -m benchmarks.bench_anomaly_detector --dataset Digital_Shipyard_50k_With_Attacks.csv
+"""
+import argparse
+import logging
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.agents.anomaly_detector import AnomalyDetector
+from src.simulation.event_stream import replay_shipyard_events
+from src.utils.data_loader import load_dataset
+
+ACTIONS = np.array(['lift', 'move', 'place', 'inspect'], dtype=object)
+TARGET_EVENTS_PER_SECOND = 100_000
+
+
+def make_stream(rows: int, equipment: int = 50, rows_per_second: float = 20.0, bursts: int = 5,
+                rare_actions: int = 20, attack_rate: float = 0.01, seed: int = 0) -> tuple:
+    """
+    Builds a time-stamped shipyard event table; returns (frame, burst (equipment, second) pairs, rare rows).
+    """
+    rng = np.random.default_rng(seed)
+    seconds = np.sort(rng.random(rows) * rows / rows_per_second)
+    equipment_ids = rng.integers(0, equipment, rows)
+    # Each equipment cycles through ACTIONS in order
+    step = pd.Series(np.ones(rows, dtype=np.int64)).groupby(equipment_ids).cumsum().to_numpy()
+    actions = ACTIONS[step % len(ACTIONS)]
+
+    # Out-of-order actions late in the stream (after the transition counts have support)
+    rare_rows = np.sort(rng.choice(np.arange(rows // 2, rows), rare_actions, replace=False))
+    actions[rare_rows] = ACTIONS[(step[rare_rows] + 2) % len(ACTIONS)]
+    frame = pd.DataFrame({
+        'timestamp': pd.Timestamp('2024-01-01') + pd.to_timedelta(seconds, unit='s'),
+        'equipment_id': np.char.add('crane', equipment_ids.astype(str)).astype(object),
+        'agent_action': actions,
+        'attack_flag': rng.random(rows) < attack_rate,
+    })
+
+    # Bursts: 40 extra events of one equipment within one second
+    burst_pairs = []
+    extra = []
+    for second in np.sort(rng.choice(np.arange(int(seconds[-1] * 0.5), int(seconds[-1])), bursts, replace=False)):
+        crane = f"crane{rng.integers(equipment)}"
+        burst_pairs.append((crane, int(second)))
+        extra.append(pd.DataFrame({
+            'timestamp': pd.Timestamp('2024-01-01') + pd.to_timedelta(second + np.sort(rng.random(40)), unit='s'),
+            'equipment_id': crane, 'agent_action': 'move', 'attack_flag': False}))
+    frame = pd.concat([frame] + extra, ignore_index=True)
+    frame['attack_type'] = np.where(frame['attack_flag'], 'DoS', None)
+    order = np.argsort(frame['timestamp'].to_numpy(), kind='stable')
+    positions = np.empty(len(frame), dtype=np.int64)
+    positions[order] = np.arange(len(frame))
+    return frame.iloc[order].reset_index(drop=True), burst_pairs, np.sort(positions[rare_rows])
+
+
+def replay_events(frame: pd.DataFrame) -> list:
+    """
+    Replays a frame as fast as possible and converts every row to an engine event.
+    """
+    return list(replay_shipyard_events(frame)(threading.Event()))
+
+
+def observe_all(events: list, batch_size: int) -> tuple:
+    """
+    Feeds events to a fresh detector in batches; returns (detector, alerts, seconds).
+    """
+    detector = AnomalyDetector()
+    alerts = []
+    start = time.perf_counter()
+    for i in range(0, len(events), batch_size):
+        alerts += detector.observe(events[i:i + batch_size])
+    return detector, alerts, time.perf_counter() - start
+
+
+def target_verdict(rate: float) -> str:
+    """
+    Describes a throughput relative to TARGET_EVENTS_PER_SECOND.
+    """
+    return f"{'meets' if rate >= TARGET_EVENTS_PER_SECOND else 'below'} {TARGET_EVENTS_PER_SECOND:,}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--dataset', help="Replay this CSV (from datasets/) instead of a synthetic stream.")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)
+
+    bursts, rare_rows = [], []
+    if args.dataset:
+        frame = load_dataset(args.dataset, use_cache=False)
+    else:
+        frame, bursts, rare_rows = make_stream(args.rows)
+
+    start = time.perf_counter()
+    events = replay_events(frame)
+    convert_seconds = time.perf_counter() - start
+    detector, alerts, observe_seconds = observe_all(events, args.batch_size)
+
+    detector_rate = len(events) / observe_seconds
+    replay_rate = len(events) / (convert_seconds + observe_seconds)
+    print(f"events:               {len(events)}")
+    print(f"detector only:        {detector_rate:>12,.0f} events/s ({target_verdict(detector_rate)})")
+    print(f"replay + detector:    {replay_rate:>12,.0f} events/s ({target_verdict(replay_rate)})")
+    print(f"alerts:               {dict(detector.alert_counts)}")
+    print(f"attack-flagged:       {dict(detector.flagged_attacks)}")
+    if bursts:
+        rate_alerts = {(alert['key'], int(alert['time'] // detector.bucket_size)) for alert in alerts
+                       if alert['kind'] == 'rate' and alert['dimension'] == 'equipment'}
+        found = sum(pair in rate_alerts for pair in bursts)
+        print(f"bursts detected:      {found}/{len(bursts)} ({len(rate_alerts) - found} other equipment rate alerts)")
+        rare_times = {events[row]['time'] for row in rare_rows}
+        sequence_times = {alert['time'] for alert in alerts if alert['kind'] == 'sequence'}
+        found = len(rare_times & sequence_times)
+        print(f"rare actions flagged: {found}/{len(rare_rows)} ({len(sequence_times - rare_times)} other sequence "
+              f"alerts, e.g. the action after a rare one and repeated actions in bursts)")
+
+
+if __name__ == "__main__":
+    main()
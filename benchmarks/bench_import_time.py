@@ -0,0 +1,99 @@
+"""
+Checks the import time of the simulation entry points against a budget.
+
+Each module is imported in a fresh interpreter with `python -X importtime`. Two numbers are
+reported per module: the total (including numpy/pandas) and our own share, the summed self time of
+the src.* modules it pulls in. The own share must stay within OWN_BUDGETS_MS and no module in
+LAZY_MODULES may be imported eagerly (agents load through the registry in src.agents). The total
+is only checked when --total-budget is given, since it is dominated by third-party packages and
+the machine. Exits with 1 on any violation, so it can gate CI.
+
+Run from the repository root:
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --total-budget 1500
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Repository root: the fresh interpreters import src.* from here
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module -> budget in milliseconds for the self time of the src.* modules it imports
+OWN_BUDGETS_MS = {
+    'src.simulation.simulation_engine': 30,
+    'src.simulation.batch_runner': 40,
+    'src.agents': 5,
+}
+
+# Modules that importing the entry points must not load; they are imported when first used
+LAZY_MODULES = [
+    'src.agents.work_order_coordinator',
+    'src.agents.resource_allocator',
+    'src.agents.anomaly_detector',
+    'src.utils.assignment',
+    'src.utils.streaming_stats',
+    'src.simulation.sharding',
+    'streamlit',
+]
+
+
+def import_profile(module: str) -> dict:
+    """
+    Imports module in a fresh interpreter; returns imported module -> (self µs, cumulative µs).
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            capture_output=True, text=True, check=True, cwd=ROOT)
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+
+def measure(module: str, repeat: int) -> dict:
+    """
+    Returns the best total and own import time (ms) of repeat runs and the lazy modules it loaded.
+    """
+    best = None
+    for _ in range(repeat):
+        profile = import_profile(module)
+        run = {
+            'total_ms': profile[module][1] / 1000,
+            'own_ms': sum(self_us for name, (self_us, _) in profile.items()
+                          if name == 'src' or name.startswith('src.')) / 1000,
+            'eager': [name for name in LAZY_MODULES if name in profile],
+        }
+        if best is None or run['own_ms'] < best['own_ms']:
+            best = run
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh interpreters per module (best run counts).")
+    parser.add_argument('--total-budget', type=float, help="Also fail if a total import exceeds this many ms.")
+    args = parser.parse_args(argv)
+
+    failures = []
+    print(f"{'module':<36} {'total (ms)':>11} {'own (ms)':>9} {'budget':>7}")
+    for module, budget in OWN_BUDGETS_MS.items():
+        result = measure(module, args.repeat)
+        print(f"{module:<36} {result['total_ms']:>11.1f} {result['own_ms']:>9.1f} {budget:>7}")
+        if result['own_ms'] > budget:
+            failures.append(f"{module}: own import time {result['own_ms']:.1f} ms exceeds {budget} ms")
+        if args.total_budget is not None and result['total_ms'] > args.total_budget:
+            failures.append(f"{module}: total import time {result['total_ms']:.1f} ms exceeds {args.total_budget} ms")
+        for name in result['eager']:
+            failures.append(f"{module}: imports {name} eagerly")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
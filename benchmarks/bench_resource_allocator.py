@@ -0,0 +1,150 @@
+"""
+Benchmarks the greedy and optimal (min-cost) ResourceAllocator assignment modes.
+
+Two measurements per size:
+  * one allocation tick with every work order Pending (solve time, assignment cost), and
+  * a small dispatch simulation with cranes only: an assigned crane drives to its work order,
+    works on it for the order's duration and stays at that location afterwards. Reports the
+    makespan (ticks until every order is Completed), the priority-weighted mean completion tick
+    and the allocator's throughput (assignments per second spent allocating).
+
+Run from the repository root:
+    python -m benchmarks.bench_resource_allocator --orders 1000 10000 --resources 200 2000
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.agents.resource_allocator import ResourceAllocator
+from src.utils.resource_pool import ResourcePool
+from src.utils.state_store import TaskStatus
+
+YARD_SIZE = 1000.0  # Side of the square yard, in distance units
+SPEED = 100.0  # Distance a crane covers per tick
+
+
+def make_instance(orders: int, resources: int, zones: int, seed: int = 0):
+    """
+    Builds work orders with priority, due time, location and zone, and located, zoned cranes.
+    """
+    rng = np.random.default_rng(seed)
+    order_xy = rng.random((orders, 2)) * YARD_SIZE
+    shipyard_data = pd.DataFrame({
+        'work_order_id': [f"WO-{i:07d}" for i in range(orders)],
+        'task_status': 'Pending',
+        'priority': rng.integers(1, 6, orders),
+        'due_time': rng.integers(10, 200, orders),
+        'location_x': order_xy[:, 0],
+        'location_y': order_xy[:, 1],
+        'zone': _zone(order_xy, zones),
+        'duration': rng.integers(1, 6, orders),
+    })
+    ids = [f"crane{i}" for i in range(1, resources + 1)]
+    resource_xy = rng.random((resources, 2)) * YARD_SIZE
+    resource_data = pd.DataFrame({'location_x': resource_xy[:, 0], 'location_y': resource_xy[:, 1],
+                                  'zone': _zone(resource_xy, zones)}, index=pd.Index(ids, dtype=object))
+    return shipyard_data, ResourcePool({'crane': ids, 'agv': [], 'forklift': []}), resource_data
+
+
+def _zone(xy: np.ndarray, zones: int) -> np.ndarray:
+    """
+    Splits the yard into vertical strips.
+    """
+    return np.minimum((xy[:, 0] / YARD_SIZE * zones).astype(int), zones - 1)
+
+
+def assignment_cost(allocator: ResourceAllocator) -> float:
+    """
+    Sums the optimal mode's cost over the work orders that currently hold a crane.
+    """
+    data = allocator.shipyard_data
+    rows = np.flatnonzero(allocator.store.resource_codes['crane_id'] >= 0)
+    cranes = allocator.resources.loc[allocator.store.resource_ids('crane_id', rows)]
+    weights = allocator.cost_weights
+    distance = np.hypot(cranes['location_x'].to_numpy() - data['location_x'].to_numpy()[rows],
+                        cranes['location_y'].to_numpy() - data['location_y'].to_numpy()[rows])
+    return float((weights['distance'] * distance - weights['priority'] * data['priority'].to_numpy()[rows] +
+                  weights['due_time'] * data['due_time'].to_numpy()[rows]).sum())
+
+
+def time_tick(orders: int, resources: int, zones: int, mode: str) -> tuple:
+    """
+    Runs one allocation tick; returns (seconds, total assignment cost).
+    """
+    shipyard_data, pool, resource_data = make_instance(orders, resources, zones)
+    allocator = ResourceAllocator(shipyard_data, pool, assignment=mode, resources=resource_data)
+    start = time.perf_counter()
+    allocator.allocate_resources()
+    return time.perf_counter() - start, assignment_cost(allocator)
+
+
+def simulate(orders: int, resources: int, zones: int, mode: str, max_ticks: int = 10_000) -> dict:
+    """
+    Dispatches every work order with the given mode; returns makespan, weighted completion and throughput.
+    """
+    shipyard_data, pool, resource_data = make_instance(orders, resources, zones)
+    allocator = ResourceAllocator(shipyard_data, pool, assignment=mode, resources=resource_data.copy())
+    store = allocator.store
+    data = allocator.shipyard_data
+    order_xy = data[['location_x', 'location_y']].to_numpy()
+    duration = data['duration'].to_numpy()
+    finish = np.full(orders, np.inf)
+    completed_at = np.zeros(orders)
+    allocate_seconds = 0.0
+    tick = 0
+    while (store.status != TaskStatus.COMPLETED).any() and tick < max_ticks:
+        done = np.flatnonzero(finish <= tick)
+        if len(done):
+            store.set_status(done, TaskStatus.COMPLETED)
+            completed_at[done] = tick
+            finish[done] = np.inf
+        start = time.perf_counter()
+        allocator.allocate_resources()
+        allocate_seconds += time.perf_counter() - start
+
+        started = np.flatnonzero((store.status == TaskStatus.PENDING) & (store.resource_codes['crane_id'] >= 0))
+        if len(started):
+            cranes = store.resource_ids('crane_id', started)
+            crane_xy = allocator.resources.loc[cranes, ['location_x', 'location_y']].to_numpy()
+            travel = np.ceil(np.hypot(*(crane_xy - order_xy[started]).T) / SPEED)
+            finish[started] = tick + travel + duration[started]
+            store.set_status(started, TaskStatus.IN_PROGRESS)
+            allocator.resources.loc[cranes, ['location_x', 'location_y']] = order_xy[started]
+        tick += 1
+
+    priority = data['priority'].to_numpy()
+    return {
+        'makespan': int(completed_at.max()),
+        'weighted_completion': float((priority * completed_at).sum() / priority.sum()),
+        'assignments_per_second': orders / allocate_seconds if allocate_seconds else float('inf'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, nargs='+', default=[1_000, 10_000])
+    parser.add_argument('--resources', type=int, nargs='+', default=[200, 2_000],
+                        help="Cranes for each --orders size.")
+    parser.add_argument('--zones', type=int, default=8)
+    parser.add_argument('--skip-simulation', action='store_true')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)
+
+    print(f"{'orders':>8} {'cranes':>7} {'mode':>8} {'tick (s)':>9} {'cost':>12} "
+          f"{'makespan':>9} {'w. completion':>14} {'assign/s':>10}")
+    for orders, resources in zip(args.orders, args.resources):
+        for mode in ('greedy', 'optimal'):
+            seconds, cost = time_tick(orders, resources, args.zones, mode)
+            line = f"{orders:>8} {resources:>7} {mode:>8} {seconds:>9.3f} {cost:>12.0f}"
+            if not args.skip_simulation:
+                result = simulate(orders, resources, args.zones, mode)
+                line += (f" {result['makespan']:>9} {result['weighted_completion']:>14.2f}"
+                         f" {result['assignments_per_second']:>10.0f}")
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Times run_scenarios across worker counts on one synthetic base dataset.
+
+Every worker count runs the same scenarios (resource levels and event bursts), so the script also
+checks that the KPIs do not depend on the number of workers. Speedup is relative to one worker,
+which runs the scenarios in this process; it can only grow with free cores and with scenarios
+that run long compared to starting the pool and converting the shared frames. Exits with 1 if
+the results differ.
+
+Run from the repository root:
+    python -m benchmarks.bench_scenario_sweep --rows 50000 --scenarios 8 --workers 1 2 4 8
+"""
+import argparse
+import logging
+import sys
+import time
+
+from src.simulation.scenario_sweep import run_scenarios
+from src.utils.resource_pool import RESOURCE_COLUMNS, ResourcePool
+from src.utils.synthetic_data import generate_datasets, generate_events
+
+
+def make_scenarios(count: int, shipyard_data, supply_chain_data, events_per_scenario: int) -> list:
+    """
+    Returns count scenarios with growing resource levels, each with its own burst of events.
+    """
+    scenarios = []
+    for i in range(count):
+        counts = {resource_type: max(len(shipyard_data) // 100, 1) * (i + 1) for resource_type in RESOURCE_COLUMNS}
+        ids = [resource_id for ids in ResourcePool.from_counts(counts).inventory().values() for resource_id in ids]
+        scenarios.append({
+            'name': f"scenario-{i}",
+            'resource_counts': counts,
+            'events': generate_events(events_per_scenario, shipyard_data, supply_chain_data, ids, time=1, seed=i),
+        })
+    return scenarios
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--scenarios', type=int, default=8)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--events', type=int, default=500, help="Events per scenario.")
+    parser.add_argument('--max-steps', type=int, default=20)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.CRITICAL)
+
+    shipyard_data, supply_chain_data = generate_datasets(args.rows)
+    scenarios = make_scenarios(args.scenarios, shipyard_data, supply_chain_data, args.events)
+
+    print(f"work orders: {args.rows}, scenarios: {args.scenarios}")
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+    baseline_seconds = baseline = None
+    status = 0
+    for workers in args.workers:
+        start = time.perf_counter()
+        results = run_scenarios(shipyard_data, supply_chain_data, scenarios, max_workers=workers,
+                                until_complete=True, max_steps=args.max_steps)
+        seconds = time.perf_counter() - start
+        results = results.drop(columns='wall_seconds')
+        if baseline is None:
+            baseline_seconds, baseline = seconds, results
+        elif not results.equals(baseline):
+            print(f"MISMATCH results with {workers} workers differ from {args.workers[0]}")
+            status = 1
+        print(f"{workers:>8} {seconds:>9.2f} {baseline_seconds / seconds:>7.2f}x")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
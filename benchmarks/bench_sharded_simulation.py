@@ -0,0 +1,132 @@
+"""
+Compares a ShardedSimulation against a single SimulationEngine on the same multi-yard dataset.
+
+Both run the same synthetic yards with a shared, scarce resource pool and the same bursts of
+supply chain delays, equipment failures and attack events. The script checks that every work
+order's status and resource IDs, the supply chain rows, the pool's leases, the stop reason and
+the trace counter totals are identical, and reports the wall time of each run (the sharded run
+only gets faster with as many free cores as shards). Exits with 1 if the results differ.
+
+Run from the repository root:
+    python -m benchmarks.bench_sharded_simulation --rows 200000 --yards 8 --shards 4
+"""
+import argparse
+import logging
+import sys
+import time
+
+import numpy as np
+
+from src.simulation.sharding import ShardedSimulation
+from src.simulation.simulation_engine import SimulationEngine
+from src.utils.resource_pool import RESOURCE_COLUMNS, ResourcePool
+from src.utils.synthetic_data import generate_datasets, generate_events
+
+
+def make_inputs(rows: int, yards: int, bursts: int, events_per_burst: int, seed: int = 0) -> tuple:
+    """
+    Returns (shipyard_data, supply_chain_data, resource counts, events) for one comparison.
+    """
+    shipyard_data, supply_chain_data = generate_datasets(rows, yards=yards, seed=seed)
+    counts = {resource_type: max(rows // 40, 1) for resource_type in RESOURCE_COLUMNS}
+    resource_ids = [resource_id for ids in ResourcePool.from_counts(counts).inventory().values() for resource_id in ids]
+    events = []
+    for burst in range(bursts):
+        events += generate_events(events_per_burst, shipyard_data, supply_chain_data, resource_ids,
+                                  time=1 + 2 * burst, seed=seed + burst)
+    return shipyard_data, supply_chain_data, counts, events
+
+
+def run(simulation, events: list, max_steps: int) -> tuple:
+    """
+    Queues the events and runs until complete; returns ((steps, reason), seconds).
+    """
+    simulation.add_events([dict(event) for event in events])
+    start = time.perf_counter()
+    result = simulation.run_until(until_complete=True, max_steps=max_steps)
+    return result, time.perf_counter() - start
+
+
+def differences(engine: SimulationEngine, sharded: ShardedSimulation, single_result: tuple,
+                sharded_result: tuple) -> list:
+    """
+    Lists what differs between the two finished runs (empty if they match).
+    """
+    found = []
+    if single_result != sharded_result:
+        found.append(f"stop: {single_result} vs {sharded_result}")
+    if engine.current_time != sharded.current_time:
+        found.append(f"time: {engine.current_time} vs {sharded.current_time}")
+    merged = sharded.get_shipyard_data()
+    for column in ['task_status'] + list(RESOURCE_COLUMNS.values()):
+        if column not in engine.shipyard_data.columns:
+            continue
+        expected = engine.shipyard_data[column].to_numpy(dtype=object)
+        actual = merged[column].to_numpy(dtype=object)
+        mismatched = int(np.count_nonzero(~((expected == actual) | (_isnull(expected) & _isnull(actual)))))
+        if mismatched:
+            found.append(f"{column}: {mismatched} work orders differ")
+    if not engine.supply_chain_data.equals(sharded.supply_chain_data):
+        found.append("supply chain rows differ")
+    single_leases = {holder: sorted(ids) for holder, ids in engine.resource_pool.get_state()['leases']}
+    sharded_leases = {holder: sorted(ids) for holder, ids in sharded.resource_pool.get_state()['leases']}
+    if single_leases != sharded_leases:
+        found.append(f"leases: {len(single_leases)} vs {len(sharded_leases)} holders")
+    if engine.resource_pool.utilization() != sharded.resource_pool.utilization():
+        found.append("pool utilization differs")
+    if +engine.trace.totals != +sharded.totals:
+        keys = set(engine.trace.totals) | set(sharded.totals)
+        found.append("trace totals differ: " + ", ".join(
+            f"{key}: {engine.trace.totals[key]} vs {sharded.totals[key]}"
+            for key in sorted(keys, key=str) if engine.trace.totals[key] != sharded.totals[key]))
+    return found
+
+
+def _isnull(values: np.ndarray) -> np.ndarray:
+    return np.array([value is None or value != value for value in values], dtype=bool)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--yards', type=int, default=4)
+    parser.add_argument('--shards', type=int, default=4, help="Upper bound on shards (worker processes).")
+    parser.add_argument('--bursts', type=int, default=5, help="Event bursts, one every other step.")
+    parser.add_argument('--events', type=int, default=500, help="Events per burst.")
+    parser.add_argument('--max-steps', type=int, default=100)
+    parser.add_argument('--in-process', action='store_true', help="Run the shards in this process.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.CRITICAL)
+
+    shipyard_data, supply_chain_data, counts, events = make_inputs(args.rows, args.yards, args.bursts, args.events)
+
+    engine = SimulationEngine(shipyard_data, supply_chain_data.copy(), resource_pool=ResourcePool.from_counts(counts))
+    single_result, single_seconds = run(engine, events, args.max_steps)
+
+    start = time.perf_counter()
+    sharded = ShardedSimulation(shipyard_data, supply_chain_data.copy(), partition='yard', max_shards=args.shards,
+                                processes=not args.in_process, resource_pool=ResourcePool.from_counts(counts))
+    setup_seconds = time.perf_counter() - start
+    try:
+        sharded_result, sharded_seconds = run(sharded, events, args.max_steps)
+        found = differences(engine, sharded, single_result, sharded_result)
+        shards = len(sharded.shards)
+    finally:
+        sharded.close()
+
+    steps = single_result[0]
+    print(f"work orders:      {args.rows} in {args.yards} yards, {shards} shards")
+    print(f"steps:            {steps} (stopped: {single_result[1]})")
+    print(f"single engine:    {single_seconds:8.3f} s ({single_seconds / max(steps, 1) * 1000:.1f} ms/step)")
+    print(f"sharded:          {sharded_seconds:8.3f} s ({sharded_seconds / max(steps, 1) * 1000:.1f} ms/step, "
+          f"+{setup_seconds:.2f} s to start the shards)")
+    if found:
+        for difference in found:
+            print(f"MISMATCH {difference}")
+        return 1
+    print("results:          identical")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
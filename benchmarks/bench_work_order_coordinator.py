@@ -0,0 +1,51 @@
+"""
+Benchmarks the row-wise and vectorized WorkOrderCoordinator paths.
+
+Run from the repository root:
+    python -m benchmarks.bench_work_order_coordinator --rows 1000 50000 1000000
+"""
+import argparse
+import logging
+import time
+
+import pandas as pd
+
+from src.agents.work_order_coordinator import WorkOrderCoordinator
+from src.utils.synthetic_data import generate_datasets
+
+
+def time_path(shipyard_data: pd.DataFrame, supply_chain_data: pd.DataFrame, vectorized: bool):
+    """
+    Runs one process_work_orders pass (on the coordinator's own state store) and returns (seconds, resulting task_status).
+    """
+    woc = WorkOrderCoordinator(shipyard_data, supply_chain_data, vectorized=vectorized)
+    start = time.perf_counter()
+    woc.process_work_orders()
+    return time.perf_counter() - start, woc.shipyard_data['task_status']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 50_000, 1_000_000])
+    parser.add_argument('--rowwise-max', type=int, default=50_000,
+                        help="Largest size to run the row-wise path on (it is quadratic in prerequisites).")
+    args = parser.parse_args()
+
+    # Per-row log records would dominate the row-wise timings
+    logging.basicConfig(level=logging.CRITICAL)
+
+    print(f"{'rows':>10} {'row-wise (s)':>14} {'vectorized (s)':>15} {'speedup':>9}  match")
+    for rows in args.rows:
+        shipyard_data, supply_chain_data = generate_datasets(rows, supply_chain_rows=max(rows // 10, 1))
+        vectorized_time, vectorized_status = time_path(shipyard_data, supply_chain_data, vectorized=True)
+        if rows > args.rowwise_max:
+            print(f"{rows:>10} {'skipped':>14} {vectorized_time:>15.4f} {'-':>9}  -")
+            continue
+        rowwise_time, rowwise_status = time_path(shipyard_data, supply_chain_data, vectorized=False)
+        match = rowwise_status.equals(vectorized_status)
+        print(f"{rows:>10} {rowwise_time:>14.4f} {vectorized_time:>15.4f} "
+              f"{rowwise_time / vectorized_time:>8.1f}x  {match}")
+
+
+if __name__ == "__main__":
+    main()
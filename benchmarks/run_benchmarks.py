@@ -0,0 +1,182 @@
+"""
+Times the simulation's hot paths on synthetic datasets and stores the results as JSON.
+
+For every size it measures: parsing the CSVs (load_dataset without cache), building and reading
+the Arrow cache, one full process_work_orders pass, one allocate_resources pass, one
+_process_events call on a burst of due events, and the mean full simulation step. Each timing is
+the best of --repeat runs. Results carry the git commit, so two runs can be compared:
+
+Run from the repository root:
+    python -m benchmarks.run_benchmarks --rows 1000 50000 --output results-new.json
+    python -m benchmarks.run_benchmarks --rows 1000 50000 --compare results-old.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.agents.resource_allocator import ResourceAllocator
+from src.agents.work_order_coordinator import WorkOrderCoordinator
+from src.simulation.simulation_engine import SimulationEngine
+from src.utils.data_loader import load_dataset
+from src.utils.resource_pool import ResourcePool
+from src.utils.synthetic_data import generate_events, write_datasets
+
+# A benchmark counts as regressed when it is this much slower than the baseline
+REGRESSION_THRESHOLD = 1.25
+
+
+def best_of(repeat: int, setup, run) -> float:
+    """
+    Returns the fastest of repeat runs of run(setup()); only run() is timed.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_size(rows: int, directory: str, steps: int, events: int, repeat: int, options: dict) -> dict:
+    """
+    Runs every benchmark for one dataset size; returns benchmark name -> seconds.
+    """
+    shipyard_path, supply_chain_path = write_datasets(directory, rows, **options)
+    results = {
+        'load_dataset_csv': best_of(repeat, lambda: None, lambda _: (load_dataset(shipyard_path, use_cache=False),
+                                                                     load_dataset(supply_chain_path, use_cache=False))),
+    }
+    # The first cached load writes the Arrow copy, later ones memory-map it
+    cache_dir = os.path.join(directory, '.cache')
+    results['load_dataset_cache_build'] = best_of(
+        repeat, lambda: _clear_directory(cache_dir),
+        lambda _: (load_dataset(shipyard_path), load_dataset(supply_chain_path)))
+    results['load_dataset_cached'] = best_of(repeat, lambda: None,
+                                             lambda _: (load_dataset(shipyard_path), load_dataset(supply_chain_path)))
+
+    shipyard_data = load_dataset(shipyard_path)
+    supply_chain_data = load_dataset(supply_chain_path)
+    results['process_work_orders'] = best_of(
+        repeat, lambda: WorkOrderCoordinator(shipyard_data, supply_chain_data, vectorized=True),
+        lambda woc: woc.process_work_orders())
+    results['allocate_resources'] = best_of(
+        repeat, lambda: ResourceAllocator(shipyard_data, _pool(rows)), lambda allocator: allocator.allocate_resources())
+
+    def engine_with_events():
+        engine = SimulationEngine(shipyard_data, supply_chain_data.copy(), resource_pool=_pool(rows))
+        pool_ids = [i for ids in engine.resource_pool.inventory().values() for i in ids]
+        engine.add_events(generate_events(events, engine.shipyard_data, engine.supply_chain_data, pool_ids))
+        return engine
+    results['process_events'] = best_of(repeat, engine_with_events, lambda engine: engine._process_events())
+
+    def run_steps(engine):
+        engine.run_n_steps(steps)
+    results['simulation_step'] = best_of(
+        repeat, lambda: SimulationEngine(shipyard_data, supply_chain_data.copy(), resource_pool=_pool(rows)),
+        run_steps) / steps
+    return results
+
+
+def _pool(rows: int) -> ResourcePool:
+    """
+    A resource pool sized at 2% of the work orders per type.
+    """
+    count = max(rows // 50, 1)
+    return ResourcePool.from_counts({'crane': count, 'agv': count, 'forklift': count})
+
+
+def _clear_directory(path: str):
+    if os.path.isdir(path):
+        for name in os.listdir(path):
+            os.remove(os.path.join(path, name))
+
+
+def environment() -> dict:
+    """
+    Describes where the results came from (commit, versions, machine).
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> list:
+    """
+    Compares two result files; returns (rows, benchmark, baseline seconds, seconds, ratio, regressed) rows.
+    """
+    table = []
+    for rows, benchmarks in results['results'].items():
+        for name, seconds in benchmarks.items():
+            before = baseline['results'].get(rows, {}).get(name)
+            if before:
+                ratio = seconds / before
+                table.append((rows, name, before, seconds, ratio, ratio > threshold))
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 50_000])
+    parser.add_argument('--steps', type=int, default=5, help="Simulation steps timed per run.")
+    parser.add_argument('--events', type=int, default=10_000, help="Events in the _process_events burst.")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--dag-depth', type=int, default=8)
+    parser.add_argument('--delay-density', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the results to this JSON file.")
+    parser.add_argument('--compare', help="Baseline JSON file to compare against.")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="Slowdown ratio reported as a regression.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.CRITICAL)
+
+    options = {'dag_depth': args.dag_depth, 'delay_density': args.delay_density, 'seed': args.seed}
+    results = {'environment': environment(), 'parameters': dict(options, steps=args.steps, events=args.events,
+                                                                 repeat=args.repeat), 'results': {}}
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            timings = bench_size(rows, directory, args.steps, args.events, args.repeat, options)
+            results['results'][str(rows)] = timings
+            for name, seconds in timings.items():
+                print(f"{rows:>10} {name:<26} {seconds * 1000:>12.3f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nBaseline: {baseline['environment'].get('commit')}")
+        regressed = False
+        for rows, name, before, seconds, ratio, slower in compare(results, baseline, args.threshold):
+            regressed |= slower
+            print(f"{rows:>10} {name:<26} {before * 1000:>10.3f} -> {seconds * 1000:>10.3f} ms "
+                  f"{ratio:>6.2f}x{'  REGRESSION' if slower else ''}")
+        return 1 if regressed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,101 @@
-# This file can be empty
+"""
+Registry of simulation agents.
 
-# filepath: c:\Users\nomadic\OneDrive\2-Researcher\research\Blackhat\demo\DigitalTwinPrototype\src\agents\__init__.py
-# This file can be empty
\ No newline at end of file
+Agents are registered by name with an import path ('package.module:Class') and the method the
+engine calls once per simulation step. The module is imported the first time the agent is loaded,
+so engines that do not configure an agent never pay for importing it. An agent class builds
+itself from a running engine through a from_engine(engine) classmethod. Engines run the default
+agents unless given an explicit list.
+
+Example (a plugin agent):
+    register_agent('berth_planner', 'my_package.berths:BerthPlanner', 'plan_berths')
+    engine = SimulationEngine(shipyard_data, supply_chain_data,
+                              agents=['work_order_coordinator', 'berth_planner'])
+"""
+import importlib
+
+# Agent name -> (import path, method called once per simulation step, run by default);
+# registration order is step order
+_REGISTRY = {
+    'work_order_coordinator': ('src.agents.work_order_coordinator:WorkOrderCoordinator', 'process_work_orders', True),
+    'resource_allocator': ('src.agents.resource_allocator:ResourceAllocator', 'allocate_resources', True),
+    'anomaly_detector': ('src.agents.anomaly_detector:AnomalyDetector', 'detect', False),
+}
+
+# Built-in class name -> module, for `from src.agents import WorkOrderCoordinator`
+_BUILTIN_MODULES = {
+    'WorkOrderCoordinator': 'src.agents.work_order_coordinator',
+    'ResourceAllocator': 'src.agents.resource_allocator',
+    'AnomalyDetector': 'src.agents.anomaly_detector',
+}
+
+_loaded = {}  # Agent name -> class
+
+
+def register_agent(name: str, target: str, step_method: str, default: bool = False, replace: bool = False):
+    """
+    Registers an agent class without importing it.
+
+    Args:
+        name (str): Agent name used in SimulationEngine(agents=...) and engine.agents.
+        target (str): Import path of the class, 'package.module:Class'.
+        step_method (str): Method the engine calls once per simulation step.
+        default (bool): Run the agent in engines that are not given an explicit agent list.
+        replace (bool): Allow overriding an existing registration.
+
+    Raises:
+        ValueError: If the name is already registered (and replace is False) or target has no ':'.
+    """
+    if name in _REGISTRY and not replace:
+        raise ValueError(f"Agent already registered: {name}")
+    if ':' not in target:
+        raise ValueError(f"Agent target must look like 'package.module:Class': {target}")
+    _REGISTRY[name] = (target, step_method, default)
+    _loaded.pop(name, None)
+
+
+def registered_agents() -> list:
+    """
+    Lists the registered agent names in step order.
+    """
+    return list(_REGISTRY)
+
+
+def default_agents() -> list:
+    """
+    Lists the agents run when an engine is not given an explicit agent list, in step order.
+    """
+    return [name for name, (_, _, default) in _REGISTRY.items() if default]
+
+
+def step_method(name: str) -> str:
+    """
+    Returns the per-step method name of a registered agent.
+    """
+    return _spec(name)[1]
+
+
+def load_agent_class(name: str):
+    """
+    Imports (once) and returns the class of a registered agent.
+    """
+    if name not in _loaded:
+        module_name, class_name = _spec(name)[0].split(':')
+        _loaded[name] = getattr(importlib.import_module(module_name), class_name)
+    return _loaded[name]
+
+
+def _spec(name: str) -> tuple:
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Unknown agent: {name} (registered: {', '.join(_REGISTRY)})") from None
+
+
+def __getattr__(name):
+    """
+    Loads the built-in agent classes on first attribute access.
+    """
+    if name in _BUILTIN_MODULES:
+        return getattr(importlib.import_module(_BUILTIN_MODULES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,199 @@
+import collections
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.utils.streaming_stats import KeyCodes, RateTracker, TransitionTracker
+
+# Event type of the alerts this agent emits, and of the attack-flagged rows it receives
+ALERT_EVENT_TYPE = 'security_alert'
+ATTACK_EVENT_TYPE = 'security_attack'
+
+# Rate dimension -> event fields holding its key (first one present wins)
+DEFAULT_RATE_KEYS = {
+    'equipment': ('equipment_id', 'crane_id', 'agv_id', 'forklift_id'),
+    'action': ('agent_action', 'llm_agent_action', 'action'),
+    'event_type': ('type',),
+}
+
+# Fields naming the entity whose action sequence is scored, and the action itself
+SEQUENCE_ENTITY_FIELDS = ('equipment_id', 'crane_id', 'agv_id', 'forklift_id', 'work_order_id')
+SEQUENCE_SYMBOL_FIELDS = ('agent_action', 'llm_agent_action', 'action', 'type')
+
+
+class AnomalyDetector:
+    """
+    Detects unusual activity in the shipyard event stream.
+
+    Two kinds of alerts are raised, both from streaming aggregates that cost O(1) state per key
+    and are updated once per batch of events (see src.utils.streaming_stats):
+      * 'rate': a key (an equipment, an agent action, an event type) sees far more events in one
+        time bucket than its exponentially weighted history (z-score above z_threshold);
+      * 'sequence': an entity (equipment or work order) performs an action that rarely follows its
+        previous action.
+
+    Alerts are event dicts of type 'security_alert'. In a SimulationEngine the detector receives
+    every batch of due events and emits its alerts into the engine's event queue on its next step.
+    Events flagged as attacks ('security_attack') are counted by attack type. The aggregates are
+    not part of engine checkpoints; a restored engine starts with a fresh detector.
+    """
+
+    def __init__(self, bucket_size: float = 1.0, smoothing: float = 0.1, z_threshold: float = 4.0,
+                 min_count: int = 5, warmup_buckets: int = 5, rare_probability: float = 0.01,
+                 min_support: int = 50, rate_keys: dict = None, emit=None, alert_history: int = 1000):
+        """
+        Initializes the AnomalyDetector.
+
+        Args:
+            bucket_size (float): Length of a rate bucket in event time units.
+            smoothing (float): Weight of the newest bucket in the moving rate averages.
+            z_threshold (float): z-score above which a bucket count raises a rate alert.
+            min_count (int): Smallest bucket count that can raise a rate alert.
+            warmup_buckets (int): Buckets of history a key needs before it can raise a rate alert.
+            rare_probability (float): Transition probability below which a sequence alert is raised.
+            min_support (int): Transitions out of the previous action needed before scoring.
+            rate_keys (dict): Rate dimension -> event fields holding its key (DEFAULT_RATE_KEYS).
+            emit: Callable receiving each non-empty list of alerts (e.g. engine.add_events).
+            alert_history (int): Number of recent alerts kept in self.recent_alerts.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.bucket_size = bucket_size
+        self.rate_keys = DEFAULT_RATE_KEYS if rate_keys is None else rate_keys
+        self.emit = emit
+        self._codes = {dimension: KeyCodes() for dimension in self.rate_keys}
+        self._rates = {dimension: RateTracker(smoothing, z_threshold, min_count, warmup_buckets)
+                       for dimension in self.rate_keys}
+        self._entities = KeyCodes()
+        self._symbols = KeyCodes()
+        self._transitions = TransitionTracker(rare_probability, min_support)
+        self._pending = []  # Events received since the last detect()
+        self.recent_alerts = collections.deque(maxlen=alert_history)
+        self.events_observed = 0
+        self.alert_counts = collections.Counter()  # kind -> alerts raised
+        self.flagged_attacks = collections.Counter()  # attack_type -> attack-flagged events seen
+
+    @classmethod
+    def from_engine(cls, engine) -> 'AnomalyDetector':
+        """
+        Creates a detector that listens to the engine's due events and emits alerts into its queue.
+        """
+        detector = cls(bucket_size=engine.time_step, emit=engine.add_events)
+        engine.add_event_listener(detector.receive)
+        return detector
+
+    def receive(self, events: list):
+        """
+        Buffers a batch of events for the next detect() call.
+        """
+        self._pending.extend(events)
+
+    def detect(self) -> list:
+        """
+        Scores the buffered events and emits the resulting alerts; returns the alerts.
+        """
+        events, self._pending = self._pending, []
+        alerts = self.observe(events)
+        if alerts and self.emit is not None:
+            self.emit(alerts)
+        return alerts
+
+    def observe(self, events: list) -> list:
+        """
+        Updates the aggregates with a batch of events (in time order) and returns the alerts raised.
+
+        Events without a 'time' are placed at the latest time seen in the batch (or 0).
+        """
+        events = [event for event in events if event.get('type') != ALERT_EVENT_TYPE]
+        if not events:
+            return []
+        self.events_observed += len(events)
+        times = np.array([event.get('time') for event in events], dtype=float)
+        missing = np.isnan(times)
+        if missing.any():
+            times[missing] = np.nanmax(times) if not missing.all() else 0.0
+        buckets = np.floor(times / self.bucket_size).astype(np.int64)
+
+        # Each field is read from the events once per batch; fields no event has are skipped
+        columns = _columns(events, {field for fields in self.rate_keys.values() for field in fields} |
+                           set(SEQUENCE_ENTITY_FIELDS) | set(SEQUENCE_SYMBOL_FIELDS))
+        alerts = []
+        for dimension, fields in self.rate_keys.items():
+            codes = self._codes[dimension].encode(_field(events, fields, columns))
+            positions, keys, counts, expected, z_scores = self._rates[dimension].update(codes, buckets)
+            values = self._codes[dimension].values
+            for position, key, count, mean, z_score in zip(positions.tolist(), keys.tolist(), counts.tolist(),
+                                                           expected.tolist(), z_scores.tolist()):
+                alerts.append({'type': ALERT_EVENT_TYPE, 'kind': 'rate', 'dimension': dimension,
+                               'key': values[key], 'count': count, 'expected': mean, 'z_score': z_score,
+                               'time': float(times[position])})
+
+        entities = self._entities.encode(_field(events, SEQUENCE_ENTITY_FIELDS, columns))
+        symbols = self._symbols.encode(_field(events, SEQUENCE_SYMBOL_FIELDS, columns))
+        positions, previous, probabilities = self._transitions.update(entities, symbols)
+        for position, symbol, probability in zip(positions.tolist(), previous.tolist(), probabilities.tolist()):
+            alerts.append({'type': ALERT_EVENT_TYPE, 'kind': 'sequence',
+                           'entity': self._entities.values[entities[position]],
+                           'previous': self._symbols.values[symbol],
+                           'action': self._symbols.values[symbols[position]],
+                           'probability': probability, 'time': float(times[position])})
+
+        for event in events:
+            if event.get('type') == ATTACK_EVENT_TYPE:
+                self.flagged_attacks[event.get('attack_type')] += 1
+        for alert in alerts:
+            self.alert_counts[alert['kind']] += 1
+        self.recent_alerts.extend(alerts)
+        return alerts
+
+
+def _field(events: list, fields: tuple, columns: dict) -> np.ndarray:
+    """
+    Returns, for every event, the value of the first of fields that is present (None if none is).
+
+    columns caches field -> object array of its values for the batch; it holds None for fields
+    that no event in the batch has, and is shared by the calls for one batch.
+    """
+    values = np.full(len(events), None, dtype=object)
+    missing = slice(None)
+    for field in fields:
+        column = columns.get(field)
+        if column is None:
+            continue
+        values[missing] = column[missing]
+        missing = np.flatnonzero(pd.isna(values) | (values == ''))
+        if not len(missing):
+            break
+    return values
+
+
+def _columns(events: list, fields) -> dict:
+    """
+    Extracts the given fields of a batch of events into object arrays (None for fields no event has).
+    """
+    present = set().union(*events)
+    columns = {}
+    for field in fields:
+        if field in present:
+            column = np.empty(len(events), dtype=object)
+            column[:] = [event.get(field) for event in events]
+            columns[field] = column
+        else:
+            columns[field] = None
+    return columns
+
+
+if __name__ == "__main__":
+    # Configure logging (you might want to do this at the app level)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # Example usage: crane1 alternates lift/move for 100 time units, then bursts and does something odd
+    events = []
+    for t in range(100):
+        events.append({'type': 'shipyard_event', 'equipment_id': 'crane1', 'agent_action': 'lift', 'time': t})
+        events.append({'type': 'shipyard_event', 'equipment_id': 'crane1', 'agent_action': 'move', 'time': t + 0.5})
+    events += [{'type': 'shipyard_event', 'equipment_id': 'crane1', 'agent_action': 'override_safety',
+                'time': 100 + i / 20} for i in range(20)]
+    detector = AnomalyDetector()
+    for alert in detector.observe(events):
+        print(alert)
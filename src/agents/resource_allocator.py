@@ -1,126 +1,347 @@
 import pandas as pd
+import numpy as np
 import logging
+from src.utils.assignment import linear_sum_assignment
+from src.utils.dependency_graph import DependencyGraph
+from src.utils.parsing import truthy
+from src.utils.resource_pool import RESOURCE_COLUMNS, ResourcePool
+from src.utils.state_store import TaskStatus, WorkOrderStore
+from src.utils.trace import TraceSink
+
+# Work orders in these states give their resources back to the pool
+RELEASE_STATUSES = (TaskStatus.COMPLETED, TaskStatus.DELAYED)
+
+# 'greedy' leases in DataFrame order; 'optimal' solves a min-cost assignment per resource type and zone
+ASSIGNMENT_MODES = ('greedy', 'optimal')
+
+# Weights of the optimal mode's cost terms: work order priority (higher is served first), due time
+# (earlier is served first) and distance between the resource and the work order
+DEFAULT_COST_WEIGHTS = {'priority': 1.0, 'due_time': 1.0, 'distance': 1.0}
+
+# Per-step counters reported through the trace sink: event -> (level, message)
+TRACE_EVENTS = {
+    'allocation_skipped': (logging.WARNING, "Work order ID missing for %(count)d work orders, skipping allocation."),
+    'released': (logging.INFO, "Released %(count)d resources from finished work orders"),
+    'assigned': (logging.INFO, "Assigned %(count)d %(key)ss to work orders"),
+    'unassigned': (logging.DEBUG, "No %(key)ss available for %(count)d work orders"),
+}
+
+# Logged once per resource type, the first time pending work orders outnumber its free resources
+SHORTAGE_WARNING = "Not enough %ss: %d work orders waiting for %d free; later shortages are logged at DEBUG"
+
 
 class ResourceAllocator:
     """
     Simulates the behavior of a Resource Allocator agent.
+
+    Resources are leased only to Pending work orders whose prerequisites are all met (the dependency
+    graph's ready set), so an order that cannot start yet never holds a resource another order could use.
     """
 
-    def __init__(self, shipyard_data: pd.DataFrame):
+    def __init__(self, shipyard_data: pd.DataFrame, resource_pool: ResourcePool = None, store: WorkOrderStore = None,
+                 trace: TraceSink = None, incremental: bool = True, assignment: str = 'greedy',
+                 resources: pd.DataFrame = None, cost_weights: dict = None, dependency_graph: DependencyGraph = None):
         """
         Initializes the ResourceAllocator.
+
+        Args:
+            shipyard_data (pd.DataFrame): Work orders; ignored when a store is given.
+            resource_pool (ResourcePool): Inventory to lease from; built from the IDs in shipyard_data if not given.
+            store (WorkOrderStore): State store whose crane_id/agv_id/forklift_id codes receive the
+                assigned IDs; built from shipyard_data and the pool inventory if not given.
+            trace (TraceSink): Sink for per-step allocation counters; if not given, the allocator
+                keeps its own and logs the counters at the end of every call.
+            incremental (bool): Only revisit work orders written since the last call, plus the ready
+                ones still waiting for a resource (the first call always covers every row).
+            assignment (str): 'greedy' or 'optimal' (see ASSIGNMENT_MODES).
+            resources (pd.DataFrame): Resource attributes for the optimal mode, indexed by resource ID,
+                with optional location_x/location_y and zone columns.
+            cost_weights (dict): Overrides for DEFAULT_COST_WEIGHTS.
+            dependency_graph (DependencyGraph): Prerequisite DAG over the work orders; built here if not given.
+
+        In optimal mode work orders may carry priority, due_time, location_x/location_y and zone
+        columns; without any of them every assignment costs the same and the greedy order is used.
         """
-        self.shipyard_data = shipyard_data
+        if assignment not in ASSIGNMENT_MODES:
+            raise ValueError(f"Unknown assignment mode: {assignment} (expected one of {ASSIGNMENT_MODES})")
+        self.resource_pool = resource_pool if resource_pool is not None else ResourcePool.from_shipyard_data(shipyard_data)
+        self.store = store if store is not None else WorkOrderStore(shipyard_data, self.resource_pool.inventory())
+        self.shipyard_data = self.store.frame
+        self.dependency_graph = dependency_graph if dependency_graph is not None else DependencyGraph(self.shipyard_data)
         self.logger = logging.getLogger(__name__)
+        self._owns_trace = trace is None
+        self.trace = TraceSink() if trace is None else trace
+        self.trace.register(TRACE_EVENTS, self.logger)
+        self.incremental = incremental
+        self._changes = self.store.track_changes()  # Rows written since the last call
+        self._valid = None  # Cached truthiness of work_order_id; None forces a full pass
+        self._missing_ids = 0
+        self._short = set()  # Resource types whose shortage was already warned about
+        self.assignment = assignment
+        self.resources = resources
+        self.cost_weights = dict(DEFAULT_COST_WEIGHTS, **(cost_weights or {}))
+
+    @classmethod
+    def from_engine(cls, engine) -> 'ResourceAllocator':
+        """
+        Creates an allocator that leases from the engine's resource pool through its store, dependency
+        graph and trace.
+        """
+        return cls(engine.shipyard_data, engine.resource_pool, store=engine.store, trace=engine.trace,
+                   incremental=engine.incremental, dependency_graph=engine.dependency_graph)
 
     def allocate_resources(self):
         """
-        Allocates resources (cranes, AGVs) to work orders.
+        Allocates resources (cranes, AGVs, forklifts) to work orders.
+
+        First returns the resources of work orders that reached Completed or Delayed to the pool,
+        then leases free resources to ready work orders (Pending, prerequisites met) that still lack
+        them, in DataFrame order. Each resource type is assigned with one bulk write of store codes.
+        In incremental mode only rows written since the last call and ready rows are examined.
         """
         self.logger.info("Allocating resources...")
+        data = self.shipyard_data
+        dirty = self._changes.take()
+        status = self.store.status
+        graph = self.dependency_graph
+        graph.sync_flags(status == TaskStatus.COMPLETED, status == TaskStatus.PENDING)
+        full = not self.incremental or self._valid is None or len(self._valid) != len(data)
+        if full:
+            self.release_finished_work_orders()
+        else:
+            self._release_rows(dirty)
 
-        #  Implement your logic here to allocate resources
-        #  based on work order priorities, resource availability, etc.
-        #  You'll likely need to iterate through work orders and assign resources.
-        for index, work_order in self.shipyard_data.iterrows():
-            work_order_id = work_order.get('work_order_id')
-            if not work_order_id:
-                self.logger.warning("Work order ID missing, skipping.")
-                continue
+        if 'work_order_id' in data.columns:
+            if full:
+                self._valid = truthy(data['work_order_id']).copy()
+                self._missing_ids = int(len(data) - self._valid.sum())
+                rows = np.arange(len(data), dtype=np.int64)
+            else:
+                self._refresh_valid(dirty)
+                rows = np.union1d(dirty, graph.ready_positions())
+            self.trace.count('allocation_skipped', n=self._missing_ids)
 
-            if work_order.get('task_status') == 'Pending':
-                self._assign_resources(work_order)
+            for resource_type, column in RESOURCE_COLUMNS.items():
+                self._assign_resource_type(resource_type, column, rows)
+        if self._owns_trace:
+            self.trace.flush()
 
-    def _assign_resources(self, work_order: pd.Series):
+    def reset_incremental(self):
         """
-        Assigns specific resources to a work order.
+        Drops the incremental state so the next call re-examines every work order.
         """
-        work_order_id = work_order.get('work_order_id')
+        self._valid = None
 
-        #  1. Check for available resources (e.g., cranes, AGVs).
-        #  2. Assign resources to the work order.
-        #  3. Update the shipyard_data DataFrame to reflect the resource assignments.
+    def _refresh_valid(self, rows: np.ndarray):
+        """
+        Updates the cached work_order_id validity of rows that were written since the last call.
+        """
+        if not len(rows):
+            return
+        was_valid = int(self._valid[rows].sum())
+        ids = self.shipyard_data['work_order_id'].to_numpy(dtype=object)[rows]
+        self._valid[rows] = truthy(pd.Series(ids, dtype=object))
+        self._missing_ids += was_valid - int(self._valid[rows].sum())
 
-        #  Assign a crane if available
-        if self._is_crane_available():
-            crane_id = self._get_available_crane()
-            self.logger.info(f"Assigned crane {crane_id} to work order {work_order_id}")
-            #  Update shipyard_data here
-            index = work_order.name  # Get the index of the row
-            self.shipyard_data.loc[index, 'crane_id'] = crane_id
-        else:
-            self.logger.warning(f"No cranes available for work order {work_order_id}")
-
-        #  Assign an AGV if available
-        if self._is_agv_available():
-            agv_id = self._get_available_agv()
-            self.logger.info(f"Assigned AGV {agv_id} to work order {work_order_id}")
-            index = work_order.name  # Get the index of the row
-            self.shipyard_data.loc[index, 'agv_id'] = agv_id
-        else:
-            self.logger.warning(f"No AGVs available for work order {work_order_id}")
-
-        #  Assign a forklift if available
-        if self._is_forklift_available():
-            forklift_id = self._get_available_forklift()
-            self.logger.info(f"Assigned forklift {forklift_id} to work order {work_order_id}")
-            index = work_order.name  # Get the index of the row
-            self.shipyard_data.loc[index, 'forklift_id'] = forklift_id
-        else:
-            self.logger.warning(f"No forklifts available for work order {work_order_id}")
+    def _release_rows(self, rows: np.ndarray) -> int:
+        """
+        Releases the leases of the given rows that are now Completed or Delayed and clears their
+        resource IDs; returns resources freed.
+        """
+        finished = rows[np.isin(self.store.status[rows], RELEASE_STATUSES)]
+        if not len(finished):
+            return 0
+        released = self.resource_pool.release_many(self.shipyard_data.index[finished])
+        clear_resources(self.store, finished)
+        self.trace.count('released', n=released)
+        return released
 
+    def release_finished_work_orders(self) -> int:
+        """
+        Releases the leases of work orders that are Completed or Delayed (and of holders that are
+        not work orders) and clears their resource IDs; returns resources freed.
+        """
+        store = self.store
+        clear_resources(store, np.flatnonzero(np.isin(store.status, RELEASE_STATUSES)))
+        holders = self.resource_pool.holders()
+        if not holders:
+            return 0
+        positions = self.shipyard_data.index.get_indexer(pd.Index(holders, dtype=object))
+        statuses = store.status[np.maximum(positions, 0)]
+        finished = (positions < 0) | np.isin(statuses, RELEASE_STATUSES)
+        released = self.resource_pool.release_many(holder for holder, done in zip(holders, finished) if done)
+        self.trace.count('released', n=released)
+        return released
 
-    def _is_agv_available(self) -> bool:
+    def get_utilization(self) -> dict:
         """
-        Checks if an AGV is available.
+        Gets per-type resource utilization counters from the pool.
         """
-        #  Implement your logic here to check if any AGVs are available.
-        #  You'll likely need to query the shipyard_data DataFrame.
-        #  For now, let's just return True for demonstration purposes.
-        return True
-    
-    def _get_available_agv(self) -> str:
+        return self.resource_pool.utilization()
+
+    def _assign_resource_type(self, resource_type: str, column: str, rows: np.ndarray) -> np.ndarray:
         """
-        Gets an available AGV ID.
+        Leases one resource of a type to each ready work order among rows without one, while any are free.
+
+        Returns the positions of the rows that are left waiting.
         """
-        #  Implement your logic here to get the ID of an available AGV.
-        #  You'll likely need to query the shipyard_data DataFrame.
-        #  For now, let's return a dummy AGV ID.
-        return "agv1"
-    
-    def _is_crane_available(self) -> bool:
+        store = self.store
+        # Orders that already hold a resource of this type keep it; blocked orders get none
+        ready = (store.status[rows] == TaskStatus.PENDING) & (self.dependency_graph.unmet[rows] == 0)
+        rows = rows[self._valid[rows] & ready & (store.resource_codes[column][rows] < 0)]
+        if not len(rows):
+            return rows
+        available = self.resource_pool.available(resource_type)
+        if available < len(rows):
+            self.trace.count('unassigned', resource_type, len(rows) - available)
+            if resource_type not in self._short:
+                self._short.add(resource_type)
+                self.logger.warning(SHORTAGE_WARNING, resource_type, len(rows), available)
+        if not available:
+            return rows
+
+        if self.assignment == 'optimal' and self._has_cost_data():
+            assign, resource_ids = self._optimal_assignment(resource_type, rows)
+            holders = self.shipyard_data.index[assign]
+            self.resource_pool.acquire_ids(resource_ids, holders)
+        else:
+            assign = rows[:available]
+            holders = self.shipyard_data.index[assign]
+            resource_ids = self.resource_pool.acquire_many(resource_type, holders)
+            assign = assign[:len(resource_ids)]
+            holders = holders[:len(resource_ids)]
+        store.assign_resources(column, assign, resource_ids)
+        self.trace.count('assigned', resource_type, len(resource_ids))
+        if self.trace.tracing:
+            self.trace.record('assigned', resource_type=resource_type, holders=holders.tolist(),
+                              resource_ids=list(resource_ids))
+        return np.setdiff1d(rows, assign, assume_unique=True)
+
+    def _has_cost_data(self) -> bool:
         """
-        Checks if a crane is available.
+        Checks whether work orders or resources carry any attribute the optimal mode's cost uses.
         """
-        #  Implement your logic here to check if any cranes are available.
-        #  You'll likely need to query the shipyard_data DataFrame.
-        #  For now, let's just return True for demonstration purposes.
-        return True
+        columns = self.shipyard_data.columns
+        if 'priority' in columns or 'due_time' in columns:
+            return True
+        located = 'location_x' in columns and 'location_y' in columns
+        zoned = 'zone' in columns
+        if self.resources is None:
+            return False
+        return (located and {'location_x', 'location_y'} <= set(self.resources.columns)) or \
+            (zoned and 'zone' in self.resources.columns)
 
-    def _get_available_crane(self) -> str:
+    def _optimal_assignment(self, resource_type: str, rows: np.ndarray) -> tuple:
         """
-        Gets an available crane ID.
+        Matches the free resources of a type to pending rows at minimum total cost.
+
+        The problem is decomposed by zone: each zone's resources are matched to the zone's work
+        orders first, then the resources and work orders left over in any zone are matched in one
+        final problem. Ties in cost go to the earlier row, as in greedy mode.
+
+        Returns:
+            tuple: (assigned row positions, resource IDs), in row order.
         """
-        #  Implement your logic here to get the ID of an available crane.
-        #  You'll likely need to query the shipyard_data DataFrame.
-        #  For now, let's return a dummy crane ID.
-        return "crane1"
-    def _is_forklift_available(self) -> bool:
+        free_ids = np.asarray(self.resource_pool.free_ids(resource_type), dtype=object)
+        data = self.shipyard_data
+        # Per-order part of the cost: higher priority and earlier due time are cheaper to serve
+        order_cost = np.zeros(len(rows))
+        weights = self.cost_weights
+        if 'priority' in data.columns:
+            priority = pd.to_numeric(data['priority'].iloc[rows], errors='coerce').to_numpy(dtype=float)
+            order_cost -= weights['priority'] * np.nan_to_num(priority)
+        if 'due_time' in data.columns:
+            due = pd.to_numeric(data['due_time'].iloc[rows], errors='coerce').to_numpy(dtype=float)
+            if np.isfinite(due).any():
+                # Orders without a due time are the least urgent
+                due = np.where(np.isfinite(due), due, np.nanmax(due[np.isfinite(due)]) + 1)
+                order_cost += weights['due_time'] * (due - due.min())
+        order_xy, resource_xy = self._locations(rows, free_ids)
+        scale = 1.0 + np.abs(order_cost).max() + (weights['distance'] * _span(order_xy, resource_xy))
+        order_cost += np.arange(len(rows)) * (1e-9 * scale / max(len(rows), 1))
+
+        def solve(order_idx, resource_idx):
+            cost = np.broadcast_to(order_cost[order_idx], (len(resource_idx), len(order_idx))).copy()
+            if order_xy is not None:
+                cost += weights['distance'] * np.hypot(
+                    resource_xy[resource_idx, 0][:, None] - order_xy[order_idx, 0][None, :],
+                    resource_xy[resource_idx, 1][:, None] - order_xy[order_idx, 1][None, :])
+            r, o = linear_sum_assignment(cost)
+            return order_idx[o], resource_idx[r]
+
+        order_zone, resource_zone = self._zones(rows, free_ids)
+        orders_left = np.ones(len(rows), dtype=bool)
+        resources_left = np.ones(len(free_ids), dtype=bool)
+        matched_orders, matched_resources = [], []
+        if order_zone is not None:
+            for zone in pd.unique(resource_zone[pd.notna(resource_zone)]):
+                order_idx = np.flatnonzero(order_zone == zone)
+                resource_idx = np.flatnonzero(resource_zone == zone)
+                if len(order_idx) and len(resource_idx):
+                    o, r = solve(order_idx, resource_idx)
+                    matched_orders.append(o)
+                    matched_resources.append(r)
+                    orders_left[o] = False
+                    resources_left[r] = False
+        if orders_left.any() and resources_left.any():
+            o, r = solve(np.flatnonzero(orders_left), np.flatnonzero(resources_left))
+            matched_orders.append(o)
+            matched_resources.append(r)
+
+        order_idx = np.concatenate(matched_orders) if matched_orders else np.empty(0, dtype=np.int64)
+        resource_idx = np.concatenate(matched_resources) if matched_resources else np.empty(0, dtype=np.int64)
+        order = np.argsort(order_idx, kind='stable')
+        return rows[order_idx[order]], free_ids[resource_idx[order]].tolist()
+
+    def _locations(self, rows: np.ndarray, free_ids: np.ndarray) -> tuple:
         """
-        Checks if a forklift is available.
+        Returns (order xy, resource xy) coordinate arrays, or (None, None) if locations are not known.
+
+        Missing coordinates count as 0.
         """
-        # Implement your logic here to check if any forklifts are available.
-        # For now, let's just return True for demonstration purposes.
-        return True
+        data = self.shipyard_data
+        resources = self.resources
+        if resources is None or not {'location_x', 'location_y'} <= set(data.columns) or \
+                not {'location_x', 'location_y'} <= set(resources.columns):
+            return None, None
+        order_xy = np.column_stack([pd.to_numeric(data[c].iloc[rows], errors='coerce').to_numpy(dtype=float)
+                                    for c in ('location_x', 'location_y')])
+        located = resources.reindex(pd.Index(free_ids, dtype=object))
+        resource_xy = np.column_stack([pd.to_numeric(located[c], errors='coerce').to_numpy(dtype=float)
+                                       for c in ('location_x', 'location_y')])
+        return np.nan_to_num(order_xy), np.nan_to_num(resource_xy)
 
-    def _get_available_forklift(self) -> str:
+    def _zones(self, rows: np.ndarray, free_ids: np.ndarray) -> tuple:
         """
-        Gets an available forklift ID.
+        Returns (order zones, resource zones) object arrays, or (None, None) if zones are not known.
         """
-        # Implement your logic here to get the ID of an available forklift.
-        # For now, let's return a dummy forklift ID.
-        return "forklift1"
-    
+        if self.resources is None or 'zone' not in self.shipyard_data.columns or 'zone' not in self.resources.columns:
+            return None, None
+        order_zone = self.shipyard_data['zone'].to_numpy(dtype=object)[rows]
+        resource_zone = self.resources['zone'].reindex(pd.Index(free_ids, dtype=object)).to_numpy(dtype=object)
+        return order_zone, resource_zone
+
+
+def clear_resources(store: WorkOrderStore, positions: np.ndarray):
+    """
+    Clears the resource IDs recorded for the given rows (only rows that hold one are written).
+    """
+    for column, codes in store.resource_codes.items():
+        holding = positions[codes[positions] >= 0]
+        if len(holding):
+            store.assign_resources(column, holding, None)
+
+
+def _span(order_xy: np.ndarray, resource_xy: np.ndarray) -> float:
+    """
+    Upper bound of any order-resource distance (0 without locations).
+    """
+    if order_xy is None or not len(order_xy) or not len(resource_xy):
+        return 0.0
+    points = np.vstack([order_xy, resource_xy])
+    return float(np.hypot(*(points.max(axis=0) - points.min(axis=0))))
+
+
 if __name__ == "__main__":
     # Configure logging (you might want to do this at the app level)
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -134,6 +355,7 @@ if __name__ == "__main__":
         'agv_id': [None, None, None],    # Initialize agv_id column
         'forklift_id': [None, None, None]  # Initialize forklift_id column
     })
-    ra = ResourceAllocator(shipyard_data)
+    ra = ResourceAllocator(shipyard_data, ResourcePool.from_counts({'crane': 2, 'agv': 1, 'forklift': 2}))
     ra.allocate_resources()
-    print(shipyard_data)
\ No newline at end of file
+    print(ra.shipyard_data)
+    print(ra.get_utilization())
\ No newline at end of file
@@ -1,33 +1,110 @@
 import pandas as pd
+import numpy as np
 import logging
+from src.utils.delay_index import DelayIndex
+from src.utils.dependency_graph import DependencyGraph
+from src.utils.parsing import as_resource_map, truthy
+from src.utils.state_store import TaskStatus, WorkOrderStore
+from src.utils.trace import TraceSink
+
+# Per-step counters reported through the trace sink: event -> (level, message)
+TRACE_EVENTS = {
+    'missing_id': (logging.WARNING, "Work order ID missing for %(count)d work orders, skipping."),
+    'delayed': (logging.WARNING, "%(count)d work orders delayed: %(key)s"),
+    'started': (logging.INFO, "%(count)d work orders started"),
+    'completed': (logging.INFO, "%(count)d work orders completed"),
+    'blocked': (logging.INFO, "%(count)d pending work orders waiting for resources or prerequisites"),
+}
+
 
 class WorkOrderCoordinator:
     """
     Simulates the behavior of a Work Order Coordinator (WOC) agent.
+
+    State machine: Pending -> In Progress -> Completed, and any linked supply chain delay -> Delayed.
+    With require_leases, a Pending work order starts only once it holds a resource lease.
+
+    In incremental mode the vectorized pass only revisits work orders that can change: rows written
+    since the last pass, rows linked to events whose delay reason changed and Pending rows whose
+    prerequisites are met. Code that edits frame columns directly (tasks_done, pending_issues,
+    linked_shipyard_event, ...) must report the rows with store.mark_dirty(), or call reset_incremental().
     """
 
-    def __init__(self, shipyard_data: pd.DataFrame, supply_chain_data: pd.DataFrame):
+    def __init__(self, shipyard_data: pd.DataFrame, supply_chain_data: pd.DataFrame, vectorized: bool = False,
+                 delay_index: DelayIndex = None, dependency_graph: DependencyGraph = None,
+                 store: WorkOrderStore = None, trace: TraceSink = None, incremental: bool = True,
+                 require_leases: bool = False):
         """
         Initializes the WorkOrderCoordinator.
+
+        Args:
+            shipyard_data (pd.DataFrame): Work orders; ignored when a store is given.
+            supply_chain_data (pd.DataFrame): Supply chain events used for delay checks.
+            vectorized (bool): Process all work orders column-wise in one pass instead of row by row.
+                Both modes produce the same task_status values.
+            delay_index (DelayIndex): Shared index over supply_chain_data; built here if not given.
+            dependency_graph (DependencyGraph): Prerequisite DAG over shipyard_data; built here if not given.
+            store (WorkOrderStore): State store to read and write statuses through; built from
+                shipyard_data if not given. self.shipyard_data is the store's pandas view.
+            trace (TraceSink): Sink for per-step transition counters; if not given, the coordinator
+                keeps its own and logs the counters at the end of every pass.
+            incremental (bool): In vectorized mode, revisit only work orders that changed since the
+                last pass (the first pass always covers every row).
+            require_leases (bool): Only start work orders that hold a resource ID in one of the
+                store's resource columns, as leased by ResourceAllocator.
         """
-        self.shipyard_data = shipyard_data
+        self.store = store if store is not None else WorkOrderStore(shipyard_data)
+        self.shipyard_data = self.store.frame
         self.supply_chain_data = supply_chain_data
+        self.vectorized = vectorized
+        self.delay_index = delay_index if delay_index is not None else DelayIndex(supply_chain_data)
+        self.dependency_graph = dependency_graph if dependency_graph is not None else DependencyGraph(self.shipyard_data)
+        # Resource levels to check required_resources against; None means resources are not tracked
+        self.available_resources = None
+        self.require_leases = require_leases
         self.logger = logging.getLogger(__name__)
+        self._owns_trace = trace is None
+        self.trace = TraceSink() if trace is None else trace
+        self.trace.register(TRACE_EVENTS, self.logger)
+        self.incremental = incremental
+        self._changes = self.store.track_changes()  # Rows written since the last vectorized pass
+        self._valid = None  # Cached truthiness of work_order_id; None forces a full pass
+        self._missing_ids = 0
+        self._event_index = None  # linked_shipyard_event -> row positions (CSR over _event_rows)
+
+    @classmethod
+    def from_engine(cls, engine) -> 'WorkOrderCoordinator':
+        """
+        Creates a coordinator that shares the engine's store, delay index, dependency graph and trace.
+
+        Starts wait for a resource lease when the engine also runs the resource allocator.
+        """
+        return cls(engine.shipyard_data, engine.supply_chain_data, vectorized=engine.vectorized,
+                   delay_index=engine.delay_index, dependency_graph=engine.dependency_graph, store=engine.store,
+                   trace=engine.trace, incremental=engine.incremental,
+                   require_leases='resource_allocator' in engine.agent_names)
 
     def process_work_orders(self):
         """
         Processes work orders, checks for delays, and updates status.
         """
-        self.logger.info("Processing work orders...")
+        if self.vectorized:
+            self.process_work_orders_vectorized()
+        else:
+            self.logger.info("Processing work orders...")
+            self.dependency_graph.sync()
+            self._valid = None  # The row-wise pass keeps no incremental state
 
-        for index, work_order in self.shipyard_data.iterrows():
-            work_order_id = work_order.get('work_order_id')
-            if not work_order_id:
-                self.logger.warning("Work order ID missing, skipping.")
-                continue
+            for index, work_order in self.shipyard_data.iterrows():
+                work_order_id = work_order.get('work_order_id')
+                if not work_order_id:
+                    self.trace.count('missing_id')
+                    continue
 
-            self.logger.info(f"Processing work order: {work_order_id}")
-            self._update_work_order_status(work_order)
+                self.logger.debug("Processing work order: %s", work_order_id)
+                self._update_work_order_status(work_order)
+        if self._owns_trace:
+            self.trace.flush()
 
     def _update_work_order_status(self, work_order: pd.Series):
         """
@@ -41,7 +118,7 @@ class WorkOrderCoordinator:
 
         if delay_reason:
             new_status = 'Delayed'
-            self.logger.warning(f"Work order {work_order_id} delayed: {delay_reason}")
+            self.logger.debug("Work order %s delayed: %s", work_order_id, delay_reason)
         elif current_status == 'Pending':
             # Check resource availability and dependencies
             if self._resources_available(work_order) and self._dependencies_met(work_order):
@@ -59,34 +136,71 @@ class WorkOrderCoordinator:
 
         # Update the task_status in the shipyard_data DataFrame
         index = work_order.name  # Get the index of the row
-        self.shipyard_data.loc[index, 'task_status'] = new_status
-        self.logger.info(f"Work order {work_order_id} status updated to: {new_status}")
+        self.shipyard_data.loc[index, 'task_status'] = new_status  # Writes through to the store's codes
+        position = self.shipyard_data.index.get_loc(index)
+        self.dependency_graph.update_status([position], [new_status])
+        self.logger.debug("Work order %s status updated to: %s", work_order_id, new_status)
+        if new_status == current_status:
+            if new_status == 'Pending':
+                self.trace.count('blocked')
+            return
+        self.store.mark_dirty([position])
+        if new_status == 'Delayed':
+            self.trace.count('delayed', str(delay_reason))
+        elif new_status == 'In Progress':
+            self.trace.count('started')
+        elif new_status == 'Completed':
+            self.trace.count('completed')
+        self.trace.record('status_change', work_order_id=work_order_id, old=current_status, new=new_status)
 
     def _resources_available(self, work_order: pd.Series) -> bool:
         """
         Checks if the necessary resources are available for the work order.
         """
-        required_resources = work_order.get('required_resources', {})
+        if self.require_leases:
+            position = self.shipyard_data.index.get_loc(work_order.name)
+            if not self._holds_lease(np.array([position]))[0]:
+                self.logger.debug("Work order %s holds no resource lease", work_order.get('work_order_id'))
+                return False
+        required_resources = as_resource_map(work_order.get('required_resources', {}))
+        missing = self._missing_resource(required_resources)
+        if missing is not None:
+            self.logger.debug("Insufficient %s for work order %s", missing, work_order.get('work_order_id'))
+            return False
+        self.logger.debug("Resources available for work order %s", work_order.get('work_order_id'))
+        return True
+
+    def _missing_resource(self, required_resources: dict):
+        """
+        Returns the first resource that is short for the given requirements, or None if all are covered.
+        """
+        if self.available_resources is None:
+            return None
         for resource, quantity in required_resources.items():
             if self.available_resources.get(resource, 0) < quantity:
-                self.logger.warning(f"Insufficient {resource} for work order {work_order.get('work_order_id')}")
-                return False
-        self.logger.info(f"Resources available for work order {work_order.get('work_order_id')}")
-        return True  # Placeholder, replace with actual logic   
+                return resource
+        return None
+
+    def _holds_lease(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Marks the given rows that hold a resource ID of any type.
+        """
+        held = np.zeros(len(positions), dtype=bool)
+        for codes in self.store.resource_codes.values():
+            held |= codes[positions] >= 0
+        return held
 
     def _dependencies_met(self, work_order: pd.Series) -> bool:
         """
         Checks if the dependencies for the work order are met.
         """
-        prerequisite_tasks = work_order.get('prerequisite_tasks', [])
-        for task_id in prerequisite_tasks:
-            prerequisite_task = self.shipyard_data[self.shipyard_data['work_order_id'] == task_id]
-            if prerequisite_task.empty or prerequisite_task.iloc[0]['task_status'] != 'Completed':
-                self.logger.warning(f"Prerequisite task {task_id} for work order {work_order.get('work_order_id')} is not completed.")
-                return False
-        self.logger.info(f"All dependencies met for work order {work_order.get('work_order_id')}")
-    
-        return True  # Placeholder, replace with actual logic
+        unmet = self.dependency_graph.unmet[self.shipyard_data.index.get_loc(work_order.name)]
+        if unmet:
+            self.logger.debug("%s prerequisite tasks for work order %s are not completed.",
+                              unmet, work_order.get('work_order_id'))
+            return False
+        self.logger.debug("All dependencies met for work order %s", work_order.get('work_order_id'))
+        return True
 
     def _can_complete_work_order(self, work_order: pd.Series) -> bool:
         """
@@ -95,18 +209,17 @@ class WorkOrderCoordinator:
         # Check if all tasks are done
         tasks_done = work_order.get('tasks_done', False)
         if not tasks_done:
-            self.logger.warning(f"Tasks for work order {work_order.get('work_order_id')} are not done.")
+            self.logger.debug("Tasks for work order %s are not done.", work_order.get('work_order_id'))
             return False
 
         # Check if there are any pending issues
         pending_issues = work_order.get('pending_issues', False)
         if pending_issues:
-            self.logger.warning(f"There are pending issues for work order {work_order.get('work_order_id')}.")
+            self.logger.debug("There are pending issues for work order %s.", work_order.get('work_order_id'))
             return False
 
-        self.logger.info(f"Work order {work_order.get('work_order_id')} can be completed.")
-    
-        return True  # Placeholder, replace with actual logic
+        self.logger.debug("Work order %s can be completed.", work_order.get('work_order_id'))
+        return True
 
     def _check_for_delays(self, work_order: pd.Series) -> str:
         """
@@ -115,13 +228,234 @@ class WorkOrderCoordinator:
         linked_event = work_order.get('linked_shipyard_event')
         if not linked_event:
             return None  # No linked event, no delay
+        return self.delay_index.lookup(linked_event)
+
+    def process_work_orders_vectorized(self):
+        """
+        Processes work orders in one column-wise pass.
+
+        Computes the same Pending -> In Progress -> Completed/Delayed transitions as the
+        row-wise path using NumPy masks over the store's status codes, and writes back only
+        the rows whose status changed.
+        The row-wise path reads prerequisite statuses live, so a prerequisite that completes
+        earlier in the same pass already counts; that ordering is reproduced here by row position.
+        In incremental mode only the candidate rows are examined (see _candidate_rows); every
+        other row would keep its status, so steady-state cost follows the amount of activity.
+        """
+        self.logger.info("Processing work orders (vectorized)...")
+        data = self.shipyard_data
+        n = len(data)
+        if n == 0:
+            return
+        if 'work_order_id' not in data.columns:
+            self.trace.count('missing_id', n=n)
+            return
+
+        rows = self._candidate_rows()
+        self.trace.count('missing_id', n=self._missing_ids)
+        state = self._row_transitions(rows)
+        # Rows after a prerequisite that completes in this pass may start in this pass as well
+        src, dst = self.dependency_graph.out_edges(state['flipped'])
+        dependents = dst[src < dst]
+        if len(dependents) and not np.isin(dependents, rows).all():
+            # Added rows cannot flip themselves (their delay state has not changed), so one recompute suffices
+            rows = np.union1d(rows, dependents)
+            state = self._row_transitions(rows)
+
+        old_status = state['old_status']
+        delayed, completes = state['delayed'], state['completes']
+        # Pending -> In Progress needs met dependencies and resources
+        starts = state['pending'] & self._ready_mask(rows, state['new_completed'], state['flipped'])
+        if 'required_resources' in data.columns and self.available_resources is not None:
+            candidates = np.flatnonzero(starts)
+            values = data['required_resources'].to_numpy(dtype=object)[rows[candidates]]
+            has_resources = np.fromiter(
+                (self._missing_resource(as_resource_map(value)) is None for value in values),
+                dtype=bool, count=len(candidates))
+            starts[candidates[~has_resources]] = False
+        if self.require_leases:
+            candidates = np.flatnonzero(starts)
+            starts[candidates[~self._holds_lease(rows[candidates])]] = False
+
+        new_status = old_status.copy()
+        new_status[delayed] = TaskStatus.DELAYED
+        new_status[starts] = TaskStatus.IN_PROGRESS
+        new_status[completes] = TaskStatus.COMPLETED
+
+        changed = np.flatnonzero(state['valid'] & (new_status != old_status))
+        self._count_transitions(delayed & (old_status != TaskStatus.DELAYED), state['delay_reasons'], starts,
+                                completes)
+        store = self.store
+        if len(changed):
+            positions = rows[changed]
+            codes = new_status[changed]
+            if self.trace.tracing:
+                ids = data['work_order_id'].to_numpy(dtype=object)
+                self.trace.record('status_changes', work_order_ids=ids[positions].tolist(),
+                                  old=store.decode_status(old_status[changed]).tolist(),
+                                  new=store.decode_status(codes).tolist())
+            store.set_status(positions, codes)
+            self.dependency_graph.update_flags(positions, codes == TaskStatus.COMPLETED, codes == TaskStatus.PENDING)
+        # Every valid row still Pending stayed Pending in this pass (one vectorized count over the int8 codes)
+        self.trace.count('blocked', n=int(np.count_nonzero(self._valid & (store.status == TaskStatus.PENDING))))
+
+    def reset_incremental(self):
+        """
+        Drops the incremental state so the next vectorized pass re-examines every work order.
+        """
+        self._valid = None
+
+    def _candidate_rows(self) -> np.ndarray:
+        """
+        Returns the sorted row positions the vectorized pass has to examine.
+
+        A full pass (every row) happens first, after reset_incremental(), when the frame size or the
+        delay index was rebuilt, and whenever incremental mode is off. Otherwise the candidates are
+        the rows written since the last pass, the rows linked to events whose delay reason changed and
+        the dependency graph's ready set.
+        """
+        n = len(self.shipyard_data)
+        dirty = self._changes.take()
+        changed_events = self.delay_index.take_changes()
+        status = self.store.status
+        graph = self.dependency_graph
+        if not self.incremental or self._valid is None or len(self._valid) != n or changed_events is None:
+            self._build_row_indexes()
+            graph.sync_flags(status == TaskStatus.COMPLETED, status == TaskStatus.PENDING)
+            return np.arange(n, dtype=np.int64)
+
+        if len(dirty):
+            ids = self.shipyard_data['work_order_id'].to_numpy(dtype=object)[dirty]
+            was_valid = self._valid[dirty]
+            self._valid[dirty] = truthy(pd.Series(ids, dtype=object))
+            self._missing_ids += int(was_valid.sum()) - int(self._valid[dirty].sum())
+            dirty_status = status[dirty]
+            graph.update_flags(dirty, dirty_status == TaskStatus.COMPLETED, dirty_status == TaskStatus.PENDING)
+        rows = np.union1d(dirty, self._rows_linked_to(changed_events))
+        return np.union1d(rows, graph.ready_positions())
+
+    def _build_row_indexes(self):
+        """
+        Caches work_order_id validity and builds the linked_shipyard_event -> row positions index.
+        """
+        data = self.shipyard_data
+        self._valid = truthy(data['work_order_id']).copy()
+        self._missing_ids = int(len(data) - self._valid.sum())
+        self._event_index = None
+        if 'linked_shipyard_event' in data.columns:
+            codes, events = pd.factorize(data['linked_shipyard_event'].to_numpy(dtype=object))
+            linked = np.flatnonzero(codes >= 0)
+            self._event_rows = linked[np.argsort(codes[linked], kind='stable')]
+            self._event_offsets = np.zeros(len(events) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(codes[linked], minlength=len(events)), out=self._event_offsets[1:])
+            self._event_index = pd.Index(events, dtype=object)
+
+    def _rows_linked_to(self, events) -> np.ndarray:
+        """
+        Returns the positions of the work orders linked to any of the given events.
+        """
+        if not events or self._event_index is None:
+            return np.empty(0, dtype=np.int64)
+        codes = self._event_index.get_indexer(pd.Index(list(events), dtype=object))
+        codes = codes[codes >= 0]
+        starts = self._event_offsets[codes]
+        lengths = self._event_offsets[codes + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return self._event_rows[offsets]
+
+    def _row_transitions(self, rows: np.ndarray) -> dict:
+        """
+        Computes the transitions that depend only on each row itself: delays and completions.
+
+        Returns a dict of arrays aligned with rows, plus 'flipped': the positions that enter or
+        leave Completed in this pass.
+        """
+        data = self.shipyard_data
+        old_status = self.store.status[rows]
+        valid = self._valid[rows]
+
+        # Delays take precedence over every other transition
+        delay_reasons = self._lookup_delays(data, rows)
+        delayed = valid & truthy(pd.Series(delay_reasons, dtype=object))
+
+        active = valid & ~delayed
+        in_progress = active & (old_status == TaskStatus.IN_PROGRESS)
+
+        # In Progress -> Completed only depends on the work order's own flags
+        completes = in_progress & self._column_truthy(data, 'tasks_done', rows)
+        completes &= ~self._column_truthy(data, 'pending_issues', rows)
+
+        old_completed = old_status == TaskStatus.COMPLETED
+        new_completed = (old_completed & ~delayed) | completes
+        return {
+            'old_status': old_status,
+            'valid': valid,
+            'delay_reasons': delay_reasons,
+            'delayed': delayed,
+            'pending': active & (old_status == TaskStatus.PENDING),
+            'completes': completes,
+            'new_completed': new_completed,
+            'flipped': rows[new_completed != old_completed],
+        }
+
+    def _ready_mask(self, rows: np.ndarray, new_completed: np.ndarray, flipped: np.ndarray) -> np.ndarray:
+        """
+        Marks the given rows whose prerequisites are all met, as seen by the row-wise pass.
+
+        Starts from the dependency graph's ready set and applies this pass's completions: a
+        prerequisite row that comes before its dependent (already processed in the row-wise pass)
+        counts with its new status, later rows and the row itself with the old one. rows must be
+        sorted and include the ready set, the flipped rows and their later dependents.
+        """
+        graph = self.dependency_graph
+        ready = np.zeros(len(rows), dtype=bool)
+        ready[np.searchsorted(rows, graph.ready_positions())] = True
+
+        if len(flipped):
+            src, dst = graph.out_edges(flipped)
+            earlier = src < dst
+            src, dst = src[earlier], dst[earlier]
+            affected, inverse = np.unique(dst, return_inverse=True)
+            adjustment = np.bincount(inverse, weights=np.where(new_completed[np.searchsorted(rows, src)], -1, 1),
+                                     minlength=len(affected))
+            ready[np.searchsorted(rows, affected)] = graph.unmet[affected] + adjustment == 0
+        return ready
+
+    def _lookup_delays(self, data: pd.DataFrame, rows: np.ndarray) -> np.ndarray:
+        """
+        Looks up the first supply chain delay_reason for the linked_shipyard_event of the given rows.
+
+        Returns an object array holding the delay reason, or None where no event is linked.
+        """
+        reasons = np.full(len(rows), None, dtype=object)
+        if 'linked_shipyard_event' not in data.columns:
+            return reasons
+        linked = data['linked_shipyard_event'].to_numpy(dtype=object)[rows]
+        hits = np.flatnonzero(truthy(pd.Series(linked, dtype=object)))
+        reasons[hits] = self.delay_index.lookup_many(linked[hits])
+        return reasons
+
+    @staticmethod
+    def _column_truthy(data: pd.DataFrame, column: str, rows: np.ndarray) -> np.ndarray:
+        """
+        Element-wise truthiness of an optional flag column at the given rows (missing columns count as False).
+        """
+        if column not in data.columns:
+            return np.zeros(len(rows), dtype=bool)
+        return truthy(data[column].iloc[rows])
+
+    def _count_transitions(self, newly_delayed: np.ndarray, delay_reasons: np.ndarray, starts: np.ndarray,
+                           completes: np.ndarray):
+        """
+        Adds this pass's transitions to the trace counters (one counter per delay reason).
+        """
+        if newly_delayed.any():
+            reasons = pd.Series(delay_reasons[newly_delayed], dtype=object).astype(str).value_counts()
+            for reason, count in reasons.items():
+                self.trace.count('delayed', reason, int(count))
+        self.trace.count('started', n=int(starts.sum()))
+        self.trace.count('completed', n=int(completes.sum()))
 
-        # Example (adapt to your data structure):
-        delay_event = self.supply_chain_data[self.supply_chain_data['linked_shipyard_event'] == linked_event]
-        if not delay_event.empty:
-            return delay_event.iloc[0].get('delay_reason', "Unknown delay")
-        else:
-            return None
 
 if __name__ == "__main__":
     # Configure logging (you might want to do this at the app level)
@@ -140,4 +474,4 @@ if __name__ == "__main__":
     })
     woc = WorkOrderCoordinator(shipyard_data, supply_chain_data)
     woc.process_work_orders()
-    print(shipyard_data)  # Print the updated shipyard data
\ No newline at end of file
+    print(woc.shipyard_data)  # Print the updated shipyard data
\ No newline at end of file
@@ -1,16 +1,118 @@
+import altair as alt
 import streamlit as st
+import numpy as np
 import pandas as pd
-from utils.data_loader import load_dataset
-import sys
-import os 
-# Add the parent directory to sys.path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(current_dir)
-sys.path.append(parent_dir)
-
-print("sys.path:", sys.path)
 
+from src.simulation.live_dashboard import BackgroundRunner
 from src.simulation.simulation_engine import SimulationEngine
+from src.utils.data_loader import load_dataset
+
+SHIPYARD_DATASET = "Digital_Shipyard_50k_With_Attacks.csv"
+SUPPLY_CHAIN_DATASET = "Supply_Chain_50k_With_Attacks.csv"
+
+# Upper bound on changed rows sent to the browser per run
+MAX_DISPLAY_ROWS = 1000
+# Live charts redraw at most this often while the background runner is stepping (2 frames per second)
+REFRESH_SECONDS = 0.5
+# Time points per live chart, whatever the number of steps or work orders
+MAX_CHART_POINTS = 200
+
+
+@st.cache_resource(show_spinner="Loading datasets...")
+def load_datasets():
+    """
+    Loads both datasets once per server process; the returned frames are shared and must not be modified.
+    """
+    return load_dataset(SHIPYARD_DATASET), load_dataset(SUPPLY_CHAIN_DATASET)
+
+
+def get_engine():
+    """
+    Gets this session's SimulationEngine, creating it from copies of the cached datasets on first use.
+
+    The engine comes with a BackgroundRunner (st.session_state['runner']); every step goes through
+    the runner so its live metrics see all of them.
+    """
+    if 'engine' not in st.session_state:
+        shipyard_data, supply_chain_data = load_datasets()
+        if shipyard_data is None or supply_chain_data is None:
+            return None
+        engine = SimulationEngine(shipyard_data.copy(), supply_chain_data.copy())
+        st.session_state['engine'] = engine
+        st.session_state['runner'] = BackgroundRunner(engine)
+        st.session_state['last_changes'] = None
+    return st.session_state['engine']
+
+
+def reset_engine():
+    """
+    Stops this session's background runner and drops its engine.
+    """
+    runner = st.session_state.pop('runner', None)
+    if runner is not None:
+        runner.stop()
+    st.session_state.pop('engine', None)
+
+
+def run_steps(engine: SimulationEngine, steps: int):
+    """
+    Runs steps on the engine and keeps the rows whose status or resource IDs changed for display.
+
+    The comparison runs on the state store's integer codes, so no string columns are copied.
+    """
+    store = engine.store
+    runner = st.session_state['runner']
+    with runner.lock:
+        status_before = store.status.copy()
+        resources_before = {column: codes.copy() for column, codes in store.resource_codes.items()}
+
+        runner.run_steps(steps)
+
+        changed = status_before != store.status
+        for column, codes in resources_before.items():
+            changed |= codes != store.resource_codes[column]
+
+        # Copied under the lock: a running background runner writes these rows between steps
+        positions = np.flatnonzero(changed)
+        changes = engine.shipyard_data.iloc[positions].copy()
+    changes.insert(0, 'previous_task_status',
+                   pd.Categorical.from_codes(status_before[positions], dtype=store.status_dtype))
+    st.session_state['last_changes'] = (steps, changes)
+
+
+def render_live_charts(runner: BackgroundRunner, refreshing: bool):
+    """
+    Draws the live charts from a downsampled snapshot of the runner's metrics.
+
+    Only the aggregates (a few hundred points per chart) are sent to the browser, so the cost of a
+    redraw does not grow with the number of work orders or steps.
+    """
+    snapshot = runner.snapshot(MAX_CHART_POINTS)
+    if refreshing and not snapshot['running']:
+        st.rerun()  # The runner finished or failed: redraw the page once and stop refreshing
+
+    st.write(f"Current Simulation Time: {snapshot['current_time']} ({snapshot['step_count']} steps)")
+    st.dataframe(snapshot['current_status'].rename('work orders').to_frame().T)
+    if snapshot['steps'] < 2:
+        return
+
+    col_status, col_utilization = st.columns(2)
+    col_status.caption("Work orders per status")
+    col_status.line_chart(snapshot['status_counts'])
+    col_utilization.caption("Resource utilization")
+    col_utilization.line_chart(snapshot['utilization'])
+
+    delays = snapshot['delays']
+    if not delays.empty and delays.to_numpy().any():
+        heatmap = delays.rename_axis(columns='reason').stack().rename('delayed').reset_index()
+        st.caption("Work orders delayed per reason")
+        st.altair_chart(alt.Chart(heatmap).mark_rect().encode(
+            x=alt.X('time:O', axis=alt.Axis(labelOverlap=True)),
+            y=alt.Y('reason:N', title=None),
+            color=alt.Color('delayed:Q', scale=alt.Scale(scheme='oranges')),
+            tooltip=['time', 'reason', 'delayed'],
+        ), use_container_width=True)
+
 
 def main():
     """
@@ -18,42 +120,45 @@ def main():
     """
     st.title("Digital Twin Prototype: Supply Chain Simulation")
 
-    # Load Datasets
-    shipyard_data = load_dataset("Digital_Shipyard_50k_With_Attacks.csv")
-    supply_chain_data = load_dataset("Supply_Chain_50k_With_Attacks.csv")
-
-    if shipyard_data is None or supply_chain_data is None:
+    # Load Datasets and Initialize Simulation Engine (once per session)
+    simulation_engine = get_engine()
+    if simulation_engine is None:
         st.error("Failed to load datasets. Please check the data files.")
         return
 
-    # Initialize Simulation Engine
-    simulation_engine = SimulationEngine(shipyard_data, supply_chain_data)
-
     # --- Dashboard ---
     st.header("Dashboard")
-    #st.write("This is where the dashboard will go.")
 
-    if st.button("Run Simulation Step"):
-        simulation_engine.run_simulation_step()
+    col_step, col_steps, col_run, col_reset = st.columns([2, 1, 2, 2], vertical_alignment='bottom')
+    if col_step.button("Run Simulation Step"):
+        run_steps(simulation_engine, 1)
+    steps = col_steps.number_input("Steps", min_value=1, value=10, step=1)
+    if col_run.button(f"Run {steps} Steps"):
+        run_steps(simulation_engine, int(steps))
+    if col_reset.button("Reset Simulation"):
+        reset_engine()
+        simulation_engine = get_engine()
+    runner = st.session_state['runner']
 
-        # --- Retrieve and Display Simulation Data ---
-        simulation_data = simulation_engine.get_simulation_data()
-        updated_shipyard_data = simulation_data['shipyard_data']
-        updated_supply_chain_data = simulation_data['supply_chain_data']
-        current_time = simulation_data['current_time']
-
-        st.write(f"Current Simulation Time: {current_time}")
-        
-        #After running a simulation step, display the updated shipyard_data
-        st.subheader("Updated Shipyard Data")
-        st.dataframe(updated_shipyard_data.head())
-
-        #After running a simulation step, display the updated supply_chain_data
-        st.subheader("Updated Supply Chain Data")
-        st.dataframe(updated_supply_chain_data.head())
+    # --- Live Charts (redrawn on their own while the background runner is stepping) ---
+    refreshing = runner.running
+    st.fragment(render_live_charts, run_every=REFRESH_SECONDS if refreshing else None)(runner, refreshing)
+    if runner.error is not None:
+        st.error(f"The background run stopped with an error: {runner.error}")
 
+    last_changes = st.session_state.get('last_changes')
+    if last_changes is None:
+        st.write("Press a button to run the simulation.")
     else:
-        st.write("Press the button to run a simulation step.")
+        steps_run, changes = last_changes
+        #After running simulation steps, display only the shipyard rows that changed
+        st.subheader(f"Changed Work Orders ({len(changes)} in the last {steps_run} step(s))")
+        if len(changes) > MAX_DISPLAY_ROWS:
+            st.caption(f"Showing the first {MAX_DISPLAY_ROWS} of {len(changes)} changed rows.")
+        st.dataframe(changes.head(MAX_DISPLAY_ROWS))
+
+    with st.expander("Supply Chain Data"), runner.lock:
+        st.dataframe(simulation_engine.supply_chain_data.head())
 
     # --- Agent Interaction Panel ---
     st.header("Agent Interaction Panel")
@@ -61,8 +166,14 @@ def main():
 
     # --- Settings/Controls ---
     st.header("Settings/Controls")
-    st.write("This is where the settings/controls will go.")
-        
+    col_live, col_rate = st.columns([2, 1], vertical_alignment='bottom')
+    steps_per_second = col_rate.number_input("Steps per second (0 = unlimited)", min_value=0, value=20, step=5)
+    runner.steps_per_second = steps_per_second or None
+    if runner.running:
+        col_live.button("Stop Background Run", on_click=runner.stop)
+    else:
+        col_live.button("Start Background Run", on_click=runner.start)
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
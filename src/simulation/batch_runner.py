@@ -0,0 +1,161 @@
+"""
+Headless batch runner for the simulation engine.
+
+Runs a fixed number of steps, or until a simulation time or until all work orders are done,
+without the Streamlit UI, and reports throughput, per-agent step time and peak memory.
+
+Run from the repository root:
+    python -m src.simulation.batch_runner --steps 100
+    python -m src.simulation.batch_runner --until-complete --max-steps 1000 --json report.json
+    python -m src.simulation.batch_runner --steps 100 --metrics-file metrics.prom
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+import tracemalloc
+
+from src.simulation.simulation_engine import SimulationEngine
+from src.utils.data_loader import load_dataset
+
+try:
+    import resource  # Not available on Windows
+except ImportError:
+    resource = None
+
+
+def run_batch(engine: SimulationEngine, steps: int = None, until_time=None, until_complete: bool = False,
+              max_steps: int = None, jump_to_next_event: bool = False, trace_memory: bool = False) -> dict:
+    """
+    Runs the engine headless and returns a metrics report.
+
+    Args:
+        engine (SimulationEngine): Engine to drive.
+        steps (int): Run exactly this many steps (ignores the other stop conditions).
+        until_time: Stop once the simulation clock reaches this time.
+        until_complete (bool): Stop once no work order is Pending or In Progress.
+        max_steps (int): Hard cap on the number of steps.
+        jump_to_next_event (bool): Skip idle steps up to the next queued event.
+        trace_memory (bool): Measure peak Python heap usage with tracemalloc (slower).
+
+    Returns:
+        dict: Steps run, stop reason, wall time, steps/sec, mean seconds per step for each agent,
+        final simulation time, work order status counts and peak memory in MB.
+    """
+    if trace_memory:
+        tracemalloc.start()
+        engine.instrumentation.traced_peak_bytes = 0
+    timings_before = dict(engine.step_timings)
+
+    start = time.perf_counter()
+    if steps is not None:
+        steps_run, reason = engine.run_n_steps(steps, jump_to_next_event), 'steps'
+    else:
+        steps_run, reason = engine.run_until(until_time, until_complete, max_steps, jump_to_next_event)
+    elapsed = time.perf_counter() - start
+
+    report = {
+        'steps': steps_run,
+        'stop_reason': reason,
+        'wall_seconds': elapsed,
+        'steps_per_second': steps_run / elapsed if elapsed > 0 else float('inf'),
+        'seconds_per_step': {
+            phase: (total - timings_before.get(phase, 0.0)) / steps_run if steps_run else 0.0
+            for phase, total in engine.step_timings.items()
+        },
+        'current_time': engine.current_time,
+        'status_counts': engine.shipyard_data['task_status'].value_counts().to_dict()
+        if 'task_status' in engine.shipyard_data.columns else {},
+        'resource_utilization': engine.resource_pool.utilization(),
+    }
+    if trace_memory:
+        # The engine resets the tracemalloc peak around each phase and keeps the highest one
+        peak = max(tracemalloc.get_traced_memory()[1], engine.instrumentation.traced_peak_bytes)
+        report['peak_traced_memory_mb'] = peak / 2 ** 20
+        tracemalloc.stop()
+    report['peak_rss_mb'] = _peak_rss_mb()
+    return report
+
+
+def format_report(report: dict) -> str:
+    """
+    Formats a run_batch report as a short human-readable summary.
+    """
+    lines = [
+        f"Steps run:        {report['steps']} (stopped: {report['stop_reason']})",
+        f"Simulation time:  {report['current_time']}",
+        f"Wall time:        {report['wall_seconds']:.3f} s",
+        f"Throughput:       {report['steps_per_second']:.2f} steps/s",
+    ]
+    for phase, seconds in report['seconds_per_step'].items():
+        lines.append(f"  {phase:<24} {seconds * 1000:10.3f} ms/step")
+    lines.append(f"Status counts:    {report['status_counts']}")
+    if report.get('peak_traced_memory_mb') is not None:
+        lines.append(f"Peak traced heap: {report['peak_traced_memory_mb']:.1f} MB")
+    if report.get('peak_rss_mb') is not None:
+        lines.append(f"Peak RSS:         {report['peak_rss_mb']:.1f} MB")
+    return "\n".join(lines)
+
+
+def _peak_rss_mb():
+    """
+    Gets the process's peak resident set size in MB, or None where the platform does not report it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def main(argv=None):
+    """
+    Command-line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Run the digital twin simulation headless.")
+    parser.add_argument('--shipyard', default="Digital_Shipyard_50k_With_Attacks.csv",
+                        help="Shipyard dataset (file name in datasets/ or a path).")
+    parser.add_argument('--supply-chain', default="Supply_Chain_50k_With_Attacks.csv",
+                        help="Supply chain dataset (file name in datasets/ or a path).")
+    parser.add_argument('--time-step', type=float, default=1)
+    parser.add_argument('--steps', type=int, help="Run exactly this many steps.")
+    parser.add_argument('--until-time', type=float, help="Run until the simulation clock reaches this time.")
+    parser.add_argument('--until-complete', action='store_true',
+                        help="Run until no work order is Pending or In Progress.")
+    parser.add_argument('--max-steps', type=int, help="Upper bound on steps for --until-* runs.")
+    parser.add_argument('--jump', action='store_true', help="Skip idle steps up to the next queued event.")
+    parser.add_argument('--row-wise', action='store_true', help="Use the row-by-row agent code paths.")
+    parser.add_argument('--agents', nargs='+', help="Registered agents to run (default: all).")
+    parser.add_argument('--trace-memory', action='store_true', help="Track peak Python heap with tracemalloc.")
+    parser.add_argument('--json', help="Also write the report to this JSON file.")
+    parser.add_argument('--metrics-file', help="Write per-phase timing histograms here in Prometheus text format.")
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args(argv)
+
+    if args.steps is None and args.until_time is None and not args.until_complete and args.max_steps is None:
+        parser.error("give --steps, --until-time, --until-complete or --max-steps")
+
+    logging.basicConfig(level=args.log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    shipyard_data = load_dataset(args.shipyard)
+    supply_chain_data = load_dataset(args.supply_chain)
+    if shipyard_data is None or supply_chain_data is None:
+        print("Failed to load datasets. Please check the data files.", file=sys.stderr)
+        return 1
+
+    engine = SimulationEngine(shipyard_data, supply_chain_data, time_step=args.time_step,
+                              vectorized=not args.row_wise, agents=args.agents)
+    report = run_batch(engine, steps=args.steps, until_time=args.until_time, until_complete=args.until_complete,
+                       max_steps=args.max_steps, jump_to_next_event=args.jump, trace_memory=args.trace_memory)
+    print(format_report(report))
+    if args.metrics_file:
+        engine.write_metrics(args.metrics_file)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""
+Checkpoint, restore and fork the full state of a SimulationEngine.
+
+A checkpoint directory holds a chain of numbered checkpoints. Each one is a small JSON header
+(clock, step count, event queue, resource pool leases) plus Arrow IPC files for the frames:
+    000000.json, 000000-shipyard_data.arrow, 000000-supply_chain_data.arrow   (full)
+    000001.json, 000001-shipyard_data.arrow, ...                               (delta)
+A full checkpoint stores both frames. A delta stores only the work order rows whose status or
+resource IDs changed since the previous checkpoint, and the supply chain rows written through
+SimulationEngine.update_supply_chain_rows. Other edits to the frames are only captured by a full
+checkpoint. Arrow files are uncompressed, so restore memory-maps them instead of parsing.
+
+Timestamps in queued events are stored as ISO strings and NumPy values as plain Python values, so
+they come back in those forms. Trace counter totals are kept. The agents' incremental caches are
+not: the first pass of a restored or forked engine re-examines every work order, which gives the
+same results. The anomaly detector's statistics are not kept either (see AnomalyDetector).
+"""
+import collections
+import copy
+import datetime
+import itertools
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.simulation.simulation_engine import SimulationEngine
+from src.utils.resource_pool import RESOURCE_COLUMNS, ResourcePool
+
+FORMAT_VERSION = 1
+
+# Name of the row position column in delta files
+POSITION_COLUMN = '__position__'
+
+FRAME_NAMES = ('shipyard_data', 'supply_chain_data')
+
+
+class Checkpointer:
+    """
+    Writes a chain of full and incremental checkpoints of one engine into a directory.
+    """
+
+    def __init__(self, engine: SimulationEngine, directory: str, full_every: int = 0):
+        """
+        Initializes the Checkpointer.
+
+        Args:
+            engine (SimulationEngine): Engine to checkpoint.
+            directory (str): Checkpoint directory (created if missing). Existing checkpoints are
+                kept; new ones continue their numbering and start with a full checkpoint.
+            full_every (int): Write a full checkpoint every this many checkpoints (0 = only the first).
+        """
+        self.logger = logging.getLogger(__name__)
+        self.engine = engine
+        self.directory = directory
+        self.full_every = full_every
+        os.makedirs(directory, exist_ok=True)
+        existing = list_checkpoints(directory)
+        self.sequence = existing[-1] + 1 if existing else 0
+        self._base = None  # Sequence number of the last full checkpoint written by this Checkpointer
+        self._saved_codes = None  # Store codes as of the last checkpoint, diffed for the next delta
+
+    def save(self, full: bool = False) -> str:
+        """
+        Writes the next checkpoint; returns the path of its header.
+
+        Args:
+            full (bool): Write both frames completely even if a delta would do.
+        """
+        engine = self.engine
+        store = engine.store
+        sequence = self.sequence
+        full = full or self._base is None or (self.full_every and sequence - self._base >= self.full_every) \
+            or len(engine.supply_chain_dirty) != len(engine.supply_chain_data)
+
+        header = _engine_header(engine)
+        header['sequence'] = sequence
+        if full:
+            header['kind'] = 'full'
+            header['parent'] = None
+            for name in FRAME_NAMES:
+                header[name] = self._write_frame(sequence, name, getattr(engine, name))
+        else:
+            header['kind'] = 'delta'
+            header['parent'] = sequence - 1
+            changed = np.zeros(len(store), dtype=bool)
+            for column, codes in self._current_codes().items():
+                changed |= codes != self._saved_codes[column]
+            positions = np.flatnonzero(changed)
+            columns = ['task_status'] + list(RESOURCE_COLUMNS.values())
+            header['shipyard_data'] = self._write_rows(sequence, 'shipyard_data', engine.shipyard_data[columns],
+                                                       positions)
+            supply_positions = np.flatnonzero(engine.supply_chain_dirty)
+            header['supply_chain_data'] = self._write_rows(sequence, 'supply_chain_data', engine.supply_chain_data,
+                                                           supply_positions)
+
+        path = os.path.join(self.directory, f"{sequence:06d}.json")
+        tmp_path = path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(header, f, default=_json_default)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, path)  # The header is written last, so a checkpoint is complete once it exists
+        # Only a complete checkpoint becomes the baseline of the next delta
+        self._saved_codes = {column: codes.copy() for column, codes in self._current_codes().items()}
+        engine.supply_chain_dirty[:] = False
+        if full:
+            self._base = sequence
+        self.sequence += 1
+        self.logger.info("Wrote %s checkpoint %d at time %s", header['kind'], sequence, engine.current_time)
+        return path
+
+    def _current_codes(self) -> dict:
+        store = self.engine.store
+        return {'task_status': store.status, **store.resource_codes}
+
+    def _write_frame(self, sequence: int, name: str, frame: pd.DataFrame) -> dict:
+        """
+        Writes a whole frame as an Arrow IPC file; returns its header entry.
+        """
+        file_name = f"{sequence:06d}-{name}.arrow"
+        _write_table(pa.Table.from_pandas(frame, preserve_index=True), os.path.join(self.directory, file_name))
+        return {'file': file_name, 'rows': len(frame)}
+
+    def _write_rows(self, sequence: int, name: str, frame: pd.DataFrame, positions: np.ndarray) -> dict:
+        """
+        Writes the given rows of a frame plus their positions as an Arrow IPC file; returns its header entry.
+        """
+        file_name = f"{sequence:06d}-{name}.arrow"
+        rows = frame.iloc[positions].reset_index(drop=True)
+        rows.insert(0, POSITION_COLUMN, positions.astype(np.int64))
+        _write_table(pa.Table.from_pandas(rows, preserve_index=False), os.path.join(self.directory, file_name))
+        return {'file': file_name, 'rows': len(positions)}
+
+
+def list_checkpoints(directory: str) -> list:
+    """
+    Lists the sequence numbers of the complete checkpoints in a directory, in order.
+    """
+    if not os.path.isdir(directory):
+        return []
+    return sorted(int(name[:-5]) for name in os.listdir(directory)
+                  if name.endswith('.json') and name[:-5].isdigit())
+
+
+def restore(directory: str, sequence: int = None, **engine_options) -> SimulationEngine:
+    """
+    Rebuilds an engine from a checkpoint (the latest one by default).
+
+    The frames of the last full checkpoint at or before sequence are memory-mapped, the deltas up
+    to sequence are applied on top, and the clock, event queue and resource pool come from its header.
+
+    Args:
+        directory (str): Checkpoint directory.
+        sequence (int): Checkpoint to restore.
+        **engine_options: Extra SimulationEngine arguments (e.g. trace_capacity).
+
+    Raises:
+        FileNotFoundError: If the directory holds no such checkpoint.
+    """
+    available = list_checkpoints(directory)
+    if sequence is None:
+        if not available:
+            raise FileNotFoundError(f"No checkpoints in {directory}")
+        sequence = available[-1]
+    if sequence not in available:
+        raise FileNotFoundError(f"Checkpoint {sequence} not found in {directory}")
+
+    chain = []
+    current = sequence
+    while current is not None:
+        header = _read_header(directory, current)
+        chain.append(header)
+        current = header['parent']
+    chain.reverse()
+
+    base = chain[0]
+    frames = {name: _read_table(os.path.join(directory, base[name]['file'])).to_pandas() for name in FRAME_NAMES}
+    engine = _engine_from_header(frames['shipyard_data'], frames['supply_chain_data'], chain[-1], engine_options)
+    for header in chain[1:]:
+        _apply_delta(engine, directory, header)
+    logging.getLogger(__name__).info("Restored checkpoint %d (%d deltas) at time %s", sequence, len(chain) - 1,
+                                     engine.current_time)
+    return engine
+
+
+def fork(engine: SimulationEngine, **engine_options) -> SimulationEngine:
+    """
+    Creates an independent engine in the same state (clock, queue, pool, frames) without touching disk.
+    """
+    shipyard_data = pa.Table.from_pandas(engine.shipyard_data, preserve_index=True).to_pandas()
+    supply_chain_data = pa.Table.from_pandas(engine.supply_chain_data, preserve_index=True).to_pandas()
+    header = copy.deepcopy(_engine_header(engine))
+    return _engine_from_header(shipyard_data, supply_chain_data, header, engine_options)
+
+
+def _engine_header(engine: SimulationEngine) -> dict:
+    """
+    Collects the non-frame state of an engine.
+    """
+    return {
+        'version': FORMAT_VERSION,
+        'current_time': engine.current_time,
+        'time_step': engine.time_step,
+        'step_count': engine.step_count,
+        'vectorized': engine.vectorized,
+        'incremental': engine.incremental,
+        'agents': engine.agent_names,
+        'event_queue': [list(entry) for entry in sorted(engine.event_queue, key=lambda entry: entry[:2])],
+        'untimed_events': engine.untimed_events,
+        'events_processed': engine.events_processed,
+        'resource_pool': engine.resource_pool.get_state(),
+        'trace_totals': [[event, key, count] for (event, key), count in engine.trace.totals.items()],
+    }
+
+
+def _engine_from_header(shipyard_data: pd.DataFrame, supply_chain_data: pd.DataFrame, header: dict,
+                        engine_options: dict) -> SimulationEngine:
+    """
+    Builds an engine on restored frames and sets its clock, queue and pool from a header.
+    """
+    if header.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {header.get('version')}")
+    options = {'time_step': header['time_step'], 'vectorized': header['vectorized'],
+               'incremental': header.get('incremental', True), 'agents': header.get('agents')}
+    options.update(engine_options)
+    engine = SimulationEngine(shipyard_data, supply_chain_data,
+                              resource_pool=ResourcePool.from_state(header['resource_pool']), **options)
+    engine.current_time = header['current_time']
+    engine.step_count = header['step_count']
+    # A sorted list is a valid heap; sequence numbers continue after the highest restored one
+    engine.event_queue = [(event_time, sequence, event) for event_time, sequence, event in header['event_queue']]
+    engine.untimed_events = list(header['untimed_events'])
+    last_sequence = max((entry[1] for entry in engine.event_queue), default=-1)
+    engine._event_sequence = itertools.count(last_sequence + 1)
+    engine.events_processed = header.get('events_processed', 0)
+    engine.trace.totals = collections.Counter({(event, key): count
+                                               for event, key, count in header.get('trace_totals', [])})
+    engine.trace.step = engine.step_count
+    return engine
+
+
+def _apply_delta(engine: SimulationEngine, directory: str, header: dict):
+    """
+    Writes the rows stored in a delta checkpoint into the engine's store and supply chain frame.
+    """
+    store = engine.store
+    rows = _read_table(os.path.join(directory, header['shipyard_data']['file'])).to_pandas()
+    if len(rows):
+        positions = rows[POSITION_COLUMN].to_numpy()
+        labels = rows['task_status'].astype(object)
+        codes = store.status_dtype.categories.get_indexer(labels).astype(np.int8)
+        codes[labels.isna().to_numpy()] = -1
+        store.set_status(positions, codes)
+        for column in RESOURCE_COLUMNS.values():
+            ids = rows[column].astype(object)
+            codes = store.resource_dtypes[column].categories.get_indexer(ids)
+            codes[ids.isna().to_numpy()] = -1
+            store.resource_codes[column][positions] = codes
+        engine.dependency_graph.sync()
+
+    rows = _read_table(os.path.join(directory, header['supply_chain_data']['file'])).to_pandas()
+    if len(rows):
+        data = engine.supply_chain_data
+        positions = rows[POSITION_COLUMN].to_numpy()
+        for column in rows.columns.drop(POSITION_COLUMN):
+            data.iloc[positions, data.columns.get_loc(column)] = rows[column].to_numpy()
+        engine.delay_index.refresh_rows(data.index[positions])
+
+
+def _read_header(directory: str, sequence: int) -> dict:
+    with open(os.path.join(directory, f"{sequence:06d}.json")) as f:
+        return json.load(f)
+
+
+def _write_table(table: pa.Table, path: str):
+    """
+    Writes an uncompressed (memory-mappable) Arrow IPC file.
+    """
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_table(path: str) -> pa.Table:
+    """
+    Memory-maps an Arrow IPC file.
+    """
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+
+def _json_default(value):
+    """
+    Converts NumPy scalars and arrays in headers to plain Python values, and timestamps to ISO strings.
+    """
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, (datetime.date, datetime.time)):  # Includes pd.Timestamp
+        return value.isoformat()
+    if isinstance(value, np.datetime64):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, (datetime.timedelta, np.timedelta64)):
+        return pd.Timedelta(value).isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot store {type(value).__name__} in a checkpoint header: {value!r}")
+
+
+if __name__ == "__main__":
+    # Configure logging (you might want to do this at the app level)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.getLogger('src.agents').setLevel(logging.WARNING)
+
+    # Example usage: checkpoint a run, restore it mid-way and fork a what-if branch
+    import tempfile
+    shipyard_data = pd.DataFrame({
+        'work_order_id': [1, 2, 3],
+        'task_status': ['Pending', 'In Progress', 'Pending'],
+        'linked_shipyard_event': ['event1', None, 'event2'],
+        'tasks_done': [True, True, False],
+    })
+    supply_chain_data = pd.DataFrame({
+        'linked_shipyard_event': ['event9'],
+        'delay_reason': ['Supply Delay'],
+    })
+    engine = SimulationEngine(shipyard_data, supply_chain_data)
+    engine.add_event({'type': 'shipyard_equipment_failure', 'equipment_id': 'crane1', 'time': 5})
+    with tempfile.TemporaryDirectory() as directory:
+        checkpointer = Checkpointer(engine, directory)
+        for _ in range(3):
+            engine.run_simulation_step()
+            checkpointer.save()
+        restored = restore(directory, sequence=1)
+        print(restored.current_time, restored.shipyard_data['task_status'].tolist(), len(restored.event_queue))
+    branch = fork(engine)
+    branch.run_n_steps(2)
+    print(engine.current_time, branch.current_time)
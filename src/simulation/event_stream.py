@@ -0,0 +1,479 @@
+"""
+Streaming event ingestion for the simulation engine.
+
+An EventStream runs a record source (a tailed CSV/JSONL file, a local socket or a dataset replay)
+on a background thread, converts records to events and hands them over in batches through a
+bounded queue. When the engine falls behind, the queue fills up and the reader blocks, so memory
+stays bounded (max_batches x batch_size events). The engine drains attached streams at the start
+of every step, in SimulationEngine.begin_step, taking at most its max_polled_events per step
+(SimulationEngine.add_event_source).
+
+Sources are generators that yield record dicts, or None while they are idle (so a partial batch
+can be delivered instead of waiting for batch_size records).
+"""
+import csv
+import io
+import itertools
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.utils.parsing import is_missing
+
+# Equipment status values (lower-cased substrings) that turn a replayed row into an equipment failure
+FAILURE_STATUSES = ('fail', 'fault', 'broken', 'down')
+
+# Columns holding the equipment a failed shipyard row refers to, in order of preference
+EQUIPMENT_COLUMNS = ('equipment_id', 'crane_id', 'agv_id', 'forklift_id')
+
+# attack_type values (lower-cased) that do not mark a row as an attack
+NO_ATTACK_TYPES = ('', 'none', 'normal')
+
+# Rows converted to record dicts at a time when replaying a dataset
+REPLAY_CHUNK_ROWS = 10_000
+
+
+class EventStream:
+    """
+    Reads records from a source on a background thread and delivers them as batches of events.
+    """
+
+    def __init__(self, source, to_event=None, batch_size: int = 1000, max_batches: int = 16, name: str = None):
+        """
+        Initializes the EventStream.
+
+        Args:
+            source: Callable taking a threading.Event (set when the stream stops) and returning an
+                iterator of record dicts or None (idle), e.g. tail_jsonl(path).
+            to_event: Converts a record to an event dict, or None to drop it (defaults to record_to_event).
+            batch_size (int): Events per batch handed to the engine.
+            max_batches (int): Batches buffered before the reader blocks (backpressure).
+            name (str): Name used in logs and for the reader thread.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.source = source
+        self.to_event = to_event or record_to_event
+        self.batch_size = batch_size
+        self.name = name or getattr(source, '__name__', 'event-stream')
+        self._queue = queue.Queue(maxsize=max_batches)
+        self._stop = threading.Event()
+        self._thread = None
+        self.finished = False  # Set once the source is exhausted and every batch has been queued
+        self.error = None  # Exception that ended the reader thread, if any
+        self.records_read = 0
+        self.events_delivered = 0
+        self.dropped_records = 0
+        self.blocked_seconds = 0.0  # Time the reader spent waiting for the engine
+
+    def start(self) -> 'EventStream':
+        """
+        Starts the reader thread; returns self.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stops the reader thread (buffered batches can still be polled).
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def poll(self, max_events: int = None) -> list:
+        """
+        Returns the events buffered so far without blocking (at most about max_events).
+        """
+        events = []
+        while max_events is None or len(events) < max_events:
+            try:
+                events.extend(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self.events_delivered += len(events)
+        return events
+
+    @property
+    def exhausted(self) -> bool:
+        """
+        True once the source has ended and every event has been polled.
+        """
+        return self.finished and self._queue.empty()
+
+    def _run(self):
+        batch = []
+        try:
+            for record in self.source(self._stop):
+                if self._stop.is_set():
+                    break
+                if record is not None:
+                    self.records_read += 1
+                    event = self.to_event(record)
+                    if event is None:
+                        self.dropped_records += 1
+                    else:
+                        batch.append(event)
+                if batch and (record is None or len(batch) >= self.batch_size):
+                    self._put(batch)
+                    batch = []
+            if batch:
+                self._put(batch)
+        except Exception as e:
+            self.error = e
+            self.logger.error("Event stream %s failed: %s", self.name, e)
+        finally:
+            self.finished = True
+
+    def _put(self, batch: list):
+        """
+        Queues a batch, blocking while the queue is full (unless the stream is stopped).
+        """
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                self._queue.put(batch, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self.blocked_seconds += time.perf_counter() - start
+
+
+def record_to_event(record: dict) -> dict:
+    """
+    Default conversion: the record is the event; a numeric string 'time' is parsed and
+    'event_type' is used as 'type' when the record has none.
+    """
+    return _normalize_event(dict(record))
+
+
+def _normalize_event(event: dict) -> dict:
+    """
+    Applies record_to_event's 'time'/'type' normalization to an event dict in place.
+    """
+    if isinstance(event.get('time'), str):
+        try:
+            event['time'] = float(event['time'])
+        except ValueError:
+            event['time'] = None
+    if 'type' not in event and 'event_type' in event:
+        event['type'] = event['event_type']
+    return event
+
+
+def tail_jsonl(path: str, follow: bool = True, poll_interval: float = 0.2, from_start: bool = True):
+    """
+    Source that reads JSON objects, one per line, from a file and keeps following it as it grows.
+
+    Args:
+        path (str): File to read.
+        follow (bool): Wait for new lines at end of file instead of stopping.
+        poll_interval (float): Seconds between checks for new data while following.
+        from_start (bool): Read existing lines first; False starts at the current end of file.
+    """
+    def source(stop: threading.Event):
+        for line in _tail_lines(path, stop, follow, poll_interval, from_start):
+            if line is None:
+                yield None
+                continue
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logging.getLogger(__name__).warning("Skipping malformed JSON line in %s", path)
+    source.__name__ = f"tail:{os.path.basename(path)}"
+    return source
+
+
+def tail_csv(path: str, follow: bool = True, poll_interval: float = 0.2, from_start: bool = True):
+    """
+    Source that reads CSV rows (as dicts keyed by the header) from a file and keeps following it.
+
+    The first line of the file is always used as the header, even when from_start is False.
+    """
+    def source(stop: threading.Event):
+        with open(path, newline='') as f:
+            header = next(csv.reader([f.readline()]))
+        for line in _tail_lines(path, stop, follow, poll_interval, from_start, skip_first=True):
+            if line is None:
+                yield None
+                continue
+            values = next(csv.reader(io.StringIO(line)), None)
+            if values:
+                yield dict(zip(header, values))
+    source.__name__ = f"tail:{os.path.basename(path)}"
+    return source
+
+
+def read_socket(address, poll_interval: float = 0.2):
+    """
+    Source that connects to a local socket and reads JSON objects, one per line.
+
+    Args:
+        address: (host, port) for TCP or a filesystem path for a Unix domain socket.
+        poll_interval (float): Receive timeout; the source reports idle after each timeout.
+    """
+    def source(stop: threading.Event):
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        with socket.socket(family, socket.SOCK_STREAM) as connection:
+            connection.connect(address)
+            connection.settimeout(poll_interval)
+            pending = b''
+            while not stop.is_set():
+                try:
+                    chunk = connection.recv(65536)
+                except socket.timeout:
+                    yield None
+                    continue
+                if not chunk:  # Peer closed the connection
+                    break
+                pending += chunk
+                *lines, pending = pending.split(b'\n')
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+            if pending.strip():
+                yield json.loads(pending)
+    source.__name__ = f"socket:{address}"
+    return source
+
+
+def replay_dataset(data: pd.DataFrame, time_column: str = 'timestamp', speedup: float = None,
+                   seconds_per_time_unit: float = 1.0, rows_per_time_unit: float = 1.0, to_records=None):
+    """
+    Source that replays the rows of a dataset (e.g. Digital_Shipyard_50k_With_Attacks.csv) in time order.
+
+    Each record gets a simulation 'time': seconds since the first timestamp divided by
+    seconds_per_time_unit, or, if the dataset has no time_column, the row position divided by
+    rows_per_time_unit. With speedup set, records are released at that multiple of real time
+    (one simulation time unit = seconds_per_time_unit / speedup wall seconds); otherwise as fast
+    as the engine takes them. Rows are converted to records REPLAY_CHUNK_ROWS at a time, so the
+    replay holds at most one chunk of records besides the dataset itself.
+
+    to_records(chunk) converts a chunk of rows to an iterable of one dict per row; it defaults to
+    the row's values by column name (see replay_shipyard_events for a converting one).
+    """
+    if time_column in data.columns:
+        timestamps = pd.to_datetime(data[time_column], errors='coerce').reset_index(drop=True)
+        positions = timestamps.sort_values(kind='stable').index.to_numpy()  # Missing timestamps last
+        elapsed = (timestamps - timestamps.min()).dt.total_seconds()
+        times = (elapsed / seconds_per_time_unit).to_numpy(dtype=float)[positions]
+    else:
+        positions = np.arange(len(data))
+        times = positions / rows_per_time_unit
+    to_records = to_records or _chunk_records
+
+    def source(stop: threading.Event):
+        start = time.perf_counter()
+        for chunk_start in range(0, len(positions), REPLAY_CHUNK_ROWS):
+            chunk = data.iloc[positions[chunk_start:chunk_start + REPLAY_CHUNK_ROWS]]
+            chunk_times = times[chunk_start:chunk_start + REPLAY_CHUNK_ROWS].tolist()  # Python floats
+            for record, sim_time in zip(to_records(chunk), chunk_times):
+                if stop.is_set():
+                    return
+                if sim_time != sim_time:  # Missing timestamp
+                    continue
+                if speedup:
+                    wait = sim_time * seconds_per_time_unit / speedup - (time.perf_counter() - start)
+                    if wait > 0:
+                        yield None  # Deliver what is buffered before sleeping
+                        stop.wait(wait)
+                record['time'] = sim_time
+                yield record
+    source.__name__ = 'replay'
+    return source
+
+
+def replay_shipyard_events(data: pd.DataFrame, **replay_options):
+    """
+    Source that replays a shipyard dataset as engine events, like replay_dataset followed by
+    shipyard_row_to_event on every record.
+
+    Rows are classified a chunk at a time with column operations instead of one record at a
+    time, which makes the replay several times cheaper per row. Takes replay_dataset's options.
+    """
+    return replay_dataset(data, to_records=_shipyard_chunk_events, **replay_options)
+
+
+def _chunk_records(chunk: pd.DataFrame):
+    """
+    Yields the rows of a chunk as dicts keyed by column name.
+    """
+    names = list(chunk.columns)
+    columns = [chunk[name].to_numpy(dtype=object) for name in names]
+    for values in zip(*columns):
+        yield dict(zip(names, values))
+
+
+def shipyard_row_to_event(record: dict) -> dict:
+    """
+    Converts a shipyard dataset row into an engine event.
+
+    Rows whose equipment_status indicates a failure become 'shipyard_equipment_failure' events for
+    their equipment_id (or assigned crane/AGV/forklift); rows flagged as attacks become
+    'security_attack'; everything else keeps its event_type ('shipyard_event' if none).
+    Missing values are left out of the event.
+    """
+    # Same test as is_missing (plus NaT), inlined: this runs once per field of every replayed row.
+    # The filtered dict is already a copy, so it is normalized in place rather than via record_to_event.
+    event = _normalize_event({key: value for key, value in record.items()
+                              if not (value is None or value is pd.NA or value is pd.NaT
+                                      or (value.__class__ is float and value != value))})
+    status = record.get('equipment_status')
+    status = str(status).lower() if status is not None else ''
+    attack_type = record.get('attack_type')
+    if status and any(word in status for word in FAILURE_STATUSES):
+        event['type'] = 'shipyard_equipment_failure'
+        for column in EQUIPMENT_COLUMNS:
+            if not is_missing(record.get(column)):
+                event['equipment_id'] = record[column]
+                break
+    elif _flag(record.get('attack_flag')) or _flag(record.get('is_attack')) or \
+            (not is_missing(attack_type) and str(attack_type).lower() not in NO_ATTACK_TYPES):
+        event['type'] = 'security_attack'
+    else:
+        event.setdefault('type', 'shipyard_event')
+    return event
+
+
+def _shipyard_chunk_events(chunk: pd.DataFrame):
+    """
+    Yields shipyard_row_to_event(row) for every row of a chunk, classifying the rows column-wise.
+    """
+    names = [name for name in chunk.columns if name != 'type']
+    columns = {name: chunk[name].to_numpy(dtype=object) for name in names}
+    missing = {name: pd.isna(values) for name, values in columns.items()}
+
+    def present(name: str) -> np.ndarray:
+        return ~missing[name] if name in missing else np.zeros(len(chunk), dtype=bool)
+
+    types = np.full(len(chunk), 'shipyard_event', dtype=object)
+    for name in ('event_type', 'type'):  # An explicit 'type' wins over event_type
+        if name in chunk.columns:
+            values = chunk[name].to_numpy(dtype=object)
+            rows = ~pd.isna(values)
+            types[rows] = values[rows]
+    attacked = np.zeros(len(chunk), dtype=bool)
+    for name in ('attack_flag', 'is_attack'):
+        if name in chunk.columns:
+            attacked |= _flags(chunk[name])
+    if 'attack_type' in chunk.columns:
+        attack_types = chunk['attack_type'].astype(str).str.lower()
+        attacked |= present('attack_type') & ~attack_types.isin(NO_ATTACK_TYPES).to_numpy()
+    types[attacked] = 'security_attack'
+    if 'equipment_status' in chunk.columns:
+        failed = chunk['equipment_status'].astype(str).str.lower() \
+            .str.contains('|'.join(FAILURE_STATUSES), regex=True).to_numpy() & present('equipment_status')
+        types[failed] = 'shipyard_equipment_failure'
+        # A failed row's equipment_id is its first present equipment/crane/AGV/forklift column
+        equipment = np.full(len(chunk), None, dtype=object)
+        found = np.zeros(len(chunk), dtype=bool)
+        for name in reversed(EQUIPMENT_COLUMNS):
+            rows = present(name)
+            if rows.any():
+                equipment[rows] = columns[name][rows]
+                found |= rows
+        rows = failed & found
+        if rows.any():
+            if 'equipment_id' not in columns:
+                names.append('equipment_id')
+                columns['equipment_id'] = np.full(len(chunk), None, dtype=object)
+                missing['equipment_id'] = np.ones(len(chunk), dtype=bool)
+            columns['equipment_id'] = np.where(rows, equipment, columns['equipment_id'])
+            missing['equipment_id'] = missing['equipment_id'] & ~rows
+
+    # Columns without missing values in this chunk go straight into the dict; the others per value
+    dense = [name for name in names if not missing[name].any()]
+    sparse = [(name, columns[name], missing[name]) for name in names if name not in dense and not missing[name].all()]
+    rows = zip(*[columns[name] for name in dense]) if dense else itertools.repeat(())
+    for row, (values, event_type) in enumerate(zip(rows, types)):
+        event = dict(zip(dense, values))
+        for name, column, absent in sparse:
+            if not absent[row]:
+                event[name] = column[row]
+        event['type'] = event_type
+        yield event
+
+
+def _flag(value) -> bool:
+    """
+    Interprets a CSV/JSON flag value ('1', 'true', 'yes', True, 1) as a bool.
+    """
+    if value is True or value is False:  # Bool columns, the common case when replaying a frame
+        return value
+    if is_missing(value):
+        return False
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'y')
+    return bool(value)
+
+
+def _flags(series: pd.Series) -> np.ndarray:
+    """
+    Applies _flag to every value of a column.
+    """
+    if series.dtype == bool:
+        return series.to_numpy()
+    values = series.to_numpy(dtype=object)
+    return np.fromiter(map(_flag, values), dtype=bool, count=len(values))
+
+
+def _tail_lines(path: str, stop: threading.Event, follow: bool, poll_interval: float, from_start: bool,
+                skip_first: bool = False):
+    """
+    Yields complete lines of a growing file, and None whenever no new line is available yet.
+    """
+    with open(path, newline='') as f:
+        if skip_first:
+            f.readline()
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        pending = ''
+        while not stop.is_set():
+            line = f.readline()
+            if line.endswith('\n'):
+                yield pending + line
+                pending = ''
+            elif line:
+                pending += line  # Writer is mid-line; wait for the rest
+            elif not follow:
+                break
+            else:
+                yield None
+                stop.wait(poll_interval)
+        if pending and not follow:
+            yield pending
+
+
+if __name__ == "__main__":
+    # Configure logging (you might want to do this at the app level)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.getLogger('src.agents').setLevel(logging.WARNING)
+
+    # Example usage: replay a few time-stamped shipyard rows into an engine at 3600x real time
+    from src.simulation.simulation_engine import SimulationEngine
+    shipyard_data = pd.DataFrame({
+        'work_order_id': [1, 2, 3],
+        'task_status': ['Pending', 'In Progress', 'Pending'],
+        'timestamp': ['2024-01-01 08:00', '2024-01-01 08:30', '2024-01-01 09:00'],
+        'equipment_status': ['Operational', 'Failure', 'Operational'],
+        'crane_id': [None, 'crane1', None],
+        'attack_type': [None, None, 'GPS Spoofing'],
+    })
+    supply_chain_data = pd.DataFrame({'linked_shipyard_event': ['event9'], 'delay_reason': ['Supply Delay']})
+    engine = SimulationEngine(shipyard_data, supply_chain_data, time_step=600)
+    stream = EventStream(replay_shipyard_events(shipyard_data, speedup=3600)).start()
+    engine.add_event_source(stream)
+    while not stream.exhausted or engine.event_queue:
+        engine.run_simulation_step()
+        time.sleep(0.1)
+    stream.stop()
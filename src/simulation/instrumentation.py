@@ -0,0 +1,233 @@
+"""
+Per-phase profiling for the simulation engine.
+
+Every agent call and every handled event runs inside Instrumentation.measure(), which records wall
+and CPU time histograms, the number of work order rows the phase wrote to the state store and, while
+tracemalloc is tracing, the memory the phase allocated. Pre/post hooks can be attached per agent and
+per event type. The collected metrics are available as a dict and as Prometheus text exposition.
+"""
+import bisect
+import logging
+import os
+import time
+import tracemalloc
+
+# Upper bounds (seconds) of the timing histogram buckets; a final +Inf bucket is implicit
+TIMING_BUCKETS = (0.00001, 0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+
+# Prefix of the phase name used for event handling, e.g. 'event:supply_chain_delay'
+EVENT_PHASE_PREFIX = 'event:'
+
+
+class PhaseStats:
+    """
+    Accumulated measurements of one phase (an agent, the event loop or one event type).
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.rows_touched = 0
+        self.allocated_bytes = 0
+        self.peak_bytes = 0
+        self.wall_buckets = [0] * (len(TIMING_BUCKETS) + 1)
+        self.cpu_buckets = [0] * (len(TIMING_BUCKETS) + 1)
+
+    def add(self, wall: float, cpu: float, rows: int):
+        """
+        Adds one call's wall time, CPU time and rows touched.
+        """
+        self.calls += 1
+        self.wall_seconds += wall
+        self.cpu_seconds += cpu
+        self.rows_touched += rows
+        self.wall_buckets[bisect.bisect_left(TIMING_BUCKETS, wall)] += 1
+        self.cpu_buckets[bisect.bisect_left(TIMING_BUCKETS, cpu)] += 1
+
+    def to_dict(self) -> dict:
+        """
+        Summarizes the phase; histograms are cumulative per bucket upper bound, like Prometheus.
+        """
+        return {
+            'calls': self.calls,
+            'wall_seconds': self.wall_seconds,
+            'cpu_seconds': self.cpu_seconds,
+            'mean_wall_seconds': self.wall_seconds / self.calls if self.calls else 0.0,
+            'rows_touched': self.rows_touched,
+            'allocated_bytes': self.allocated_bytes,
+            'peak_bytes': self.peak_bytes,
+            'wall_histogram': _cumulative(self.wall_buckets),
+            'cpu_histogram': _cumulative(self.cpu_buckets),
+        }
+
+
+class Instrumentation:
+    """
+    Collects per-phase timings and runs the registered pre/post hooks around each phase.
+
+    Hooks are called as pre(phase, target) and post(phase, target, sample), where target is the
+    agent, the event dict or, for event types handled in one grouped update, the list of due
+    events, and sample holds the call's 'wall', 'cpu', 'rows' and 'allocated'.
+    """
+
+    def __init__(self, store=None):
+        """
+        Initializes the Instrumentation.
+
+        Args:
+            store (WorkOrderStore): Store whose rows_written counter gives the rows touched per phase.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.store = store
+        self.phases = {}  # phase -> PhaseStats
+        # Highest tracemalloc peak seen inside any phase; measure() resets the tracemalloc peak per phase
+        self.traced_peak_bytes = 0
+        self._inner_peak = 0  # Highest tracemalloc peak that nested measure() calls reset away from the open phase
+        self._pre_hooks = {}  # phase -> list of callables
+        self._post_hooks = {}
+
+    def add_agent_hook(self, agent_name: str, pre=None, post=None):
+        """
+        Registers hooks run before and/or after an agent's step method.
+        """
+        self._add_hook(agent_name, pre, post)
+
+    def add_event_hook(self, event_type: str, pre=None, post=None):
+        """
+        Registers hooks run before and/or after each event of a type is handled.
+        """
+        self._add_hook(EVENT_PHASE_PREFIX + str(event_type), pre, post)
+
+    def _add_hook(self, phase: str, pre, post):
+        if pre is not None:
+            self._pre_hooks.setdefault(phase, []).append(pre)
+        if post is not None:
+            self._post_hooks.setdefault(phase, []).append(post)
+
+    def measure(self, phase: str, function, target=None, *args):
+        """
+        Calls function(*args) inside the phase's hooks and records its cost.
+
+        Phases may nest (e.g. the event types inside 'events'): the tracemalloc peak an inner
+        phase resets is carried over to the enclosing phase's peak_bytes.
+
+        Returns:
+            The function's return value.
+        """
+        for hook in self._pre_hooks.get(phase, ()):
+            hook(phase, target)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            allocated_before, peak_before = tracemalloc.get_traced_memory()
+            enclosing_peak = max(self._inner_peak, peak_before)  # Peak of the enclosing phase so far
+            self._inner_peak = 0
+            tracemalloc.reset_peak()
+        rows_before = self.store.rows_written if self.store is not None else 0
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+
+        result = function(*args)
+
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        rows = self.store.rows_written - rows_before if self.store is not None else 0
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = PhaseStats()
+        stats.add(wall, cpu, rows)
+        allocated = 0
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self._inner_peak)
+            self._inner_peak = max(enclosing_peak, peak)
+            allocated = current - allocated_before
+            stats.allocated_bytes += allocated
+            stats.peak_bytes = max(stats.peak_bytes, peak - allocated_before)
+            self.traced_peak_bytes = max(self.traced_peak_bytes, peak)
+
+        post_hooks = self._post_hooks.get(phase)
+        if post_hooks:
+            sample = {'wall': wall, 'cpu': cpu, 'rows': rows, 'allocated': allocated}
+            for hook in post_hooks:
+                hook(phase, target, sample)
+        return result
+
+    def wall_totals(self) -> dict:
+        """
+        Returns phase -> total wall seconds.
+        """
+        return {phase: stats.wall_seconds for phase, stats in self.phases.items()}
+
+    def snapshot(self) -> dict:
+        """
+        Returns phase -> summary dict (see PhaseStats.to_dict).
+        """
+        return {phase: stats.to_dict() for phase, stats in self.phases.items()}
+
+    def reset(self):
+        """
+        Drops all collected measurements (hooks stay registered).
+        """
+        self.phases = {}
+        self.traced_peak_bytes = 0
+        self._inner_peak = 0
+
+    def to_prometheus(self, prefix: str = 'digital_twin') -> str:
+        """
+        Renders the measurements in the Prometheus text exposition format.
+        """
+        lines = []
+        metrics = (
+            ('phase_calls_total', 'Number of times the phase ran.', 'calls', 'counter'),
+            ('phase_rows_touched_total', 'Work order rows written by the phase.', 'rows_touched', 'counter'),
+            # Net allocations can be negative, so this one is a gauge
+            ('phase_allocated_bytes', 'Net bytes allocated by the phase while tracemalloc traced.',
+             'allocated_bytes', 'gauge'),
+        )
+        for name, help_text, attribute, metric_type in metrics:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+            for phase, stats in self.phases.items():
+                lines.append(f'{prefix}_{name}{{phase="{_escape(phase)}"}} {getattr(stats, attribute)}')
+        for clock, help_text in (('wall', 'Wall-clock'), ('cpu', 'Process CPU')):
+            name = f"{prefix}_phase_{clock}_seconds"
+            lines.append(f"# HELP {name} {help_text} time per phase call.")
+            lines.append(f"# TYPE {name} histogram")
+            for phase, stats in self.phases.items():
+                label = _escape(phase)
+                buckets = stats.wall_buckets if clock == 'wall' else stats.cpu_buckets
+                for bound, count in zip(list(TIMING_BUCKETS) + ['+Inf'], _cumulative(buckets).values()):
+                    lines.append(f'{name}_bucket{{phase="{label}",le="{bound}"}} {count}')
+                total = stats.wall_seconds if clock == 'wall' else stats.cpu_seconds
+                lines.append(f'{name}_sum{{phase="{label}"}} {total}')
+                lines.append(f'{name}_count{{phase="{label}"}} {stats.calls}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = 'digital_twin'):
+        """
+        Writes to_prometheus() to a file atomically (for a node_exporter textfile collector).
+        """
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(tmp_path, path)
+
+
+def _cumulative(buckets: list) -> dict:
+    """
+    Converts per-bucket counts to cumulative counts keyed by upper bound ('+Inf' last).
+    """
+    result = {}
+    total = 0
+    for bound, count in zip(list(TIMING_BUCKETS) + ['+Inf'], buckets):
+        total += count
+        result[bound] = total
+    return result
+
+
+def _escape(value: str) -> str:
+    """
+    Escapes a Prometheus label value.
+    """
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
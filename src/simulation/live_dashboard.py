@@ -0,0 +1,287 @@
+"""
+Server-side aggregation and a background runner for the live Streamlit dashboard.
+
+LiveMetrics condenses the engine state after every step into a few numbers (work orders per
+status, leased share per resource type, work orders delayed per reason) kept in fixed-size rolling
+buffers. Status counts are maintained incrementally from the rows the step wrote, so recording a
+step costs O(changed rows) rather than O(work orders). A snapshot is downsampled to at most
+max_points time points, so what the page renders stays the same size however large the dataset is.
+
+BackgroundRunner steps the engine on a thread and records every step; the page polls snapshots
+at its own (capped) refresh rate.
+"""
+import logging
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.simulation.simulation_engine import SimulationEngine
+
+# Steps kept in the rolling buffers
+DEFAULT_HISTORY = 2000
+# Time points per chart in a snapshot
+DEFAULT_MAX_POINTS = 200
+
+
+class RollingBuffer:
+    """
+    Ring buffer of fixed-width float rows; the width can grow (new columns read 0 for older rows).
+    """
+
+    def __init__(self, capacity: int, width: int = 0):
+        self.capacity = capacity
+        self._rows = np.zeros((capacity, width))
+        self._next = 0
+        self.size = 0
+
+    @property
+    def width(self) -> int:
+        return self._rows.shape[1]
+
+    def grow(self, width: int):
+        """
+        Widens the rows to width columns.
+        """
+        if width > self.width:
+            self._rows = np.pad(self._rows, ((0, 0), (0, width - self.width)))
+
+    def append(self, row):
+        """
+        Appends a row, overwriting the oldest one when the buffer is full.
+        """
+        self._rows[self._next] = row
+        self._next = (self._next + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def values(self) -> np.ndarray:
+        """
+        Returns a copy of the stored rows, oldest first.
+        """
+        if self.size < self.capacity:
+            return self._rows[:self.size].copy()
+        return np.roll(self._rows, -self._next, axis=0)
+
+
+class LiveMetrics:
+    """
+    Per-step dashboard aggregates of one engine, kept in rolling buffers.
+    """
+
+    def __init__(self, engine: SimulationEngine, history: int = DEFAULT_HISTORY):
+        """
+        Initializes the LiveMetrics and records the engine's current state as the first point.
+
+        Args:
+            engine (SimulationEngine): Engine to observe; record() must run after each of its steps.
+            history (int): Number of steps kept.
+        """
+        self.engine = engine
+        store = engine.store
+        self.statuses = ['(missing)'] + list(store.status_dtype.categories)
+        self.resource_types = list(engine.resource_pool.utilization())
+        self.delay_reasons = []
+        self._changes = store.track_changes()  # Rows written since the last record()
+        self._changes.take()
+        self._status = store.status.copy()  # Status codes as of the last record()
+        self.status_counts = np.bincount(self._status.astype(np.int64) + 1, minlength=len(self.statuses))
+        self._times = RollingBuffer(history, 1)
+        self._status_history = RollingBuffer(history, len(self.statuses))
+        self._utilization = RollingBuffer(history, len(self.resource_types))
+        self._delays = RollingBuffer(history)
+        self._record_point({})
+
+    def record(self):
+        """
+        Adds the state after the engine's latest step.
+        """
+        positions = self._changes.take()
+        if len(positions):
+            new = self.engine.store.status[positions]
+            bins = len(self.statuses)
+            self.status_counts += (np.bincount(new.astype(np.int64) + 1, minlength=bins) -
+                                   np.bincount(self._status[positions].astype(np.int64) + 1, minlength=bins))
+            self._status[positions] = new
+        self._record_point(self.engine.trace.last_counters)
+
+    def active_work_orders(self) -> int:
+        """
+        Counts the work orders that are Pending or In Progress (O(1)).
+        """
+        return int(self.status_counts[self.statuses.index('Pending')] + self.status_counts[self.statuses.index('In Progress')])
+
+    def snapshot(self, max_points: int = DEFAULT_MAX_POINTS) -> dict:
+        """
+        Returns the buffered series downsampled to at most max_points time points.
+
+        Returns:
+            dict: 'status_counts' and 'utilization' (DataFrames indexed by simulation time; bucket
+            means), 'delays' (DataFrame of work orders delayed per reason and time; bucket sums),
+            'current_status' (Series of the latest counts) and 'steps' (points recorded).
+        """
+        times = self._times.values()[:, 0]
+        starts = _bucket_starts(len(times), max_points)
+        index = pd.Index(times[np.r_[starts[1:], len(times)] - 1] if len(times) else [], name='time')
+        counts = pd.Series(self.status_counts, index=self.statuses)
+        return {
+            'status_counts': pd.DataFrame(_bucket_means(self._status_history.values(), starts),
+                                          index=index, columns=self.statuses).loc[:, lambda frame: frame.any()],
+            'utilization': pd.DataFrame(_bucket_means(self._utilization.values(), starts), index=index,
+                                        columns=self.resource_types),
+            'delays': pd.DataFrame(_bucket_sums(self._delays.values(), starts), index=index,
+                                   columns=self.delay_reasons),
+            'current_status': counts[counts > 0],
+            'steps': self._times.size,
+        }
+
+    def _record_point(self, counters: dict):
+        """
+        Appends the current aggregates and the step's delay counters to the buffers.
+        """
+        utilization = self.engine.resource_pool.utilization()
+        delays = {}
+        for (event, key), count in counters.items():
+            if event == 'delayed':
+                delays[str(key)] = delays.get(str(key), 0) + count
+        for reason in delays:
+            if reason not in self.delay_reasons:
+                self.delay_reasons.append(reason)
+        self._delays.grow(len(self.delay_reasons))
+        self._times.append([self.engine.current_time])
+        self._status_history.append(self.status_counts)
+        self._utilization.append([utilization[resource_type]['utilization'] for resource_type in self.resource_types])
+        self._delays.append([delays.get(reason, 0) for reason in self.delay_reasons])
+
+
+class BackgroundRunner:
+    """
+    Runs simulation steps on a background thread and records each one in a LiveMetrics.
+
+    The engine must only be stepped through the runner while it exists: every step runs under
+    self.lock, which readers (snapshots, manual steps) also take.
+    """
+
+    def __init__(self, engine: SimulationEngine, metrics: LiveMetrics = None, steps_per_second: float = None):
+        """
+        Initializes the BackgroundRunner.
+
+        Args:
+            engine (SimulationEngine): Engine to step.
+            metrics (LiveMetrics): Aggregates updated after every step (created if not given).
+            steps_per_second (float): Upper bound on the stepping rate (None = as fast as possible).
+        """
+        self.logger = logging.getLogger(__name__)
+        self.engine = engine
+        self.metrics = metrics if metrics is not None else LiveMetrics(engine)
+        self.steps_per_second = steps_per_second
+        self.lock = threading.RLock()
+        self.error = None  # Exception that ended the thread, if any
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> 'BackgroundRunner':
+        """
+        Starts stepping in the background until stop(), until no work order is active and no
+        event is queued, or until a step changes nothing (the engine is stalled, e.g. pending work
+        orders blocked on resources held by orders that cannot finish); returns self.
+        """
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='simulation-runner', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stops the background thread after its current step.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_steps(self, steps: int):
+        """
+        Runs steps synchronously (e.g. from a button), recording each one.
+        """
+        with self.lock:
+            for _ in range(steps):
+                self.engine.run_simulation_step()
+                self.metrics.record()
+
+    def snapshot(self, max_points: int = DEFAULT_MAX_POINTS) -> dict:
+        """
+        Returns metrics.snapshot() plus the engine clock, taken between steps.
+        """
+        with self.lock:
+            snapshot = self.metrics.snapshot(max_points)
+            snapshot['current_time'] = self.engine.current_time
+            snapshot['step_count'] = self.engine.step_count
+        snapshot['running'] = self.running
+        return snapshot
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                with self.lock:
+                    if not self.metrics.active_work_orders() and not self.engine.event_queue:
+                        self.logger.info("No active work orders or queued events left; stopping")
+                        return
+                    before = self.engine.progress_snapshot()
+                    self.engine.run_simulation_step()
+                    self.metrics.record()
+                    if self.engine.is_stalled(before):
+                        self.logger.info("Simulation stalled at step %d; stopping", self.engine.step_count)
+                        return
+                if self.steps_per_second:
+                    self._stop.wait(max(0.0, 1 / self.steps_per_second - (time.perf_counter() - start)))
+                else:
+                    time.sleep(0)  # Let page reruns take the GIL between steps
+        except Exception as error:
+            self.error = error
+            self.logger.exception("Background simulation runner failed")
+
+
+def _bucket_starts(length: int, max_points: int) -> np.ndarray:
+    """
+    Splits length points into at most max_points consecutive buckets; returns their start positions.
+    """
+    if length <= max_points:
+        return np.arange(length)
+    return np.unique(np.linspace(0, length, max_points, endpoint=False).astype(np.int64))
+
+
+def _bucket_means(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    if not len(starts):
+        return values[:0]
+    return np.add.reduceat(values, starts, axis=0) / np.diff(np.r_[starts, len(values)])[:, None]
+
+
+def _bucket_sums(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    if not len(starts):
+        return values[:0]
+    return np.add.reduceat(values, starts, axis=0)
+
+
+if __name__ == "__main__":
+    # Configure logging (you might want to do this at the app level)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.getLogger('src.agents').setLevel(logging.WARNING)
+    logging.getLogger('src.simulation.simulation_engine').setLevel(logging.WARNING)
+
+    # Example usage: step a small synthetic yard in the background and print downsampled snapshots
+    from src.utils.synthetic_data import generate_datasets
+    shipyard_data, supply_chain_data = generate_datasets(10_000)
+    runner = BackgroundRunner(SimulationEngine(shipyard_data, supply_chain_data), steps_per_second=50).start()
+    for _ in range(3):
+        time.sleep(1)
+        snapshot = runner.snapshot(max_points=5)
+        print(f"time {snapshot['current_time']}, {snapshot['steps']} points")
+        print(snapshot['status_counts'])
+    runner.stop()
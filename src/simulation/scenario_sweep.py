@@ -0,0 +1,201 @@
+"""
+Parallel what-if scenario sweeps over a shared base dataset.
+
+The base shipyard and supply chain frames are written once as Arrow IPC streams into shared memory.
+Each worker process maps them on startup instead of receiving a pickled copy per task, builds a
+fresh engine per scenario from the shared tables, applies the scenario's overrides and returns its
+KPIs. The KPIs of all scenarios are merged into a single results table.
+
+Only the transport is copy-free. Each scenario converts the shared tables to pandas frames, which
+copies them into worker memory (string columns become Python objects). Its engine needs mutable
+state anyway: the WorkOrderStore builds its own copy of the work orders, and supply chain delays
+are written into the supply chain frame. Memory per worker is therefore about one copy of the
+base frames per running scenario, and the conversion is part of each scenario's setup time.
+"""
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import pandas as pd
+import pyarrow as pa
+
+from src.simulation.simulation_engine import SimulationEngine
+from src.utils.resource_pool import ResourcePool
+
+# Scenario keys that are passed through to SimulationEngine.run_until / run_n_steps
+RUN_KEYS = ('steps', 'until_time', 'until_complete', 'max_steps', 'jump_to_next_event')
+
+# Arrow tables attached in each worker process: frame name -> pa.Table
+_shared_tables = {}
+_shared_segments = []
+
+
+def run_scenarios(shipyard_data: pd.DataFrame, supply_chain_data: pd.DataFrame, scenarios: list,
+                  max_workers: int = None, **run_defaults) -> pd.DataFrame:
+    """
+    Runs every scenario on its own engine across a process pool and merges the KPIs.
+
+    Args:
+        shipyard_data (pd.DataFrame): Base shipyard work orders (never modified).
+        supply_chain_data (pd.DataFrame): Base supply chain events (never modified).
+        scenarios (list): One dict per scenario. Recognized keys:
+            name: Label for the results table (defaults to the scenario's position).
+            events: Events to queue before running (delay injections, equipment failures, ...).
+            time_step, vectorized, agents: SimulationEngine parameters (agents registered with
+                src.agents.register_agent must be registered at import time to exist in worker processes).
+            resource_counts: Inventory per resource type, e.g. {'crane': 40, 'agv': 25}.
+            steps / until_time / until_complete / max_steps / jump_to_next_event: Stop conditions.
+        max_workers (int): Worker processes (defaults to the CPU count). 1 runs in this process.
+        **run_defaults: Stop conditions applied to scenarios that do not set their own.
+
+    Returns:
+        pd.DataFrame: One row of KPIs per scenario, in input order.
+    """
+    logger = logging.getLogger(__name__)
+    scenarios = [dict(scenario, name=scenario.get('name', i)) for i, scenario in enumerate(scenarios)]
+    for scenario in scenarios:
+        for key, value in run_defaults.items():
+            scenario.setdefault(key, value)
+    if not scenarios:
+        return pd.DataFrame()
+
+    segments = {}
+    try:
+        handles = {}
+        for frame_name, frame in (('shipyard_data', shipyard_data), ('supply_chain_data', supply_chain_data)):
+            segment, size = _share_frame(frame)
+            segments[frame_name] = segment
+            handles[frame_name] = (segment.name, size)
+        logger.info("Shared base frames: %.1f MB", sum(size for _, size in handles.values()) / 2 ** 20)
+
+        workers = max_workers or os.cpu_count() or 1
+        start = time.perf_counter()
+        if workers == 1:
+            for frame_name, (_, size) in handles.items():
+                _shared_tables[frame_name] = _read_shared(segments[frame_name], size)
+            results = [_run_scenario(scenario) for scenario in scenarios]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(scenarios)), initializer=_attach_shared_frames,
+                                     initargs=(handles,)) as executor:
+                results = list(executor.map(_run_scenario, scenarios))
+        logger.info("Ran %d scenarios on %d workers in %.2f s", len(scenarios), workers, time.perf_counter() - start)
+    finally:
+        _shared_tables.clear()
+        for segment in segments.values():
+            segment.close()
+            segment.unlink()
+
+    return pd.DataFrame(results).set_index('scenario')
+
+
+def _share_frame(frame: pd.DataFrame) -> tuple:
+    """
+    Serializes a DataFrame as an Arrow IPC stream into a new shared memory segment.
+
+    Returns:
+        tuple: (SharedMemory segment, number of bytes used).
+    """
+    table = pa.Table.from_pandas(frame, preserve_index=True)
+    # Measure the stream first so it can be written straight into the segment
+    counter = pa.MockOutputStream()
+    with pa.ipc.new_stream(counter, table.schema) as writer:
+        writer.write_table(table)
+    size = counter.size()
+    segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    sink = pa.FixedSizeBufferWriter(pa.py_buffer(segment.buf))
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    sink.close()
+    return segment, size
+
+
+def _attach_shared_frames(handles: dict):
+    """
+    Worker initializer: maps the shared Arrow streams without copying them.
+    """
+    for frame_name, (segment_name, size) in handles.items():
+        # Workers share the parent's resource tracker, so the parent's unlink() is the only cleanup
+        segment = shared_memory.SharedMemory(name=segment_name)
+        _shared_segments.append(segment)
+        _shared_tables[frame_name] = _read_shared(segment, size)
+
+
+def _read_shared(segment: shared_memory.SharedMemory, size: int) -> pa.Table:
+    """
+    Reads an Arrow IPC stream straight out of a shared memory segment (zero-copy).
+    """
+    return pa.ipc.open_stream(pa.py_buffer(segment.buf)[:size]).read_all()
+
+
+def _run_scenario(scenario: dict) -> dict:
+    """
+    Builds an engine from the shared base tables, applies one scenario and collects its KPIs.
+    """
+    # Private, writable copies for this scenario's engine (see the module docstring)
+    shipyard_data = _shared_tables['shipyard_data'].to_pandas()
+    supply_chain_data = _shared_tables['supply_chain_data'].to_pandas()
+
+    resource_pool = None
+    if scenario.get('resource_counts'):
+        resource_pool = ResourcePool.from_counts(scenario['resource_counts'])
+    engine = SimulationEngine(shipyard_data, supply_chain_data, time_step=scenario.get('time_step', 1),
+                              vectorized=scenario.get('vectorized', True), resource_pool=resource_pool,
+                              agents=scenario.get('agents'))
+    if scenario.get('events'):
+        engine.add_events(scenario['events'])
+
+    start = time.perf_counter()
+    run = {key: scenario[key] for key in RUN_KEYS if scenario.get(key) is not None}
+    if 'steps' in run:
+        steps, reason = engine.run_n_steps(run['steps'], run.get('jump_to_next_event', False)), 'steps'
+    else:
+        steps, reason = engine.run_until(run.get('until_time'), run.get('until_complete', False),
+                                         run.get('max_steps'), run.get('jump_to_next_event', False))
+    elapsed = time.perf_counter() - start
+
+    statuses = engine.shipyard_data['task_status'].value_counts() \
+        if 'task_status' in engine.shipyard_data.columns else pd.Series(dtype=int)
+    total = len(engine.shipyard_data)
+    kpis = {
+        'scenario': scenario['name'],
+        'steps': steps,
+        'stop_reason': reason,
+        'final_time': engine.current_time,
+        'wall_seconds': elapsed,
+        'pending': int(statuses.get('Pending', 0)),
+        'in_progress': int(statuses.get('In Progress', 0)),
+        'completed': int(statuses.get('Completed', 0)),
+        'delayed': int(statuses.get('Delayed', 0)),
+        'completion_rate': statuses.get('Completed', 0) / total if total else 0.0,
+        'events_left': len(engine.event_queue),
+    }
+    for resource_type, counters in engine.resource_pool.utilization().items():
+        kpis[f'{resource_type}_utilization'] = counters['utilization']
+    return kpis
+
+
+if __name__ == "__main__":
+    # Configure logging (you might want to do this at the app level)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.getLogger('src.agents').setLevel(logging.WARNING)
+
+    # Example usage: the same yard with and without a supply delay, and with more cranes
+    shipyard_data = pd.DataFrame({
+        'work_order_id': [1, 2, 3],
+        'task_status': ['Pending', 'In Progress', 'Pending'],
+        'linked_shipyard_event': ['event1', None, 'event2'],
+        'tasks_done': [True, True, False],
+    })
+    supply_chain_data = pd.DataFrame({
+        'linked_shipyard_event': ['event9'],
+        'delay_reason': ['Supply Delay'],
+    })
+    results = run_scenarios(shipyard_data, supply_chain_data, [
+        {'name': 'baseline'},
+        {'name': 'supply_delay', 'events': [{'type': 'supply_chain_delay', 'event_id': 'event1',
+                                             'reason': 'Severe Weather', 'time': 1}]},
+        {'name': 'more_cranes', 'resource_counts': {'crane': 3, 'agv': 3, 'forklift': 3}},
+    ], max_workers=2, steps=5)
+    print(results)
@@ -0,0 +1,648 @@
+"""
+Multi-yard simulation: work orders partitioned by yard into shards that step in lockstep.
+
+Each shard is a SimulationEngine over one group of yards, running in its own worker process.
+A hub engine without work orders keeps what the yards share: the clock, the event queue, the
+resource pool and the supply chain data. Every step takes two batched round trips:
+
+  1. The hub starts the step and each shard runs the agents up to the resource allocator, then
+     reports the leases to return and the Pending work orders that lack each resource type.
+  2. The hub leases resources to those work orders in global row order (as one allocator would),
+     runs its own agents and processes the due events: equipment failures and supply chain delays
+     are applied to the pool and supply chain here, and their effects on work orders (orders to
+     delay, supply chain rows whose delay reason changed) travel to the shards that own them.
+     Each shard writes its assignments, runs the remaining agents, applies those effects and
+     finishes the step.
+
+Yards connected by prerequisite_tasks are always put in the same shard, since the work order
+coordinator resolves prerequisites among its own rows. With that, a ShardedSimulation gives the
+same work order states, resource leases, supply chain rows and trace counter totals as a single
+SimulationEngine over the same inputs.
+"""
+import collections
+import heapq
+import logging
+import multiprocessing
+import os
+import traceback
+
+import numpy as np
+import pandas as pd
+
+from src.agents import default_agents
+from src.agents.resource_allocator import RELEASE_STATUSES, SHORTAGE_WARNING, TRACE_EVENTS as ALLOCATOR_TRACE_EVENTS, \
+    clear_resources
+from src.simulation.simulation_engine import EQUIPMENT_FAILURE_REASON, SimulationEngine
+from src.utils.dependency_graph import DependencyGraph
+from src.utils.parsing import truthy
+from src.utils.resource_pool import RESOURCE_COLUMNS, ResourcePool
+from src.utils.state_store import TaskStatus
+
+# Agents that work on work order rows and run inside every shard (the resource allocator's leasing
+# itself is done by the hub, against the shared pool)
+SHARD_AGENTS = ('work_order_coordinator', 'resource_allocator')
+# Agents that only consume events and run once, on the hub
+HUB_AGENTS = ('anomaly_detector',)
+ALLOCATOR = 'resource_allocator'
+
+# Shard key used for rows whose partition value is missing
+UNASSIGNED_YARD = '(none)'
+
+
+class ShardedSimulation:
+    """
+    Runs one simulation over several yards, with each group of yards in its own worker process.
+
+    Supports the stepping API of SimulationEngine (add_events, run_simulation_step, run_n_steps,
+    run_until, has_active_work_orders, get_simulation_data). Event sources and checkpoints are not
+    supported. Call close() (or use the object as a context manager) to stop the workers.
+    """
+
+    def __init__(self, shipyard_data: pd.DataFrame, supply_chain_data: pd.DataFrame, partition='yard',
+                 max_shards: int = None, processes: bool = True, time_step=1, vectorized=True,
+                 resource_pool: ResourcePool = None, incremental: bool = True, agents: list = None):
+        """
+        Initializes the ShardedSimulation and starts its shards.
+
+        Args:
+            shipyard_data (pd.DataFrame): Work orders of all yards (not modified).
+            supply_chain_data (pd.DataFrame): Supply chain events shared by the yards; updated in
+                place by supply chain delays, as in SimulationEngine.
+            partition: Column of shipyard_data naming each work order's yard (or zone), or one
+                shard key per row.
+            max_shards (int): Upper bound on shards (defaults to the CPU count); yards are packed
+                into shards by work order count, largest first.
+            processes (bool): Run each shard in a worker process; False runs them in this process.
+            time_step, vectorized, resource_pool, incremental: As in SimulationEngine; the pool is
+                shared by all yards and held by the hub.
+            agents (list): Agents to run (default: the default agents), from SHARD_AGENTS and HUB_AGENTS.
+
+        Raises:
+            ValueError: If an agent cannot run sharded.
+        """
+        self.logger = logging.getLogger(__name__)
+        agents = default_agents() if agents is None else list(agents)
+        unsupported = [name for name in agents if name not in SHARD_AGENTS + HUB_AGENTS]
+        if unsupported:
+            raise ValueError(f"Agents cannot run sharded: {unsupported} (supported: {SHARD_AGENTS + HUB_AGENTS})")
+        keys = shipyard_data[partition] if isinstance(partition, str) else pd.Series(partition, dtype=object)
+        self.shard_of = plan_shards(shipyard_data, keys.to_numpy(dtype=object), max_shards or os.cpu_count() or 1)
+        shard_count = int(self.shard_of.max()) + 1 if len(self.shard_of) else 0
+
+        if resource_pool is None:
+            resource_pool = ResourcePool.from_shipyard_data(shipyard_data)
+        self.hub = _Hub(shipyard_data.iloc[:0], supply_chain_data, time_step=time_step, vectorized=vectorized,
+                        resource_pool=resource_pool, incremental=incremental,
+                        agents=[name for name in agents if name in HUB_AGENTS])
+        self.hub.trace.register(ALLOCATOR_TRACE_EVENTS, self.logger)
+        self._allocating = ALLOCATOR in agents
+        self._labels = shipyard_data.index
+        self._local_of = np.zeros(len(shipyard_data), dtype=np.int64)  # Row position -> position in its shard
+        self._supply_members = []  # Per shard: mask of the supply chain rows it holds
+        self._first_allocation = True
+        self._short = set()  # Resource types whose shortage was already warned about
+
+        linked = supply_chain_data['linked_shipyard_event'] \
+            if 'linked_shipyard_event' in supply_chain_data.columns else None
+        context = multiprocessing.get_context()
+        self.shards = []
+        for shard in range(shard_count):
+            positions = np.flatnonzero(self.shard_of == shard)
+            self._local_of[positions] = np.arange(len(positions))
+            rows = shipyard_data.iloc[positions]
+            # Every supply chain row of every event the shard's work orders link to, in their original order
+            if linked is not None and 'linked_shipyard_event' in rows.columns:
+                members = linked.isin(rows['linked_shipyard_event'].dropna().unique()).to_numpy()
+            else:
+                members = np.zeros(len(supply_chain_data), dtype=bool)
+            self._supply_members.append(members)
+            options = {
+                'shipyard_data': rows,
+                'positions': positions,
+                'supply_chain_data': supply_chain_data.loc[members].copy(),
+                'inventory': resource_pool.inventory(),
+                'agents': [name for name in agents if name in SHARD_AGENTS],
+                'time_step': time_step,
+                'vectorized': vectorized,
+                'incremental': incremental,
+            }
+            name = f"shard-{shard}"
+            self.shards.append(_ProcessShard(context, name, options) if processes else _LocalShard(name, options))
+        reports = self._call_all('report')
+        self._active = any(report['active'] for report in reports)
+        self._changed = False
+        self.last_counters = {}
+        self.totals = collections.Counter(self.hub.trace.totals)
+        self.logger.info("Started %d shards over %d work orders: %s", shard_count, len(shipyard_data),
+                         [report['work_orders'] for report in reports])
+
+    @property
+    def current_time(self):
+        return self.hub.current_time
+
+    @property
+    def step_count(self) -> int:
+        return self.hub.step_count
+
+    @property
+    def resource_pool(self) -> ResourcePool:
+        return self.hub.resource_pool
+
+    @property
+    def supply_chain_data(self) -> pd.DataFrame:
+        return self.hub.supply_chain_data
+
+    @property
+    def event_queue(self) -> list:
+        return self.hub.event_queue
+
+    def add_event(self, event_data: dict):
+        """
+        Adds an event to the shared event queue.
+        """
+        self.hub.add_event(event_data)
+
+    def add_events(self, events):
+        """
+        Adds many events to the shared event queue.
+        """
+        self.hub.add_events(events)
+
+    def run_simulation_step(self, jump_to_next_event: bool = False):
+        """
+        Runs a single step on every shard (see the module docstring for the message flow).
+        """
+        hub = self.hub
+        hub.begin_step(jump_to_next_event)
+        requests = self._call_all('begin', hub.current_time)
+        if self._allocating:
+            assignments = self._allocate(requests)
+        else:
+            assignments = [{} for _ in self.shards]
+        hub.run_agents()
+        hub.process_events()
+        supply_updates, delays = self._route_outbox()
+        for shard, handle in enumerate(self.shards):
+            handle.send('finish', assignments[shard], supply_updates[shard], delays[shard])
+        hub.log_utilization()
+        hub.finish_step()
+        reports = [handle.receive() for handle in self.shards]
+
+        self._active = any(report['active'] for report in reports)
+        self._changed = any(report['changed'] for report in reports)
+        counters = collections.Counter(hub.trace.last_counters)
+        for report in reports:
+            counters.update(report['counters'])
+        self.last_counters = dict(counters)
+        self.totals.update(counters)
+
+    def run_n_steps(self, n: int, jump_to_next_event: bool = False) -> int:
+        """
+        Runs n simulation steps; returns the number of steps run.
+        """
+        for _ in range(n):
+            self.run_simulation_step(jump_to_next_event)
+        return n
+
+    def run_until(self, until_time=None, until_complete: bool = False, max_steps: int = None,
+                  jump_to_next_event: bool = False) -> tuple:
+        """
+        Runs steps until a stop condition is met; same conditions and results as SimulationEngine.run_until.
+        """
+        if until_time is None and not until_complete and max_steps is None:
+            raise ValueError("run_until needs until_time, until_complete or max_steps")
+        steps = 0
+        while True:
+            if until_time is not None and self.current_time >= until_time:
+                return steps, 'time'
+            if until_complete and not self.has_active_work_orders():
+                return steps, 'complete'
+            if max_steps is not None and steps >= max_steps:
+                return steps, 'max_steps'
+            processed = self.hub.events_processed
+            self.run_simulation_step(jump_to_next_event)
+            steps += 1
+            if until_complete and not self.event_queue and not self._changed and self.hub.events_processed == processed:
+                return steps, 'stalled'
+
+    def has_active_work_orders(self) -> bool:
+        """
+        Checks whether any work order in any yard is still Pending or In Progress.
+        """
+        return self._active
+
+    def get_shipyard_data(self) -> pd.DataFrame:
+        """
+        Collects the work orders of all shards into one frame, in the original row order.
+
+        task_status and the resource ID columns come back as plain object columns.
+        """
+        frames = self._call_all('frame')
+        if not frames:
+            return pd.DataFrame()
+        combined = pd.concat(frames)
+        positions = np.concatenate([np.flatnonzero(self.shard_of == shard) for shard in range(len(frames))])
+        return combined.iloc[np.argsort(positions, kind='stable')]
+
+    def get_simulation_data(self) -> dict:
+        """
+        Gets the current state of all yards, like SimulationEngine.get_simulation_data.
+        """
+        return {
+            'shipyard_data': self.get_shipyard_data(),
+            'supply_chain_data': self.supply_chain_data,
+            'current_time': self.current_time,
+            'resource_utilization': self.resource_pool.utilization(),
+            'step_counters': self.hub.trace.summary(self.last_counters),
+        }
+
+    def close(self):
+        """
+        Stops the shard workers.
+        """
+        for handle in self.shards:
+            handle.close()
+        self.shards = []
+
+    def __enter__(self) -> 'ShardedSimulation':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _call_all(self, method: str, *args) -> list:
+        """
+        Sends one message to every shard, then waits for all replies (the shards work in parallel).
+        """
+        for handle in self.shards:
+            handle.send(method, *args)
+        return [handle.receive() for handle in self.shards]
+
+    def _allocate(self, requests: list) -> list:
+        """
+        Returns finished leases to the pool and leases resources to the waiting work orders of all
+        shards in global row order, as one ResourceAllocator in greedy mode would.
+
+        Returns:
+            list: Per shard, column -> (shard row positions, resource IDs) to record.
+        """
+        pool = self.resource_pool
+        trace = self.hub.trace
+        holders = [holder for request in requests for holder in request['released']]
+        if self._first_allocation:
+            # The allocator's first (full) pass also drops leases of holders that are not work orders
+            known = set(self._labels)
+            holders += [holder for holder in pool.holders() if holder not in known]
+            self._first_allocation = False
+        trace.count('released', n=pool.release_many(holders))
+        missing = [request['missing_ids'] for request in requests if request['missing_ids'] is not None]
+        if missing:
+            trace.count('allocation_skipped', n=sum(missing))
+
+        assignments = [{} for _ in self.shards]
+        for resource_type, column in RESOURCE_COLUMNS.items():
+            rows = np.sort(np.concatenate([request['candidates'].get(column, np.empty(0, dtype=np.int64))
+                                           for request in requests]))
+            if not len(rows):
+                continue
+            available = pool.available(resource_type)
+            if available < len(rows):
+                trace.count('unassigned', resource_type, len(rows) - available)
+                if resource_type not in self._short:
+                    self._short.add(resource_type)
+                    self.logger.warning(SHORTAGE_WARNING, resource_type, len(rows), available)
+            if not available:
+                continue
+            assign = rows[:available]
+            resource_ids = np.asarray(pool.acquire_many(resource_type, self._labels[assign]), dtype=object)
+            assign = assign[:len(resource_ids)]
+            trace.count('assigned', resource_type, len(resource_ids))
+            owners = self.shard_of[assign]
+            for shard in np.unique(owners).tolist():
+                mine = owners == shard
+                assignments[shard][column] = (self._local_of[assign[mine]], resource_ids[mine].tolist())
+        return assignments
+
+    def _route_outbox(self) -> tuple:
+        """
+        Splits the hub's work order effects of this step by owning shard.
+
+        Returns:
+            tuple: (per shard, list of (supply chain index labels, updates); per shard, work order
+            index labels to delay).
+        """
+        hub = self.hub
+        supply_updates = [[] for _ in self.shards]
+        for index, updates in hub.supply_outbox:
+            labels = pd.Index(np.atleast_1d(index))
+            positions = self.supply_chain_data.index.get_indexer(labels)
+            values = {column: np.broadcast_to(np.asarray(value, dtype=object), len(labels))
+                      for column, value in updates.items()}
+            for shard, members in enumerate(self._supply_members):
+                mine = np.flatnonzero(members[positions])  # The labels come from the hub's own frame
+                if len(mine):
+                    supply_updates[shard].append((labels[mine], {column: value[mine]
+                                                                 for column, value in values.items()}))
+        delays = [[] for _ in self.shards]
+        if hub.delay_outbox:
+            positions = self._labels.get_indexer(pd.Index(hub.delay_outbox, dtype=object))
+            positions = positions[positions >= 0]
+            owners = self.shard_of[positions]
+            for shard in np.unique(owners).tolist():
+                delays[shard] = self._labels[positions[owners == shard]].tolist()
+        hub.supply_outbox = []
+        hub.delay_outbox = []
+        return supply_updates, delays
+
+
+def plan_shards(shipyard_data: pd.DataFrame, keys: np.ndarray, max_shards: int) -> np.ndarray:
+    """
+    Assigns every work order to a shard.
+
+    Yards (distinct keys) connected by a prerequisite edge are merged first, then the merged groups
+    are packed into at most max_shards shards, largest group first onto the smallest shard.
+
+    Returns:
+        np.ndarray: Shard number per row (0 .. shards - 1, no empty shards).
+    """
+    logger = logging.getLogger(__name__)
+    keys = np.where(pd.isna(keys), UNASSIGNED_YARD, keys)
+    codes, yards = pd.factorize(keys)
+    if not len(codes):
+        return codes.astype(np.int64)
+
+    # Union-find over yards along the prerequisite edges that cross yards
+    parent = list(range(len(yards)))
+
+    def find(yard):
+        while parent[yard] != yard:
+            parent[yard] = parent[parent[yard]]
+            yard = parent[yard]
+        return yard
+
+    src, dst = DependencyGraph(shipyard_data).out_edges(np.arange(len(codes)))
+    crossing = codes[src] != codes[dst]
+    for a, b in set(zip(codes[src[crossing]].tolist(), codes[dst[crossing]].tolist())):
+        parent[find(a)] = find(b)
+    groups = np.array([find(yard) for yard in range(len(yards))])
+    merged = collections.defaultdict(list)
+    for yard, group in enumerate(groups.tolist()):
+        merged[group].append(yards[yard])
+    for members in merged.values():
+        if len(members) > 1:
+            logger.warning("Yards %s share prerequisite tasks and run in one shard", members)
+
+    sizes = np.bincount(groups[codes], minlength=len(yards))
+    shards = [(0, shard) for shard in range(max(1, min(max_shards, len(merged))))]
+    shard_of_group = np.zeros(len(yards), dtype=np.int64)
+    for group in sorted(merged, key=lambda group: -sizes[group]):
+        load, shard = heapq.heappop(shards)
+        shard_of_group[group] = shard
+        heapq.heappush(shards, (load + int(sizes[group]), shard))
+    shard_of = shard_of_group[groups[codes]]
+    _, shard_of = np.unique(shard_of, return_inverse=True)  # Renumber in case a shard got no group
+    return shard_of.astype(np.int64)
+
+
+class YardShard:
+    """
+    One shard: an engine over a group of yards plus the shard side of resource allocation.
+
+    The allocation state mirrors ResourceAllocator in incremental greedy mode: rows written since
+    the last step and rows still waiting for a resource are the candidates; the hub decides which
+    of them get one.
+    """
+
+    def __init__(self, shipyard_data: pd.DataFrame, supply_chain_data: pd.DataFrame, positions: np.ndarray,
+                 inventory: dict, agents: list, time_step=1, vectorized=True, incremental: bool = True):
+        """
+        Initializes the YardShard.
+
+        Args:
+            shipyard_data (pd.DataFrame): The shard's work orders, in global row order.
+            positions (np.ndarray): Their row positions in the full shipyard_data.
+            supply_chain_data (pd.DataFrame): The supply chain rows of the events they link to.
+            inventory (dict): The shared pool's inventory (resource type -> IDs).
+            agents (list): Shard agents in step order (see SHARD_AGENTS).
+        """
+        # The engine's own pool only provides the resource ID categories; leases live in the hub
+        self.engine = SimulationEngine(shipyard_data, supply_chain_data, time_step=time_step, vectorized=vectorized,
+                                       resource_pool=ResourcePool(inventory), incremental=incremental,
+                                       agents=[name for name in agents if name != ALLOCATOR])
+        split = agents.index(ALLOCATOR) if ALLOCATOR in agents else len(agents)
+        self.before = agents[:split]  # Agents run before the hub allocates
+        self.after = agents[split + 1:]
+        self.allocating = ALLOCATOR in agents
+        if self.allocating and 'work_order_coordinator' in self.engine.agents:
+            # Leases come from the hub, but starts still wait for them as in a single engine
+            self.engine.agents['work_order_coordinator'].require_leases = True
+        self.positions = positions
+        self._changes = self.engine.store.track_changes()  # Rows written since the last allocation
+        self._valid = None  # Cached truthiness of work_order_id; None forces a full pass
+        self._missing_ids = 0
+        self._before = None  # progress_snapshot() at the start of the step
+
+    def report(self) -> dict:
+        """
+        Returns the shard's size and whether it has active work orders.
+        """
+        return {'work_orders': len(self.engine.store), 'active': self.engine.has_active_work_orders()}
+
+    def begin(self, current_time) -> dict:
+        """
+        Starts a step at the hub's time and runs the agents before the allocator.
+
+        Returns:
+            dict: The allocation request ('released': holders to return to the pool,
+            'candidates': column -> global row positions waiting for that resource type,
+            'missing_ids': rows without a work order ID), or None without an allocator.
+        """
+        engine = self.engine
+        engine.current_time = current_time
+        self._before = engine.progress_snapshot()
+        engine.run_agents(self.before)
+        return self._allocation_request() if self.allocating else None
+
+    def finish(self, assignments: dict, supply_updates: list, delays: list) -> dict:
+        """
+        Records the hub's assignments, runs the remaining agents, applies the hub's event effects
+        and finishes the step.
+
+        Returns:
+            dict: 'active', 'changed' (any status or resource ID changed in the step) and this step's 'counters'.
+        """
+        engine = self.engine
+        for column, (positions, resource_ids) in assignments.items():
+            engine.store.assign_resources(column, positions, resource_ids)
+        engine.run_agents(self.after)
+        for index, updates in supply_updates:
+            engine.update_supply_chain_rows(index, updates)
+        if delays:
+            engine.delay_work_orders(delays, EQUIPMENT_FAILURE_REASON)
+        engine.finish_step()
+        return {
+            'active': engine.has_active_work_orders(),
+            'changed': not engine.is_stalled(self._before),  # The shard engine has no events or sources
+            'counters': engine.trace.last_counters,
+        }
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Returns the shard's work orders with task_status and resource IDs as object columns.
+        """
+        frame = self.engine.shipyard_data
+        columns = ['task_status'] + [column for column in RESOURCE_COLUMNS.values() if column in frame.columns]
+        return frame.astype({column: object for column in columns if column in frame.columns})
+
+    def _allocation_request(self) -> dict:
+        """
+        Collects the leases to release and the rows waiting for each resource type.
+        """
+        engine = self.engine
+        store = engine.store
+        data = engine.shipyard_data
+        dirty = self._changes.take()
+        full = self._valid is None
+        status = store.status
+        graph = engine.dependency_graph
+        graph.sync_flags(status == TaskStatus.COMPLETED, status == TaskStatus.PENDING)
+        rows = np.arange(len(store), dtype=np.int64) if full else dirty
+
+        finished = rows[np.isin(store.status[rows], RELEASE_STATUSES)]
+        holding = np.zeros(len(finished), dtype=bool)
+        for codes in store.resource_codes.values():
+            holding |= codes[finished] >= 0
+        request = {'released': data.index[finished[holding]].tolist(), 'candidates': {}, 'missing_ids': None}
+        clear_resources(store, finished[holding])
+        if 'work_order_id' not in data.columns:
+            return request
+
+        if full:
+            self._valid = truthy(data['work_order_id']).copy()
+            self._missing_ids = int(len(data) - self._valid.sum())
+        elif len(rows):
+            was_valid = int(self._valid[rows].sum())
+            ids = data['work_order_id'].to_numpy(dtype=object)[rows]
+            self._valid[rows] = truthy(pd.Series(ids, dtype=object))
+            self._missing_ids += was_valid - int(self._valid[rows].sum())
+        request['missing_ids'] = self._missing_ids
+
+        # Only ready work orders (Pending, prerequisites met) are leased resources, as in ResourceAllocator
+        if not full:
+            rows = np.union1d(rows, graph.ready_positions())
+        rows = rows[self._valid[rows] & (status[rows] == TaskStatus.PENDING) & (graph.unmet[rows] == 0)]
+        for column in RESOURCE_COLUMNS.values():
+            candidates = rows[store.resource_codes[column][rows] < 0]
+            request['candidates'][column] = self.positions[candidates]
+        return request
+
+
+class _Hub(SimulationEngine):
+    """
+    Engine without work orders that holds the yards' shared clock, event queue, pool and supply chain.
+
+    Events are processed as in a single engine; their effects on work orders are collected in the
+    outboxes for the shards instead of being applied here.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.supply_outbox = []  # (supply chain index labels, updates) written this step
+        self.delay_outbox = []  # Work order index labels to delay
+
+    def process_events(self):
+        """
+        Processes the due events (the event phase of a step).
+        """
+        self.instrumentation.measure('events', self._process_events)
+
+    def delay_work_orders(self, holders: list, reason: str = EQUIPMENT_FAILURE_REASON) -> list:
+        self.delay_outbox.extend(holders)
+        return []
+
+    def update_supply_chain_rows(self, index, updates: dict):
+        super().update_supply_chain_rows(index, updates)
+        self.supply_outbox.append((index, updates))
+
+
+class _LocalShard:
+    """
+    Runs a YardShard in this process behind the message interface of _ProcessShard.
+    """
+
+    def __init__(self, name: str, options: dict):
+        self.name = name
+        self.shard = YardShard(**options)
+        self._reply = None
+
+    def send(self, method: str, *args):
+        self._reply = getattr(self.shard, method)(*args)
+
+    def receive(self):
+        reply, self._reply = self._reply, None
+        return reply
+
+    def close(self):
+        pass
+
+
+class _ProcessShard:
+    """
+    Runs a YardShard in a worker process; send() and receive() exchange one message each over a pipe.
+    """
+
+    def __init__(self, context, name: str, options: dict):
+        self.name = name
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_serve_shard, args=(child, options), name=name, daemon=True)
+        self.process.start()
+        child.close()
+
+    def send(self, method: str, *args):
+        self.connection.send((method, args))
+
+    def receive(self):
+        ok, reply = self.connection.recv()
+        if not ok:
+            raise RuntimeError(f"{self.name} failed:\n{reply}")
+        return reply
+
+    def close(self):
+        if self.process.is_alive():
+            self.connection.send(None)
+            self.process.join(5)
+        self.connection.close()
+
+
+def _serve_shard(connection, options: dict):
+    """
+    Worker process loop: builds the shard, then answers (method, args) messages until None.
+    """
+    try:
+        shard = YardShard(**options)
+        while True:
+            message = connection.recv()
+            if message is None:
+                break
+            method, args = message
+            connection.send((True, getattr(shard, method)(*args)))
+    except Exception:
+        connection.send((False, traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    # Configure logging (you might want to do this at the app level)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.getLogger('src.agents').setLevel(logging.WARNING)
+    logging.getLogger('src.simulation.simulation_engine').setLevel(logging.WARNING)
+
+    # Example usage: four yards sharing a supply chain and a crane/AGV/forklift pool
+    from src.utils.synthetic_data import generate_datasets
+    shipyard_data, supply_chain_data = generate_datasets(20_000, yards=4)
+    with ShardedSimulation(shipyard_data, supply_chain_data, partition='yard', max_shards=2,
+                           resource_pool=ResourcePool.from_counts({'crane': 200, 'agv': 200, 'forklift': 200})) as sim:
+        sim.add_event({'type': 'shipyard_equipment_failure', 'equipment_id': 'crane1', 'time': 3})
+        print(sim.run_until(until_complete=True, max_steps=50))
+        print(sim.get_shipyard_data()['task_status'].value_counts())
@@ -1,58 +1,247 @@
 import pandas as pd
+import numpy as np
+import heapq
+import itertools
 import logging
-import time
-from src.agents.work_order_coordinator import WorkOrderCoordinator
-from src.agents.resource_allocator import ResourceAllocator
-# Add import for other agents as you create them
+import math
+from src.agents import default_agents, load_agent_class, step_method
+from src.utils.delay_index import DelayIndex
+from src.utils.dependency_graph import DependencyGraph
+from src.utils.parsing import is_missing
+from src.utils.resource_pool import ResourcePool
+from src.utils.state_store import TaskStatus, WorkOrderStore
+from src.utils.trace import TraceSink
+from src.simulation.instrumentation import EVENT_PHASE_PREFIX, Instrumentation
+# Agents are imported on demand through the registry in src.agents
 
-class SimulationEngine:  # Correct indentation
+ACTIVE_STATUSES = [TaskStatus.PENDING, TaskStatus.IN_PROGRESS]
+
+# Event type -> method that applies all due events of that type in one grouped update
+BATCH_EVENT_HANDLERS = {
+    'supply_chain_delay': '_apply_supply_chain_delays',
+    'shipyard_equipment_failure': '_apply_equipment_failures',
+    'security_attack': '_count_security_events',
+    'security_alert': '_count_security_events',
+}
+
+# Upper bound on the events taken from attached event sources per step; the rest stay in the
+# streams' bounded queues, so a fast source is throttled instead of filling the event heap
+MAX_POLLED_EVENTS = 100_000
+
+# Delay reason used when a supply_chain_delay event carries none
+DEFAULT_DELAY_REASON = 'Supply Delay'
+# Delay reason counted for work orders stopped by an equipment failure
+EQUIPMENT_FAILURE_REASON = 'Equipment Failure'
+
+# Per-step counters reported through the trace sink: event -> (level, message)
+TRACE_EVENTS = {
+    'supply_chain_delay': (logging.WARNING, "Applied %(count)d supply chain delays: %(key)s"),
+    'unmatched_delay': (logging.WARNING, "%(count)d supply chain delays match no supply chain row"),
+    'equipment_failure': (logging.ERROR, "%(count)d %(key)ss failed and were taken out of service"),
+    'unknown_equipment': (logging.WARNING, "%(count)d equipment failures name unknown equipment"),
+    'unhandled_event': (logging.WARNING, "Unhandled event type %(key)s (%(count)d events)"),
+    'security_attack': (logging.WARNING, "%(count)d attack-flagged events: %(key)s"),
+    'security_alert': (logging.WARNING, "%(count)d security alerts: %(key)s"),
+}
+
+class SimulationEngine:
     """
     Manages the simulation of the digital twin.
     """
-    #def __init__(self, shipyard_data: pd.DataFrame, supply_chain_data: pd.DataFrame):  # Correct indentation
-       
-    def __init__(self, shipyard_data: pd.DataFrame, supply_chain_data: pd.DataFrame, time_step=1):
+
+    def __init__(self, shipyard_data: pd.DataFrame, supply_chain_data: pd.DataFrame, time_step=1, vectorized=True,
+                 resource_pool: ResourcePool = None, trace_capacity: int = 0, incremental: bool = True,
+                 agents: list = None):
         """
         Initializes the SimulationEngine.
+
+        Args:
+            vectorized (bool): Let agents process all work orders column-wise instead of row by row.
+            resource_pool (ResourcePool): Cranes/AGVs/forklifts to allocate; built from shipyard_data if not given.
+            trace_capacity (int): Keep this many structured trace records in a ring buffer (0 = off).
+            incremental (bool): Let agents revisit only work orders that changed since their last pass.
+            agents (list): Names of the registered agents to run (see src.agents), in step order;
+                defaults to the default agents. Only these agent modules are imported.
+
+        The engine keeps work order state in a WorkOrderStore; self.shipyard_data is the store's
+        pandas view, not the frame passed in (which is left unchanged).
         """
-        self.shipyard_data = shipyard_data
         self.supply_chain_data = supply_chain_data
+        self.vectorized = vectorized
+        self.incremental = incremental
+        self.delay_index = DelayIndex(supply_chain_data)  # linked_shipyard_event -> delay_reason
+        # Supply chain rows written since the last checkpoint (see update_supply_chain_rows)
+        self.supply_chain_dirty = np.zeros(len(supply_chain_data), dtype=bool)
+        self.resource_pool = resource_pool if resource_pool is not None else ResourcePool.from_shipyard_data(shipyard_data)
+        self.store = WorkOrderStore(shipyard_data, self.resource_pool.inventory())  # status/resource codes
+        self.shipyard_data = self.store.frame
+        self.dependency_graph = DependencyGraph(self.shipyard_data)  # prerequisite_tasks DAG
         self.logger = logging.getLogger(__name__)
+        self.trace = TraceSink(trace_capacity)  # Per-step counters, logged once per step
+        self.trace.register(TRACE_EVENTS, self.logger)
+        self.agent_names = default_agents() if agents is None else list(agents)
         self.agents = {}  # Dictionary to store agent instances
         self.time_step = time_step  # Simulation time step (e.g., in minutes, hours)
         self.current_time = 0  # Initialize simulation time
+        self.step_count = 0  # Number of completed simulation steps
+        self.instrumentation = Instrumentation(self.store)  # Per-agent / per-event-type timings and hooks
+        self.event_listeners = []  # Callables receiving every batch of due events (see add_event_listener)
         self._initialize_agents()
+        cycle = self.dependency_graph.find_cycle()
+        if cycle:
+            self.logger.warning("Work orders in a prerequisite cycle can never start: %s", cycle)
         self.simulation_running = False
-        self.event_queue = []  # Queue for storing events to be processed
+        self.event_queue = []  # Min-heap of (time, sequence, event); sequence keeps insertion order among equal times
+        self._event_sequence = itertools.count()
+        self.untimed_events = []  # Events without a 'time' field are never due; kept here for inspection
+        self.event_sources = []  # Streams (see event_stream.EventStream) drained into the queue every step
+        self.max_polled_events = MAX_POLLED_EVENTS  # Per step, across all event sources (None = no cap)
+        self.events_processed = 0  # Due events handled so far
 
     def _initialize_agents(self):
         """
-        Initializes the agents in the simulation.
+        Initializes the configured agents in the simulation.
         """
-        self.logger.info("Initializing agents...")
-        # Create instances of your agents here
-        # Example:
-        self.agents['work_order_coordinator'] = WorkOrderCoordinator(self.shipyard_data, self.supply_chain_data)
-        self.agents['resource_allocator'] = ResourceAllocator(self.shipyard_data)
-        # Add more agents as needed
+        self.logger.info("Initializing agents: %s", ", ".join(self.agent_names))
+        self._step_methods = [(name, step_method(name)) for name in self.agent_names]  # In execution order
+        for name in self.agent_names:
+            self.agents[name] = load_agent_class(name).from_engine(self)
 
-    def run_simulation_step(self):
+    def run_simulation_step(self, jump_to_next_event: bool = False):
         """
         Runs a single step of the simulation.
+
+        Args:
+            jump_to_next_event (bool): If no event is due yet, first advance the clock (in whole
+                time steps) to the step in which the next queued event falls, skipping idle steps.
         """
-        self.logger.info(f"Running simulation step... Current Time: {self.current_time}")
+        self.begin_step(jump_to_next_event)
         # Orchestrate the actions of the agents in a single simulation step.
-        # Example:
-        if 'work_order_coordinator' in self.agents:
-            self.agents['work_order_coordinator'].process_work_orders()
-        if 'resource_allocator' in self.agents:
-            self.agents['resource_allocator'].allocate_resources()
-        # Add calls to other agent methods here
+        self.run_agents()
         # Update any global simulation state
 
-        self._process_events()  # Process any events in the queue
+        self.instrumentation.measure('events', self._process_events)  # Process any events in the queue
+        self.log_utilization()
+        self.finish_step()
+
+    def begin_step(self, jump_to_next_event: bool = False):
+        """
+        First phase of a step: queues the events of attached streams and optionally skips idle steps.
+
+        run_simulation_step() runs begin_step(), run_agents(), the event phase and finish_step();
+        the phases are separate so a ShardedSimulation can interleave them across engines.
+        """
+        if self.event_sources:
+            self.instrumentation.measure('ingest', self._poll_event_sources)
+        if jump_to_next_event:
+            self._jump_to_next_event()
+        self.logger.info("Running simulation step... Current Time: %s", self.current_time)
+
+    def run_agents(self, names=None):
+        """
+        Runs the step method of each configured agent (or of the named ones), in step order.
+        """
+        for agent_name, method in self._step_methods:
+            if names is None or agent_name in names:
+                agent = self.agents[agent_name]
+                self.instrumentation.measure(agent_name, getattr(agent, method), agent)
 
+    def log_utilization(self):
+        """
+        Logs the resource pool's per-type lease counters (at INFO).
+        """
+        if self.logger.isEnabledFor(logging.INFO):
+            for resource_type, counters in self.resource_pool.utilization().items():
+                self.logger.info("%s: %d/%d leased (%.0f%%), %d free", resource_type, counters['leased'],
+                                 counters['total'], counters['utilization'] * 100, counters['free'])
+
+    def finish_step(self):
+        """
+        Last phase of a step: advances the clock and flushes the step's trace counters.
+        """
         self.current_time += self.time_step  # Increment simulation time
+        self.step_count += 1
+        self.trace.flush(self.step_count)  # One log line per counter instead of one per work order
+
+    @property
+    def step_timings(self) -> dict:
+        """
+        Phase (agent name, 'events' or 'event:<type>') -> total wall seconds across steps.
+        """
+        return self.instrumentation.wall_totals()
+
+    def write_metrics(self, path: str):
+        """
+        Writes the per-phase profile to a file in Prometheus text format.
+        """
+        self.instrumentation.write_prometheus(path)
+
+    def run_n_steps(self, n: int, jump_to_next_event: bool = False) -> int:
+        """
+        Runs n simulation steps; returns the number of steps run.
+        """
+        for _ in range(n):
+            self.run_simulation_step(jump_to_next_event)
+        return n
+
+    def run_until(self, until_time=None, until_complete: bool = False, max_steps: int = None,
+                  jump_to_next_event: bool = False) -> tuple:
+        """
+        Runs steps until a stop condition is met.
+
+        Args:
+            until_time: Stop once current_time reaches this simulation time.
+            until_complete (bool): Stop once no work order is Pending or In Progress.
+            max_steps (int): Hard cap on the number of steps.
+            jump_to_next_event (bool): Skip idle steps up to the next queued event.
+
+        Returns:
+            tuple: (steps run, stop reason). The reason is 'time', 'complete', 'max_steps' or
+            'stalled' (see is_stalled).
+        """
+        if until_time is None and not until_complete and max_steps is None:
+            raise ValueError("run_until needs until_time, until_complete or max_steps")
+        steps = 0
+        while True:
+            if until_time is not None and self.current_time >= until_time:
+                return steps, 'time'
+            if until_complete and not self.has_active_work_orders():
+                return steps, 'complete'
+            if max_steps is not None and steps >= max_steps:
+                return steps, 'max_steps'
+            before = self.progress_snapshot()
+            self.run_simulation_step(jump_to_next_event)
+            steps += 1
+            if until_complete and self.is_stalled(before):
+                return steps, 'stalled'
+
+    def has_active_work_orders(self) -> bool:
+        """
+        Checks whether any work order is still Pending or In Progress.
+        """
+        return bool(np.isin(self.store.status, ACTIVE_STATUSES).any())
+
+    def progress_snapshot(self) -> dict:
+        """
+        Copies what a step can change: the number of events processed, the task_status codes and
+        the resource ID codes.
+        """
+        store = self.store
+        snapshot = {'events': self.events_processed, 'task_status': store.status.copy()}
+        for column, codes in store.resource_codes.items():
+            snapshot[column] = codes.copy()
+        return snapshot
+
+    def is_stalled(self, before: dict) -> bool:
+        """
+        Checks whether further steps cannot change anything: since progress_snapshot() returned
+        before, no event was processed (its effects would show in the next step) and no task_status
+        or resource assignment changed, no event is queued and every attached event source is exhausted.
+        """
+        if self.event_queue or any(not stream.exhausted for stream in self.event_sources):
+            return False
+        after = self.progress_snapshot()
+        return all(np.array_equal(before[key], after[key]) for key in after)
 
     def get_simulation_data(self) -> dict:
         """
@@ -64,19 +253,30 @@ class SimulationEngine:  # Correct indentation
             'shipyard_data': self.shipyard_data,
             'supply_chain_data': self.supply_chain_data,
             'current_time': self.current_time,
+            'resource_utilization': self.resource_pool.utilization(),
+            'step_counters': TraceSink.summary(self.trace.last_counters),
+            'profile': self.instrumentation.snapshot(),
             # Add more data as needed
         }
 
-    def start_simulation(self):
+    def start_simulation(self) -> str:
         """
-        Starts the simulation loop.
+        Starts the simulation loop. It runs until stop_simulation() is called, every work order is
+        done, or a step changes nothing (the stop conditions of run_until(until_complete=True)).
+
+        Returns:
+            str: 'stopped', 'complete' or 'stalled'.
         """
         self.logger.info("Starting simulation...")
         self.simulation_running = True
         while self.simulation_running:
-            self.run_simulation_step()
+            _, reason = self.run_until(until_complete=True, max_steps=1)
+            if reason != 'max_steps':
+                self.simulation_running = False
+                return reason
             # You might want to add a time.sleep() here to control the simulation speed
             # time.sleep(1)  # Pause for 1 second (adjust as needed)
+        return 'stopped'
 
     def stop_simulation(self):
         """
@@ -85,28 +285,146 @@ class SimulationEngine:  # Correct indentation
         self.logger.info("Stopping simulation...")
         self.simulation_running = False
 
+    def get_critical_path(self, durations=None) -> list:
+        """
+        Gets the chain of remaining work orders that gates overall completion.
+
+        Args:
+            durations: Per-work-order durations (array-like or column name); each order counts 1 if omitted.
+        """
+        return self.dependency_graph.critical_path(durations)
+
+    def dump_trace(self, path: str = None) -> list:
+        """
+        Returns the buffered trace records (see trace_capacity), optionally writing them as JSON lines.
+        """
+        return self.trace.dump(path)
+
+    def update_supply_chain_rows(self, index, updates: dict):
+        """
+        Writes column values to supply chain rows and keeps the delay index in sync.
+
+        Args:
+            index: Index label(s) of the supply chain rows to update.
+            updates (dict): Column name -> new value (scalar or one value per row).
+        """
+        for column, value in updates.items():
+            self.supply_chain_data.loc[index, column] = value
+        self.delay_index.refresh_rows(index)
+        positions = self.supply_chain_data.index.get_indexer(pd.Index(np.atleast_1d(index)))
+        if len(self.supply_chain_dirty) == len(self.supply_chain_data):
+            self.supply_chain_dirty[positions[positions >= 0]] = True
+
     def add_event(self, event_data: dict):
         """
         Adds an event to the event queue.
         """
-        self.event_queue.append(event_data)
-        self.logger.info(f"Event added to queue: {event_data}")
+        event_time = event_data.get('time')  # Assuming events have a 'time' field
+        if event_time is None:
+            self.untimed_events.append(event_data)
+            self.logger.warning("Event has no time and will never be processed: %s", event_data)
+            return
+        heapq.heappush(self.event_queue, (event_time, next(self._event_sequence), event_data))
+        self.logger.info("Event added to queue: %s", event_data)
 
-    def _process_events(self):
+    def add_events(self, events):
+        """
+        Adds many events to the event queue at once (O(n) heapify instead of one push per event).
+        """
+        entries = []
+        untimed = 0
+        for event_data in events:
+            event_time = event_data.get('time')
+            if event_time is None:
+                self.untimed_events.append(event_data)
+                untimed += 1
+            else:
+                entries.append((event_time, next(self._event_sequence), event_data))
+        if untimed:
+            self.logger.warning("%d events have no time and will never be processed", untimed)
+        if len(entries) > len(self.event_queue):
+            self.event_queue.extend(entries)
+            heapq.heapify(self.event_queue)
+        else:
+            for entry in entries:
+                heapq.heappush(self.event_queue, entry)
+        self.logger.info("%d events added to queue (%d queued)", len(entries), len(self.event_queue))
+
+    def add_event_source(self, stream):
+        """
+        Attaches a started EventStream; its buffered events are queued at the start of every step,
+        up to max_polled_events per step across all sources.
+        """
+        self.event_sources.append(stream)
+
+    def add_event_listener(self, listener):
+        """
+        Registers a callable that receives every batch of due events (a list, in time order) before
+        the events are handled, e.g. AnomalyDetector.receive.
+        """
+        self.event_listeners.append(listener)
+
+    def _poll_event_sources(self):
+        """
+        Moves the events buffered by attached streams into the event queue (non-blocking), up to
+        max_polled_events (whole batches, so the cap may be exceeded by less than one batch).
+        """
+        budget = self.max_polled_events
+        for stream in self.event_sources:
+            if budget is not None and budget <= 0:
+                break
+            events = stream.poll(budget)
+            if events:
+                self.add_events(events)
+                if budget is not None:
+                    budget -= len(events)
+
+    def next_event_time(self):
         """
-        Processes events in the event queue.
+        Gets the time of the earliest queued event, or None if the queue is empty.
         """
-        events_to_remove = []
-        for event in self.event_queue:
-            event_time = event.get('time')  # Assuming events have a 'time' field
-            if event_time is not None and event_time <= self.current_time:
-                self.logger.info(f"Processing event: {event}")
-                self._handle_event(event)  # Handle the event
-                events_to_remove.append(event)
+        return self.event_queue[0][0] if self.event_queue else None
 
-        # Remove processed events (iterate in reverse to avoid index issues)
-        for event in reversed(events_to_remove):
-            self.event_queue.remove(event)
+    def _jump_to_next_event(self):
+        """
+        Advances current_time by whole time steps to the first step at or after the next event.
+        """
+        next_time = self.next_event_time()
+        if next_time is None or next_time <= self.current_time:
+            return
+        idle_steps = math.ceil((next_time - self.current_time) / self.time_step)
+        self.current_time += idle_steps * self.time_step
+        self.logger.info("Skipped %d idle steps to time %s", idle_steps, self.current_time)
+
+    def _process_events(self):
+        """
+        Processes all events that are due.
+
+        Due events are grouped by type (in order of first appearance, each group in time order).
+        Types in BATCH_EVENT_HANDLERS are applied as one grouped update per step, so a burst of
+        thousands of events costs a few array operations; other events are handled one by one.
+        """
+        queue = self.event_queue
+        due = []
+        while queue and queue[0][0] <= self.current_time:
+            due.append(heapq.heappop(queue)[2])
+        if not due:
+            return
+        self.events_processed += len(due)
+        self.logger.info("Processing %d due events", len(due))
+        for listener in self.event_listeners:
+            listener(due)
+        groups = {}
+        for event in due:
+            groups.setdefault(event.get('type'), []).append(event)
+        for event_type, events in groups.items():
+            phase = EVENT_PHASE_PREFIX + str(event_type)
+            method = BATCH_EVENT_HANDLERS.get(event_type)
+            if method is not None:
+                self.instrumentation.measure(phase, getattr(self, method), events, events)
+            else:
+                for event in events:
+                    self.instrumentation.measure(phase, self._handle_event, event, event)  # Handle the event
 
     def _handle_event(self, event: dict):
         """
@@ -114,23 +432,95 @@ class SimulationEngine:  # Correct indentation
         affect the simulation.
         """
         event_type = event.get('type')
-
-        if event_type == 'supply_chain_delay':
-            # Example: Update supply chain data to reflect a delay
-            delay_event_id = event.get('event_id')
-            delay_reason = event.get('reason')
-            self.logger.warning(f"Applying supply chain delay: {delay_reason} (Event ID: {delay_event_id})")
-            # Implement logic to find the relevant supply chain event and update its status/impact
-            # You'll likely need to iterate through self.supply_chain_data or use a lookup mechanism
-        elif event_type == 'shipyard_equipment_failure':
-            # Example: Update shipyard data to reflect equipment failure
-            equipment_id = event.get('equipment_id')
-            self.logger.error(f"Simulating equipment failure: {equipment_id}")
-            # Implement logic to find the affected equipment and update its status
-            # You'll likely need to iterate through self.shipyard_data or use a lookup
+        method = BATCH_EVENT_HANDLERS.get(event_type)
+        if method is not None:
+            getattr(self, method)([event])
         # Add more event handling logic here for other event types
         else:
-            self.logger.warning(f"Unhandled event type: {event_type}")
+            self.trace.count('unhandled_event', event_type)
+
+    def _apply_supply_chain_delays(self, events: list):
+        """
+        Applies supply_chain_delay events: the supply chain rows linked to each event_id get the
+        event's delay reason.
+
+        Rows are found through the delay index (no scan of supply_chain_data) and written in one
+        update; when several events name the same event_id, the latest one wins. The work order
+        coordinator picks the new reasons up on its next pass.
+        """
+        reasons = {}
+        for event in events:
+            event_id = event.get('event_id')
+            if not is_missing(event_id):
+                reasons[event_id] = event.get('reason') or DEFAULT_DELAY_REASON
+        event_ids = list(reasons)
+        positions, owners = self.delay_index.rows_of(event_ids)
+        matched = np.zeros(len(event_ids), dtype=bool)
+        matched[owners] = True
+        unmatched = {event_ids[i] for i in np.flatnonzero(~matched)}
+        self.trace.count('unmatched_delay', n=sum(1 for event in events if is_missing(event.get('event_id')) or
+                                                  event.get('event_id') in unmatched))
+        if not len(positions):
+            return
+        values = np.asarray(list(reasons.values()), dtype=object)[owners]
+        self.update_supply_chain_rows(self.supply_chain_data.index[positions], {'delay_reason': values})
+        applied = pd.Series([reasons[event_ids[i]] for i in np.flatnonzero(matched)], dtype=object)
+        for reason, count in applied.astype(str).value_counts().items():
+            self.trace.count('supply_chain_delay', reason, int(count))
+        if self.trace.tracing:
+            self.trace.record('supply_chain_delays', event_ids=[event_ids[i] for i in np.flatnonzero(matched)],
+                              rows=len(positions))
+
+    def _apply_equipment_failures(self, events: list):
+        """
+        Applies shipyard_equipment_failure events: the named cranes/AGVs/forklifts are taken out of
+        service and the active work orders leasing them become Delayed.
+
+        Leaseholders come from the resource pool's lease index and all affected rows are written
+        with one status update (the allocator returns their other resources on its next pass).
+        """
+        pool = self.resource_pool
+        equipment_ids = [event.get('equipment_id') for event in events]
+        failed = pool.set_out_of_service_many(equipment_id for equipment_id in equipment_ids
+                                              if not is_missing(equipment_id))
+        self.trace.count('unknown_equipment', n=sum(pool.resource_type(i) is None for i in equipment_ids))
+        if not failed:
+            return
+        for resource_type, count in pd.Series([pool.resource_type(i) for i in failed]).value_counts().items():
+            self.trace.count('equipment_failure', resource_type, int(count))
+
+        holders = [holder for holder in map(pool.holder_of, failed) if holder is not None]
+        delayed = self.delay_work_orders(holders)
+        if self.trace.tracing:
+            self.trace.record('equipment_failures', equipment_ids=list(failed), delayed=delayed)
+
+    def delay_work_orders(self, holders: list, reason: str = EQUIPMENT_FAILURE_REASON) -> list:
+        """
+        Sets the active work orders among holders (shipyard_data index labels) to Delayed.
+
+        Returns:
+            list: Index labels of the work orders that were delayed.
+        """
+        positions = self.shipyard_data.index.get_indexer(pd.Index(holders, dtype=object))
+        positions = np.unique(positions[positions >= 0])
+        positions = positions[np.isin(self.store.status[positions], ACTIVE_STATUSES)]
+        if not len(positions):
+            return []
+        self.store.set_status(positions, TaskStatus.DELAYED)
+        self.dependency_graph.update_flags(positions, np.zeros(len(positions), dtype=bool),
+                                          np.zeros(len(positions), dtype=bool))
+        self.trace.count('delayed', reason, len(positions))
+        return self.shipyard_data.index[positions].tolist()
+
+    def _count_security_events(self, events: list):
+        """
+        Counts security_attack events (by attack_type) and security_alert events (by kind).
+        """
+        for event in events:
+            event_type = event.get('type')
+            self.trace.count(event_type, event.get('kind' if event_type == 'security_alert' else 'attack_type'))
+        if self.trace.tracing:
+            self.trace.record('security_events', events=list(events))
 
 if __name__ == "__main__":
         # Configure logging (you might want to do this at the app level)
@@ -153,6 +543,7 @@ if __name__ == "__main__":
         engine.add_event({'type': 'supply_chain_delay', 'event_id': 'event1', 'reason': 'Severe Weather', 'time': 5})
         engine.add_event({'type': 'shipyard_equipment_failure', 'equipment_id': 'crane2', 'time': 10})
     
-        engine.start_simulation()  # Start the simulation loop
+        steps, reason = engine.run_until(until_complete=True, max_steps=20, jump_to_next_event=True)
+        print(f"Stopped after {steps} steps: {reason}")
         # You would likely have a mechanism in your Streamlit app to control the simulation
         # and retrieve data using engine.get_simulation_data()
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Min-cost bipartite assignment in pure NumPy.
+
+linear_sum_assignment() solves the rectangular assignment problem with the shortest augmenting path
+(Hungarian / Jonker-Volgenant style) algorithm: one augmentation per row of the smaller side, each a
+Dijkstra search whose inner loop is vectorized over the columns. When there are many more columns
+than rows, only the union of every row's n cheapest columns is searched, which keeps the optimum.
+"""
+import numpy as np
+
+
+def linear_sum_assignment(cost) -> tuple:
+    """
+    Finds the assignment of rows to columns with minimum total cost (every row of the smaller side
+    gets exactly one partner).
+
+    Args:
+        cost: 2-D array of finite costs.
+
+    Returns:
+        tuple: (row indices, column indices) of the assigned pairs, sorted by row, like
+        scipy.optimize.linear_sum_assignment.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.ndim != 2:
+        raise ValueError("cost must be a 2-D array")
+    if not np.isfinite(cost).all():
+        raise ValueError("cost contains NaN or infinite entries")
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    columns = np.arange(m, dtype=np.int64)
+    if m > 2 * n:
+        # Some optimal assignment only uses each row's n cheapest columns
+        columns = np.unique(np.argpartition(cost, n - 1, axis=1)[:, :n])
+        cost = cost[:, columns]
+    row_of_col = _augment(cost)
+
+    cols = np.flatnonzero(row_of_col >= 0)
+    rows = row_of_col[cols]
+    cols = columns[cols]
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows, kind='stable')
+    return rows[order], cols[order]
+
+
+def _augment(cost: np.ndarray) -> np.ndarray:
+    """
+    Runs the shortest augmenting path algorithm on an n x m cost matrix with n <= m.
+
+    Returns the row assigned to each column (-1 for unassigned columns).
+    """
+    n, m = cost.shape
+    u = np.zeros(n)  # Row potentials
+    v = np.zeros(m)  # Column potentials
+    row_of_col = np.full(m, -1, dtype=np.int64)
+    for row in range(n):
+        min_reduced = np.full(m, np.inf)  # Shortest reduced distance to each column found so far
+        via = np.full(m, -1, dtype=np.int64)  # Previous column on that shortest path (-1 = the new row)
+        used = np.zeros(m, dtype=bool)
+        used_columns = []
+        current_row, current_col = row, -1
+        while True:
+            reduced = cost[current_row] - u[current_row] - v
+            better = ~used & (reduced < min_reduced)
+            min_reduced[better] = reduced[better]
+            via[better] = current_col
+            col = int(np.argmin(np.where(used, np.inf, min_reduced)))
+            delta = min_reduced[col]
+            # Shift the potentials so every column on the search tree keeps zero reduced cost
+            if used_columns:
+                tree = np.asarray(used_columns, dtype=np.int64)
+                u[row_of_col[tree]] += delta
+                v[tree] -= delta
+            u[row] += delta
+            min_reduced[~used] -= delta
+            used[col] = True
+            used_columns.append(col)
+            current_col = col
+            if row_of_col[col] < 0:
+                break
+            current_row = row_of_col[col]
+        # Flip the augmenting path
+        while current_col >= 0:
+            previous = via[current_col]
+            row_of_col[current_col] = row_of_col[previous] if previous >= 0 else row
+            current_col = previous
+    return row_of_col
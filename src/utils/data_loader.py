@@ -1,42 +1,239 @@
-from fileinput import filename
+import hashlib
+import json
+import re
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 import logging
 import os  # Import the os module
+import tempfile
 
-def load_dataset(filename: str) -> pd.DataFrame:
+# Typed Arrow copies of the CSV datasets live here, next to the CSVs
+CACHE_DIR_NAME = '.cache'
+
+# Status/event columns loaded as pandas categoricals when present
+CATEGORICAL_COLUMNS = ('task_status', 'event_type', 'equipment_status', 'shipment_status', 'attack_type')
+
+# Categories that must exist even if no row has them yet, so agents can write them in place
+EXTRA_CATEGORIES = {
+    'task_status': ['Pending', 'In Progress', 'Completed', 'Delayed'],
+}
+
+# CSV bytes parsed per block while building a cache; bounds memory for files larger than RAM
+CSV_BLOCK_SIZE = 64 * 2 ** 20
+
+
+def load_dataset(filename: str, columns: list = None, categorical: list = None, use_cache: bool = True) -> pd.DataFrame:
     """
     Loads a CSV dataset into a pandas DataFrame.
 
+    The first load writes a typed Arrow IPC copy of the CSV to datasets/.cache, keyed by the file's
+    content hash (mtime and size are checked first so unchanged files are not re-hashed). Later loads
+    memory-map that copy instead of parsing the CSV again. If the cache cannot be read or written
+    (e.g. a read-only datasets directory), a warning is logged and the CSV is parsed directly.
+    Both ways use the same Arrow type inference, so a file loads with the same dtypes either way.
+
     Args:
-        filepath (str): The path to the CSV file.
+        filename (str): File name in the datasets directory, or a path.
+        columns (list): Only load these columns.
+        categorical (list): Columns to load as categoricals; defaults to the CATEGORICAL_COLUMNS present.
+        use_cache (bool): Read and write the Arrow cache; False parses the CSV directly.
 
     Returns:
         pd.DataFrame: The loaded DataFrame, or None if an error occurs.
     """
-    
-    # Construct the relative path to the datasets directory
-    #base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    datasets_dir = os.path.join(base_dir, 'datasets')
-    filepath = os.path.join(datasets_dir, filename)
+    filepath = _dataset_path(filename)
 
     try:
-        logging.info(f"Attempting to load dataset from: {filepath}")
-        logging.info(f"Current working directory: {os.getcwd()}")  # Log the current working directory
-        logging.info(f"Checking if file exists: {os.path.exists(filepath)}")  # Check if the file exists
-        df = pd.read_csv(filepath)
-        logging.info(f"Dataset loaded successfully from: {filepath}")
+        logging.info("Attempting to load dataset from: %s", filepath)
+        table = None
+        if use_cache:
+            try:
+                table = _read_cached_table(filepath, columns)
+            except OSError as e:
+                if not os.path.exists(filepath):
+                    raise
+                logging.warning("Dataset cache unavailable for %s (%s); parsing the CSV directly", filepath, e)
+        if table is None:
+            table = _read_csv_table(filepath, columns)
+        df = _apply_categoricals(table.to_pandas(), categorical)
+        logging.info("Dataset loaded successfully from: %s", filepath)
         return df
     except FileNotFoundError:
-        logging.error(f"Error: Dataset file not found at: {filepath}")
+        logging.error("Error: Dataset file not found at: %s", filepath)
         return None
-    except pd.errors.EmptyDataError:
-        logging.error(f"Error: Dataset file is empty: {filepath}")
+    except (pd.errors.EmptyDataError, pa.ArrowInvalid) as e:
+        logging.error("Error: Dataset file is empty or unreadable: %s (%s)", filepath, e)
         return None
     except Exception as e:
-        logging.error(f"An error occurred while loading the dataset: {e}")
+        logging.error("An error occurred while loading the dataset: %s", e)
         return None
 
+
+def iter_dataset_chunks(filename: str, columns: list = None, categorical: list = None):
+    """
+    Yields a dataset as a sequence of DataFrames, one per cached record batch.
+
+    Only one batch is materialized at a time, so this works for files larger than RAM.
+    Categorical columns are encoded per chunk, so their categories may differ between chunks.
+
+    Args:
+        filename (str): File name in the datasets directory, or a path.
+        columns (list): Only load these columns.
+        categorical (list): Columns to load as categoricals; defaults to the CATEGORICAL_COLUMNS present.
+    """
+    filepath = _dataset_path(filename)
+    reader = pa.ipc.open_file(pa.memory_map(_ensure_cache(filepath), 'r'))
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        if columns is not None:
+            batch = batch.select(columns)
+        yield _apply_categoricals(batch.to_pandas(), categorical)
+
+
+def _dataset_path(filename: str) -> str:
+    """
+    Resolves a dataset file name against the repository's datasets directory.
+    """
+    # Construct the relative path to the datasets directory
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    datasets_dir = os.path.join(base_dir, 'datasets')
+    return os.path.join(datasets_dir, filename)
+
+
+def _read_cached_table(filepath: str, columns: list = None) -> pa.Table:
+    """
+    Memory-maps the cached Arrow copy of a CSV (building it first if needed).
+    """
+    table = pa.ipc.open_file(pa.memory_map(_ensure_cache(filepath), 'r')).read_all()
+    return table.select(columns) if columns is not None else table
+
+
+def _ensure_cache(filepath: str) -> str:
+    """
+    Returns the path of an up-to-date Arrow cache file for a CSV, writing it if missing or stale.
+    """
+    stat = os.stat(filepath)  # Raises FileNotFoundError for missing datasets
+    cache_dir = os.path.join(os.path.dirname(filepath), CACHE_DIR_NAME)
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    meta_path = os.path.join(cache_dir, f"{stem}.meta.json")
+
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+    if meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size:
+        digest = meta['sha256']
+    else:
+        digest = _file_digest(filepath)
+
+    cache_path = os.path.join(cache_dir, f"{stem}-{digest[:16]}.arrow")
+    if not os.path.exists(cache_path):
+        os.makedirs(cache_dir, exist_ok=True)
+        logging.info("Building dataset cache: %s", cache_path)
+        _write_cache(filepath, cache_path)
+        for name in os.listdir(cache_dir):  # Drop caches of older versions of this file
+            if name.startswith(f"{stem}-") and name.endswith('.arrow') and name != os.path.basename(cache_path):
+                try:
+                    os.remove(os.path.join(cache_dir, name))
+                except FileNotFoundError:  # Another process dropped it first
+                    pass
+    if meta.get('sha256') != digest or meta.get('mtime_ns') != stat.st_mtime_ns:
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=f"{stem}.meta-", suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest}, f)
+        os.replace(tmp_path, meta_path)
+    return cache_path
+
+
+def _file_digest(filepath: str) -> str:
+    """
+    Computes the SHA-256 of a file in fixed-size blocks.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(2 ** 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_cache(filepath: str, cache_path: str):
+    """
+    Streams a CSV block by block into an uncompressed Arrow IPC file (memory-mappable).
+
+    The file is written under a unique temporary name in the cache directory and moved into
+    place when complete, so concurrent builds of the same cache do not overwrite each other.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path),
+                                    prefix=os.path.basename(cache_path) + '-', suffix='.tmp')
+    os.close(fd)
+
+    def write(reader):
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+
+    try:
+        _convert_csv(filepath, write)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _read_csv_table(filepath: str, columns: list = None) -> pa.Table:
+    """
+    Parses a CSV into an in-memory Arrow table with the same type inference as the cache.
+    """
+    return _convert_csv(filepath, lambda reader: pa.Table.from_batches(list(reader), reader.schema), columns)
+
+
+def _convert_csv(filepath: str, consume, columns: list = None):
+    """
+    Opens a block-wise Arrow CSV reader and returns consume(reader).
+
+    Column types are inferred from the first block. If a later block does not fit (e.g. an
+    integer column with a decimal further down), the offending column is widened and consume
+    runs again on a new reader.
+    """
+    column_types = {}
+    while True:
+        reader = None
+        try:
+            reader = pa_csv.open_csv(
+                filepath,
+                read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+                convert_options=pa_csv.ConvertOptions(column_types=column_types, strings_can_be_null=True,
+                                                      include_columns=columns),
+            )
+            return consume(reader)
+        except pa.ArrowInvalid as e:
+            match = re.search(r"column #(\d+)", str(e))
+            if match is None or reader is None:
+                raise
+            name = reader.schema.names[int(match.group(1))]
+            if name in column_types and column_types[name] == pa.string():
+                raise
+            widened = pa.float64() if pa.types.is_integer(reader.schema.field(name).type) and name not in column_types \
+                else pa.string()
+            logging.info("Widening column %s to %s while parsing %s", name, widened, filepath)
+            column_types[name] = widened
+
+
+def _apply_categoricals(df: pd.DataFrame, categorical: list = None) -> pd.DataFrame:
+    """
+    Converts status/event columns to categoricals, adding any EXTRA_CATEGORIES they need.
+    """
+    names = CATEGORICAL_COLUMNS if categorical is None else categorical
+    for column in names:
+        if column not in df.columns:
+            continue
+        values = df[column].astype('category')
+        missing = [c for c in EXTRA_CATEGORIES.get(column, []) if c not in values.cat.categories]
+        df[column] = values.cat.add_categories(missing) if missing else values
+    return df
+
+
 if __name__ == "__main__":
     # Configure logging (We will change to app level logging in the future)
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -52,4 +249,4 @@ if __name__ == "__main__":
     if supply_chain_data is not None:
         print("Supply chain data loaded successfully.")
     else:
-        print("Supply chain data loading failed.")
\ No newline at end of file
+        print("Supply chain data loading failed.")
@@ -0,0 +1,153 @@
+import bisect
+import logging
+import numpy as np
+import pandas as pd
+from src.utils.parsing import is_missing
+
+
+class DelayIndex:
+    """
+    Hash index from linked_shipyard_event to the first supply chain delay_reason.
+
+    Replaces filtering the whole supply chain frame once per work order. "First" follows row
+    order, as ``supply_chain_data[...].iloc[0]`` did. When supply chain rows are changed in place,
+    call refresh_rows() with their index labels to keep the index current. The events touched by
+    refreshes are collected for take_changes(), so consumers can revisit only affected work orders.
+    """
+
+    def __init__(self, supply_chain_data: pd.DataFrame):
+        """
+        Initializes the DelayIndex and builds it from supply_chain_data.
+        """
+        self.supply_chain_data = supply_chain_data
+        self.logger = logging.getLogger(__name__)
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Rebuilds the index from scratch.
+        """
+        data = self.supply_chain_data
+        self._size = len(data)
+        if 'linked_shipyard_event' in data.columns:
+            self._row_keys = data['linked_shipyard_event'].to_numpy(dtype=object).copy()
+        else:
+            self._row_keys = np.full(self._size, None, dtype=object)
+
+        self._rows = {}  # event -> sorted row positions
+        for position, key in enumerate(self._row_keys):
+            if not is_missing(key):
+                self._rows.setdefault(key, []).append(position)
+
+        self._reasons = {}  # event -> delay_reason of its first row
+        self._changed = None  # Events refreshed since the last take_changes(); None = everything
+        reasons = self._reason_column()
+        for key in self._rows:
+            self._update_first(key, reasons)
+        self.logger.info("Delay index built: %d linked events over %d supply chain rows",
+                         len(self._reasons), self._size)
+
+    def refresh_rows(self, index):
+        """
+        Updates the index for supply chain rows (by index label) whose linked_shipyard_event or
+        delay_reason changed.
+        """
+        data = self.supply_chain_data
+        if len(data) != self._size:  # Rows were added or dropped, positions are stale
+            self.rebuild()
+            return
+
+        positions = data.index.get_indexer(pd.Index(np.atleast_1d(index)))
+        positions = positions[positions >= 0]
+        if 'linked_shipyard_event' in data.columns:
+            new_keys = data['linked_shipyard_event'].to_numpy(dtype=object)[positions]
+        else:
+            new_keys = np.full(len(positions), None, dtype=object)
+
+        touched = set()
+        for position, new_key in zip(positions, new_keys):
+            old_key = self._row_keys[position]
+            if not _same_key(old_key, new_key):
+                if not is_missing(old_key):
+                    rows = self._rows[old_key]
+                    del rows[bisect.bisect_left(rows, position)]
+                    if not rows:
+                        del self._rows[old_key]
+                    touched.add(old_key)
+                if not is_missing(new_key):
+                    bisect.insort(self._rows.setdefault(new_key, []), position)
+                self._row_keys[position] = new_key
+            if not is_missing(new_key):
+                touched.add(new_key)
+
+        reasons = self._reason_column()
+        for key in touched:
+            self._update_first(key, reasons)
+        if self._changed is not None:
+            self._changed.update(touched)
+
+    def take_changes(self):
+        """
+        Returns the events whose delay reason may have changed since the last call, or None if the
+        index was rebuilt in between (any event may have changed), and starts a new change set.
+        """
+        changed = self._changed
+        self._changed = set()
+        return changed
+
+    def lookup(self, event):
+        """
+        Returns the delay reason for a linked event, or None if no supply chain row references it.
+        """
+        if is_missing(event):
+            return None
+        return self._reasons.get(event)
+
+    def lookup_many(self, events) -> np.ndarray:
+        """
+        Looks up many linked events at once; returns an object array with None for misses.
+        """
+        get = self._reasons.get
+        return np.fromiter((None if is_missing(event) else get(event) for event in events),
+                           dtype=object, count=len(events))
+
+    def rows_of(self, events) -> tuple:
+        """
+        Finds the supply chain rows linked to each of several events.
+
+        Returns:
+            tuple: (row positions, position in events of the event each row belongs to).
+        """
+        rows = [self._rows.get(event, ()) if not is_missing(event) else () for event in events]
+        counts = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+        positions = np.fromiter((p for r in rows for p in r), dtype=np.int64, count=int(counts.sum()))
+        return positions, np.repeat(np.arange(len(rows), dtype=np.int64), counts)
+
+    def _reason_column(self):
+        """
+        Returns the delay_reason column as an object array, or None if the column is missing.
+        """
+        if 'delay_reason' not in self.supply_chain_data.columns:
+            return None
+        return self.supply_chain_data['delay_reason'].to_numpy(dtype=object)
+
+    def _update_first(self, key, reasons: np.ndarray):
+        """
+        Refreshes the cached reason for key from its first supply chain row.
+        """
+        rows = self._rows.get(key)
+        if not rows:
+            self._reasons.pop(key, None)
+        elif reasons is not None:
+            self._reasons[key] = reasons[rows[0]]
+        else:
+            self._reasons[key] = "Unknown delay"
+
+
+def _same_key(a, b) -> bool:
+    """
+    Compares two index keys, treating all missing values as equal.
+    """
+    if is_missing(a) or is_missing(b):
+        return is_missing(a) and is_missing(b)
+    return a == b
@@ -0,0 +1,254 @@
+import logging
+import numpy as np
+import pandas as pd
+from src.utils.parsing import as_task_list
+
+COMPLETED = 'Completed'
+PENDING = 'Pending'
+
+
+class DependencyGraph:
+    """
+    Dependency DAG over work orders, built once from prerequisite_tasks.
+
+    Nodes are shipyard_data row positions. Each prerequisite ID resolves to the first row with that
+    work_order_id; prerequisites that match no row stay unmet forever. Every row keeps a counter of
+    unmet prerequisites that moves by one per status transition of a prerequisite, so readiness is
+    never recomputed by scanning the frame. Pending rows with no unmet prerequisites form the ready set.
+    """
+
+    def __init__(self, shipyard_data: pd.DataFrame):
+        """
+        Initializes the DependencyGraph and builds it from shipyard_data.
+        """
+        self.shipyard_data = shipyard_data
+        self.logger = logging.getLogger(__name__)
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Rebuilds edges, unmet counters and the ready set from the current frame.
+        """
+        data = self.shipyard_data
+        n = len(data)
+        self._size = n
+        if 'work_order_id' in data.columns:
+            self._ids = data['work_order_id'].to_numpy(dtype=object)
+            first = data['work_order_id'].notna().to_numpy() & ~data['work_order_id'].duplicated().to_numpy()
+        else:
+            self._ids = np.full(n, None, dtype=object)
+            first = np.zeros(n, dtype=bool)
+        first_pos = np.flatnonzero(first)
+        id_index = pd.Index(self._ids[first_pos], dtype=object)
+
+        if 'prerequisite_tasks' in data.columns:
+            task_lists = [as_task_list(value) for value in data['prerequisite_tasks'].to_numpy(dtype=object)]
+        else:
+            task_lists = [[] for _ in range(n)]
+        counts = np.fromiter((len(tasks) for tasks in task_lists), dtype=np.int64, count=n)
+        dst = np.repeat(np.arange(n, dtype=np.int64), counts)
+        match = id_index.get_indexer(pd.Index([task for tasks in task_lists for task in tasks], dtype=object))
+        src = np.where(match >= 0, first_pos[np.maximum(match, 0)] if len(first_pos) else -1, -1).astype(np.int64)
+        self._src = src
+        self._dst = dst
+
+        # CSR adjacency: out-edges of each prerequisite row
+        linked = src >= 0
+        order = np.argsort(src[linked], kind='stable')
+        self._out_dst = dst[linked][order]
+        self._out_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src[linked], minlength=n), out=self._out_offsets[1:])
+
+        missing = int((~linked).sum())
+        if missing:
+            self.logger.warning("%d prerequisite references match no work order and can never be met", missing)
+
+        status = self._status_array()
+        self._completed = status == COMPLETED
+        self._pending = status == PENDING
+        blocking = ~linked | ~self._completed[np.maximum(src, 0)]
+        self.unmet = np.bincount(dst[blocking], minlength=n).astype(np.int64)
+        self.ready = set(np.flatnonzero(self._pending & (self.unmet == 0)).tolist())
+        self.logger.info("Dependency graph built: %d work orders, %d prerequisite edges", n, len(dst))
+
+    def out_edges(self, positions) -> tuple:
+        """
+        Returns (src, dst) arrays for all dependency edges leaving the given prerequisite rows.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        starts = self._out_offsets[positions]
+        lengths = self._out_offsets[positions + 1] - starts
+        src = np.repeat(positions, lengths)
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return src, self._out_dst[offsets]
+
+    def update_status(self, positions, statuses):
+        """
+        Applies status transitions for the given rows, adjusting dependents' unmet counters
+        and the ready set.
+        """
+        statuses = np.asarray(statuses, dtype=object)
+        self.update_flags(positions, statuses == COMPLETED, statuses == PENDING)
+
+    def update_flags(self, positions, completed, pending):
+        """
+        Same as update_status, for callers that already hold Completed/Pending masks of the rows.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        if not len(positions):
+            return
+        completed = np.asarray(completed, dtype=bool)
+        flipped = positions[completed != self._completed[positions]]
+        self._completed[positions] = completed
+        self._pending[positions] = pending
+
+        touched = positions
+        if len(flipped):
+            src, dst = self.out_edges(flipped)
+            # Prerequisite became Completed -> one fewer unmet; left Completed -> one more
+            np.add.at(self.unmet, dst, np.where(self._completed[src], -1, 1))
+            touched = np.concatenate([positions, dst])
+
+        for position in np.unique(touched).tolist():
+            if self._pending[position] and self.unmet[position] == 0:
+                self.ready.add(position)
+            else:
+                self.ready.discard(position)
+
+    def sync(self, statuses: np.ndarray = None):
+        """
+        Brings the graph in line with statuses written by someone else (defaults to the frame).
+        """
+        if statuses is None:
+            statuses = self._status_array()
+        self.sync_flags(statuses == COMPLETED, statuses == PENDING)
+
+    def sync_flags(self, completed: np.ndarray, pending: np.ndarray):
+        """
+        Same as sync, given full-length Completed/Pending masks instead of status labels.
+        """
+        if len(self.shipyard_data) != self._size:
+            self.rebuild()
+            return
+        stale = np.flatnonzero((completed != self._completed) | (pending != self._pending))
+        if len(stale):
+            self.update_flags(stale, completed[stale], pending[stale])
+
+    def ready_positions(self) -> np.ndarray:
+        """
+        Returns the sorted row positions of Pending work orders whose prerequisites are all met.
+        """
+        return np.sort(np.fromiter(self.ready, dtype=np.int64, count=len(self.ready)))
+
+    def topological_levels(self) -> np.ndarray:
+        """
+        Assigns every row its depth in the DAG (0 = no prerequisites) using Kahn's algorithm.
+
+        Rows on or behind a cycle get -1.
+        """
+        n = self._size
+        linked = self._src >= 0
+        indegree = np.bincount(self._dst[linked], minlength=n)
+        levels = np.full(n, -1, dtype=np.int64)
+        frontier = np.flatnonzero(indegree == 0)
+        depth = 0
+        while len(frontier):
+            levels[frontier] = depth
+            _, dst = self.out_edges(frontier)
+            np.subtract.at(indegree, dst, 1)
+            candidates = np.unique(dst)
+            frontier = candidates[(indegree[candidates] == 0) & (levels[candidates] < 0)]
+            depth += 1
+        return levels
+
+    def find_cycle(self) -> list:
+        """
+        Returns the work order IDs of one dependency cycle, or an empty list if the graph is acyclic.
+        """
+        blocked = np.flatnonzero(self.topological_levels() < 0)
+        if not len(blocked):
+            return []
+        # Every blocked row has a blocked prerequisite; walking prerequisites must revisit a row
+        blocked_set = set(blocked.tolist())
+        predecessor = {}
+        for src, dst in zip(self._src.tolist(), self._dst.tolist()):
+            if src in blocked_set and dst in blocked_set:
+                predecessor.setdefault(dst, src)
+        seen = {}
+        position = int(blocked[0])
+        while position not in seen:
+            seen[position] = len(seen)
+            position = predecessor[position]
+        cycle = [p for p, _ in sorted(seen.items(), key=lambda item: item[1])][seen[position]:]
+        return [self._ids[p] for p in reversed(cycle)]
+
+    def has_cycle(self) -> bool:
+        """
+        Checks whether prerequisite_tasks contain a dependency cycle.
+        """
+        return bool((self.topological_levels() < 0).any())
+
+    def critical_path(self, durations=None, include_completed: bool = False) -> list:
+        """
+        Returns the work order IDs along the longest prerequisite chain.
+
+        Args:
+            durations: Per-row durations (array-like or column name); each order counts 1 if omitted.
+            include_completed (bool): Count completed orders too; by default only the remaining
+                work that still gates throughput is considered.
+
+        Raises:
+            ValueError: If the dependency graph contains a cycle.
+        """
+        n = self._size
+        if n == 0:
+            return []
+        levels = self.topological_levels()
+        if (levels < 0).any():
+            raise ValueError(f"Dependency cycle detected: {self.find_cycle()}")
+
+        if durations is None:
+            weights = np.ones(n, dtype=float)
+        elif isinstance(durations, str):
+            weights = self.shipyard_data[durations].to_numpy(dtype=float)
+        else:
+            weights = np.asarray(durations, dtype=float)
+        if not include_completed:
+            weights = np.where(self._completed, 0.0, weights)
+
+        # Longest path, relaxing edges level by level in topological order
+        finish = weights.copy()
+        predecessor = np.full(n, -1, dtype=np.int64)
+        linked = self._src >= 0
+        src, dst = self._src[linked], self._dst[linked]
+        edge_level = levels[dst]
+        order = np.argsort(edge_level, kind='stable')
+        src, dst, edge_level = src[order], dst[order], edge_level[order]
+        bounds = np.flatnonzero(np.diff(edge_level)) + 1
+        for level_src, level_dst in zip(np.split(src, bounds), np.split(dst, bounds)):
+            if not len(level_dst):
+                continue
+            # Best predecessor per destination: sort by (dst, finish) and keep the last of each group
+            by_finish = np.lexsort((finish[level_src], level_dst))
+            level_src, level_dst = level_src[by_finish], level_dst[by_finish]
+            last = np.r_[level_dst[1:] != level_dst[:-1], True]
+            best_src, best_dst = level_src[last], level_dst[last]
+            finish[best_dst] = weights[best_dst] + finish[best_src]
+            predecessor[best_dst] = best_src
+
+        path = []
+        position = int(np.argmax(finish))
+        while position >= 0:
+            path.append(position)
+            position = int(predecessor[position])
+        if not include_completed:
+            path = [p for p in path if not self._completed[p]]
+        return [self._ids[p] for p in reversed(path)]
+
+    def _status_array(self) -> np.ndarray:
+        """
+        Returns task_status as an object array ('Pending' where the column does not exist yet).
+        """
+        if 'task_status' in self.shipyard_data.columns:
+            return self.shipyard_data['task_status'].to_numpy(dtype=object)
+        return np.full(len(self.shipyard_data), PENDING, dtype=object)
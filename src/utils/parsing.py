@@ -0,0 +1,74 @@
+"""
+Helpers for interpreting dataset cells the same way across row-wise and vectorized code paths.
+"""
+import ast
+import json
+import re
+import numpy as np
+import pandas as pd
+
+
+def truthy(values) -> np.ndarray:
+    """
+    Evaluates Python truthiness element-wise, matching ``if value:`` on each cell.
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    if series.dtype == bool:
+        return series.to_numpy()
+    if series.dtype.kind in 'iuf':
+        return series.to_numpy() != 0
+    objects = series.to_numpy(dtype=object)
+    try:
+        return np.fromiter(map(bool, objects), dtype=bool, count=len(objects))
+    except TypeError:  # pd.NA and similar have no truth value
+        return np.fromiter((value is not pd.NA and bool(value) for value in objects),
+                           dtype=bool, count=len(objects))
+
+
+def is_missing(value) -> bool:
+    """
+    Checks for None/NaN scalars without tripping over list-like values.
+    """
+    return value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NA
+
+
+def as_task_list(value) -> list:
+    """
+    Normalizes a prerequisite_tasks cell to a list of work order IDs.
+
+    Accepts lists/tuples/arrays, delimited strings as read from CSV ("WO1;WO2", "['WO1', 'WO2']")
+    and single IDs. Missing values mean no prerequisites.
+    """
+    if isinstance(value, (list, tuple, set, np.ndarray, pd.Series)):
+        return list(value)
+    if is_missing(value):
+        return []
+    if isinstance(value, str):
+        tokens = re.split(r'[,;|]', value.strip().strip('[]()'))
+        return [token.strip().strip('\'"') for token in tokens if token.strip().strip('\'"')]
+    return [value]
+
+
+def as_resource_map(value) -> dict:
+    """
+    Normalizes a required_resources cell to a {resource: quantity} dict.
+
+    Accepts dicts, dict literals/JSON as read from CSV, and delimited "crane:1,agv:2" or
+    "crane,agv" strings. Missing values mean no requirements.
+    """
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith('{'):
+            try:
+                return json.loads(text)
+            except ValueError:
+                return ast.literal_eval(text)
+        resources = {}
+        for token in re.split(r'[,;|]', text):
+            name, _, quantity = token.partition(':')
+            if name.strip():
+                resources[name.strip()] = int(quantity) if quantity.strip() else 1
+        return resources
+    return {}
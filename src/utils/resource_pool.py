@@ -0,0 +1,315 @@
+import heapq
+import logging
+import numpy as np
+import pandas as pd
+from src.utils.parsing import is_missing
+
+# Resource type -> shipyard_data column holding the assigned resource ID
+RESOURCE_COLUMNS = {
+    'crane': 'crane_id',
+    'agv': 'agv_id',
+    'forklift': 'forklift_id',
+}
+
+# Inventory used when neither the caller nor the dataset names any resources
+DEFAULT_COUNTS = {'crane': 1, 'agv': 1, 'forklift': 1}
+
+
+class ResourcePool:
+    """
+    Typed inventory of cranes, AGVs and forklifts with per-type free lists.
+
+    Free resources of each type sit in a min-heap of inventory positions, so acquiring or releasing
+    one is O(log R) and resources are always handed out in inventory order. A lease ties a
+    resource to a holder (the shipyard_data index label of a work order) until it is released.
+    """
+
+    def __init__(self, inventory: dict):
+        """
+        Initializes the ResourcePool.
+
+        Args:
+            inventory (dict): Resource type -> list of resource IDs.
+        """
+        self.logger = logging.getLogger(__name__)
+        self._ids = {resource_type: list(ids) for resource_type, ids in inventory.items()}
+        self._position = {}  # resource ID -> (type, inventory position)
+        for resource_type, ids in self._ids.items():
+            for position, resource_id in enumerate(ids):
+                if resource_id in self._position:
+                    raise ValueError(f"Duplicate resource ID in inventory: {resource_id}")
+                self._position[resource_id] = (resource_type, position)
+        self._free = {resource_type: list(range(len(ids))) for resource_type, ids in self._ids.items()}
+        self._holder = {}  # resource ID -> holder
+        self._leases = {}  # holder -> list of resource IDs
+        self._leased_count = dict.fromkeys(self._ids, 0)
+        self._out_of_service = set()
+        self.total_acquired = 0
+        self.total_released = 0
+
+    @classmethod
+    def from_counts(cls, counts: dict) -> 'ResourcePool':
+        """
+        Creates a pool with generated IDs, e.g. {'crane': 2} -> crane1, crane2.
+        """
+        return cls({resource_type: [f"{resource_type}{i}" for i in range(1, count + 1)]
+                    for resource_type, count in counts.items()})
+
+    @classmethod
+    def from_shipyard_data(cls, shipyard_data: pd.DataFrame, default_counts: dict = None) -> 'ResourcePool':
+        """
+        Creates a pool from the resource IDs already present in shipyard_data.
+
+        Types with no IDs in the data fall back to default_counts (one of each by default).
+        Resources recorded on active work orders (not Completed/Delayed) are adopted as leases.
+        """
+        default_counts = DEFAULT_COUNTS if default_counts is None else default_counts
+        inventory = {}
+        for resource_type, column in RESOURCE_COLUMNS.items():
+            ids = []
+            if column in shipyard_data.columns:
+                ids = [value for value in pd.unique(shipyard_data[column].to_numpy(dtype=object))
+                       if not is_missing(value)]
+            if not ids:
+                ids = [f"{resource_type}{i}" for i in range(1, default_counts.get(resource_type, 0) + 1)]
+            inventory[resource_type] = ids
+        pool = cls(inventory)
+        pool.adopt_assignments(shipyard_data)
+        return pool
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'ResourcePool':
+        """
+        Recreates a pool saved with get_state(), including its leases and out-of-service resources.
+        """
+        pool = cls(state['inventory'])
+        for holder, resource_ids in state['leases']:
+            for resource_id in resource_ids:
+                pool._lease(resource_id, holder)
+        pool._out_of_service = set(state['out_of_service'])
+        # Sorted position lists are valid heaps
+        for resource_type, ids in pool._ids.items():
+            pool._free[resource_type] = [position for position, resource_id in enumerate(ids)
+                                         if resource_id not in pool._holder and resource_id not in pool._out_of_service]
+        pool.total_acquired = state['total_acquired']
+        pool.total_released = state['total_released']
+        return pool
+
+    def get_state(self) -> dict:
+        """
+        Returns the pool's inventory, leases and counters as plain lists and dicts (JSON-serializable
+        as long as the holders are).
+        """
+        return {
+            'inventory': self.inventory(),
+            'leases': [[holder, list(resource_ids)] for holder, resource_ids in self._leases.items()],
+            'out_of_service': sorted(self._out_of_service, key=str),
+            'total_acquired': self.total_acquired,
+            'total_released': self.total_released,
+        }
+
+    def adopt_assignments(self, shipyard_data: pd.DataFrame):
+        """
+        Registers resources already recorded on active work orders as leased to those orders.
+        """
+        if 'task_status' in shipyard_data.columns:
+            active = ~shipyard_data['task_status'].isin(['Completed', 'Delayed']).to_numpy()
+        else:
+            active = np.ones(len(shipyard_data), dtype=bool)
+        for column in RESOURCE_COLUMNS.values():
+            if column not in shipyard_data.columns:
+                continue
+            values = shipyard_data[column].to_numpy(dtype=object)
+            for position in np.flatnonzero(active & shipyard_data[column].notna().to_numpy()):
+                resource_id = values[position]
+                if resource_id in self._position and resource_id not in self._holder:
+                    self._take(resource_id, shipyard_data.index[position])
+
+    def acquire(self, resource_type: str, holder):
+        """
+        Leases the first free resource of a type to holder; returns its ID or None if none are free.
+        """
+        free = self._free.get(resource_type)
+        if not free:
+            return None
+        resource_id = self._ids[resource_type][heapq.heappop(free)]
+        self._lease(resource_id, holder)
+        return resource_id
+
+    def acquire_many(self, resource_type: str, holders) -> list:
+        """
+        Leases resources of one type to holders in order until the type runs out.
+
+        Returns the leased IDs; holders beyond the returned length got nothing.
+        """
+        leased = []
+        for holder in holders:
+            resource_id = self.acquire(resource_type, holder)
+            if resource_id is None:
+                break
+            leased.append(resource_id)
+        return leased
+
+    def acquire_ids(self, resource_ids, holders):
+        """
+        Leases specific free resources to holders (pairwise), rebuilding each affected free heap once.
+
+        Raises:
+            ValueError: If a resource is unknown, leased or out of service (nothing is leased then).
+        """
+        pairs = list(zip(resource_ids, holders))
+        taken = {}  # type -> inventory positions to take off the free list
+        for resource_id, _ in pairs:
+            if resource_id not in self._position or resource_id in self._holder or resource_id in self._out_of_service:
+                raise ValueError(f"Resource is not free: {resource_id}")
+            resource_type, position = self._position[resource_id]
+            taken.setdefault(resource_type, set()).add(position)
+        for resource_type, positions in taken.items():
+            free = [position for position in self._free[resource_type] if position not in positions]
+            heapq.heapify(free)
+            self._free[resource_type] = free
+        for resource_id, holder in pairs:
+            self._lease(resource_id, holder)
+
+    def release(self, holder) -> list:
+        """
+        Returns every resource leased to holder to its free list.
+        """
+        released = self._leases.pop(holder, [])
+        for resource_id in released:
+            del self._holder[resource_id]
+            self._leased_count[self._position[resource_id][0]] -= 1
+            if resource_id not in self._out_of_service:
+                resource_type, position = self._position[resource_id]
+                heapq.heappush(self._free[resource_type], position)
+        self.total_released += len(released)
+        return released
+
+    def release_many(self, holders) -> int:
+        """
+        Releases the leases of several holders; returns the number of resources freed.
+        """
+        return sum(len(self.release(holder)) for holder in holders)
+
+    def set_out_of_service(self, resource_id, out_of_service: bool = True):
+        """
+        Takes a resource out of (or back into) service. An out-of-service resource is never handed
+        out; if it is leased, the lease stays until released.
+        """
+        if resource_id not in self._position:
+            self.logger.warning("Unknown resource: %s", resource_id)
+            return
+        if out_of_service:
+            if resource_id not in self._out_of_service and resource_id not in self._holder:
+                self._remove_from_free(resource_id)
+            self._out_of_service.add(resource_id)
+        elif resource_id in self._out_of_service:
+            self._out_of_service.discard(resource_id)
+            if resource_id not in self._holder:
+                resource_type, position = self._position[resource_id]
+                heapq.heappush(self._free[resource_type], position)
+
+    def set_out_of_service_many(self, resource_ids) -> list:
+        """
+        Takes several resources out of service at once, rebuilding each affected free heap once.
+
+        Returns the known resource IDs (unknown ones are skipped).
+        """
+        known = [resource_id for resource_id in dict.fromkeys(resource_ids) if resource_id in self._position]
+        self._out_of_service.update(known)
+        for resource_type in {self._position[resource_id][0] for resource_id in known}:
+            ids = self._ids[resource_type]
+            free = [position for position in self._free[resource_type] if ids[position] not in self._out_of_service]
+            heapq.heapify(free)
+            self._free[resource_type] = free
+        return known
+
+    def holders(self) -> list:
+        """
+        Lists the holders that currently lease at least one resource.
+        """
+        return list(self._leases)
+
+    def holder_of(self, resource_id):
+        """
+        Returns the holder leasing a resource, or None if it is not leased.
+        """
+        return self._holder.get(resource_id)
+
+    def leases_of(self, holder) -> list:
+        """
+        Returns the resource IDs leased to holder.
+        """
+        return list(self._leases.get(holder, []))
+
+    def resource_type(self, resource_id) -> str:
+        """
+        Returns the type of a resource ID, or None if it is not in the inventory.
+        """
+        entry = self._position.get(resource_id)
+        return entry[0] if entry else None
+
+    def inventory(self) -> dict:
+        """
+        Returns resource type -> list of all resource IDs of that type, in inventory order.
+        """
+        return {resource_type: list(ids) for resource_type, ids in self._ids.items()}
+
+    def available(self, resource_type: str) -> int:
+        """
+        Counts the free, in-service resources of a type.
+        """
+        return len(self._free.get(resource_type, ()))
+
+    def free_ids(self, resource_type: str) -> list:
+        """
+        Returns the free, in-service resource IDs of a type, in inventory order.
+        """
+        ids = self._ids.get(resource_type, [])
+        return [ids[position] for position in sorted(self._free.get(resource_type, ()))]
+
+    def utilization(self) -> dict:
+        """
+        Reports total/leased/free/out-of-service counts and the leased share for each resource type.
+        """
+        out_of_service = dict.fromkeys(self._ids, 0)
+        for resource_id in self._out_of_service:
+            out_of_service[self._position[resource_id][0]] += 1
+        report = {}
+        for resource_type, ids in self._ids.items():
+            total = len(ids)
+            leased = self._leased_count[resource_type]
+            report[resource_type] = {
+                'total': total,
+                'leased': leased,
+                'free': len(self._free[resource_type]),
+                'out_of_service': out_of_service[resource_type],
+                'utilization': leased / total if total else 0.0,
+            }
+        return report
+
+    def _take(self, resource_id, holder):
+        """
+        Leases a specific resource, removing it from its free list.
+        """
+        self._remove_from_free(resource_id)
+        self._lease(resource_id, holder)
+
+    def _remove_from_free(self, resource_id):
+        """
+        Removes a resource from its free heap (O(R), only used outside the allocation hot path).
+        """
+        resource_type, position = self._position[resource_id]
+        free = self._free[resource_type]
+        if position in free:
+            free.remove(position)
+            heapq.heapify(free)
+
+    def _lease(self, resource_id, holder):
+        """
+        Records resource_id as leased to holder.
+        """
+        self._holder[resource_id] = holder
+        self._leased_count[self._position[resource_id][0]] += 1
+        self._leases.setdefault(holder, []).append(resource_id)
+        self.total_acquired += 1
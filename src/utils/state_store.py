@@ -0,0 +1,246 @@
+import logging
+from enum import IntEnum
+import numpy as np
+import pandas as pd
+from src.utils.parsing import is_missing
+from src.utils.resource_pool import RESOURCE_COLUMNS
+
+
+class TaskStatus(IntEnum):
+    """
+    Integer codes of the work order states; the codes are the categorical codes of task_status.
+    """
+    PENDING = 0
+    IN_PROGRESS = 1
+    COMPLETED = 2
+    DELAYED = 3
+
+
+STATUS_LABELS = ['Pending', 'In Progress', 'Completed', 'Delayed']
+
+
+class DirtySet:
+    """
+    Rows changed since one consumer (e.g. an agent) last looked, as a boolean mask over row positions.
+
+    Every store write marks the row in all of the store's dirty sets; each consumer takes its own
+    set once per pass. A new set starts with every row marked, so a consumer's first pass is a full one.
+    """
+
+    def __init__(self, size: int):
+        self.mask = np.ones(size, dtype=bool)
+
+    def add(self, positions):
+        """
+        Marks rows as changed.
+        """
+        self.mask[positions] = True
+
+    def add_all(self):
+        """
+        Marks every row as changed (forces a full pass).
+        """
+        self.mask[:] = True
+
+    def take(self) -> np.ndarray:
+        """
+        Returns the sorted positions of the changed rows and clears the set.
+        """
+        positions = np.flatnonzero(self.mask)
+        self.mask[positions] = False
+        return positions
+
+
+class WorkOrderStore:
+    """
+    Compact, array-backed state of the shipyard work orders.
+
+    task_status is held as int8 codes (TaskStatus, plus any other statuses found in the data) and
+    each resource ID column as int8/16/32 codes into a fixed list of IDs (-1 = none). The store's
+    ``frame`` is a pandas view over the same memory: those columns are Categoricals built on the
+    code arrays without copying, and the other columns are the original ones. Writes through the
+    store, and in-place pandas writes of known categories, are visible on both sides. Rows written
+    through the store are tracked as dirty until cleared.
+    """
+
+    def __init__(self, shipyard_data: pd.DataFrame, resource_ids: dict = None):
+        """
+        Initializes the WorkOrderStore from shipyard_data.
+
+        Args:
+            shipyard_data (pd.DataFrame): Work orders to take over; this frame is not modified.
+            resource_ids (dict): Resource type -> IDs that may be assigned later (e.g.
+                ResourcePool.inventory()). IDs already present in the data are always included.
+        """
+        self.logger = logging.getLogger(__name__)
+        resource_ids = resource_ids or {}
+        n = len(shipyard_data)
+
+        # task_status: the four known states first so their codes match TaskStatus
+        if 'task_status' in shipyard_data.columns:
+            status_values = shipyard_data['task_status'].astype(object)
+        else:
+            status_values = pd.Series(STATUS_LABELS[TaskStatus.PENDING], index=shipyard_data.index, dtype=object)
+        extra = [s for s in pd.unique(status_values.dropna()) if s not in STATUS_LABELS]
+        self.status_dtype = pd.CategoricalDtype(STATUS_LABELS + sorted(extra, key=str))
+        if _code_dtype(len(self.status_dtype.categories)) != np.int8:
+            raise ValueError("Too many distinct task_status values for int8 codes")
+        self.status = self.status_dtype.categories.get_indexer(status_values).astype(np.int8)
+        self.status[status_values.isna().to_numpy()] = -1
+
+        # Resource IDs: categories are the known inventory plus anything already assigned
+        self.resource_dtypes = {}
+        self.resource_codes = {}
+        for resource_type, column in RESOURCE_COLUMNS.items():
+            values = shipyard_data[column].astype(object) if column in shipyard_data.columns \
+                else pd.Series(None, index=shipyard_data.index, dtype=object)
+            known = list(dict.fromkeys(list(resource_ids.get(resource_type, [])) +
+                                       [v for v in pd.unique(values) if not is_missing(v)]))
+            dtype = pd.CategoricalDtype(pd.Index(known, dtype=object))
+            self.resource_dtypes[column] = dtype
+            codes = dtype.categories.get_indexer(values).astype(_code_dtype(len(known)))
+            codes[values.isna().to_numpy()] = -1
+            self.resource_codes[column] = codes
+
+        columns = {}
+        for column in shipyard_data.columns:
+            columns[column] = shipyard_data[column]
+        columns['task_status'] = pd.Categorical.from_codes(self.status, dtype=self.status_dtype)
+        for column, codes in self.resource_codes.items():
+            columns[column] = pd.Categorical.from_codes(codes, dtype=self.resource_dtypes[column])
+        # copy=False keeps the Categoricals on the code arrays above, so both sides see every write
+        self.frame = pd.DataFrame(columns, index=shipyard_data.index, copy=False)
+        for column, codes in [('task_status', self.status)] + list(self.resource_codes.items()):
+            # Empty arrays never share memory; there is nothing to go stale
+            if len(codes) and not np.shares_memory(self.frame[column].array.codes, codes):
+                raise RuntimeError(f"pandas copied the {column} codes; the store view would go stale")
+        self.dirty = np.zeros(n, dtype=bool)
+        self._trackers = []  # DirtySets of the store's consumers
+        self.rows_written = 0  # Running count of row writes through the store (for profiling)
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        Returns the zero-copy pandas view of the store (for the UI); treat it as read-only.
+        """
+        return self.frame
+
+    def status_code(self, label: str) -> int:
+        """
+        Returns the code of a status label, or -1 if the label is unknown.
+        """
+        return int(self.status_dtype.categories.get_indexer([label])[0])
+
+    def status_labels(self, positions=None) -> np.ndarray:
+        """
+        Decodes status codes (all rows, or the given positions) to an object array of labels.
+        """
+        return self.decode_status(self.status if positions is None else self.status[positions])
+
+    def decode_status(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Maps status codes to an object array of labels (NaN for -1).
+        """
+        labels = np.asarray(self.status_dtype.categories, dtype=object)
+        return np.where(codes >= 0, labels[np.maximum(codes, 0)], np.nan)
+
+    def set_status(self, positions, codes):
+        """
+        Writes status codes for the given row positions and marks the rows that changed as dirty.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        codes = np.broadcast_to(np.asarray(codes, dtype=np.int8), positions.shape)
+        changed = self.status[positions] != codes
+        self.status[positions] = codes
+        self._touch(positions[changed])
+        self.rows_written += int(changed.sum())
+
+    def resource_ids(self, column: str, positions=None) -> np.ndarray:
+        """
+        Decodes a resource ID column (all rows, or the given positions) to an object array (None = unassigned).
+        """
+        codes = self.resource_codes[column] if positions is None else self.resource_codes[column][positions]
+        ids = np.asarray(self.resource_dtypes[column].categories, dtype=object)
+        if not len(ids):  # No known IDs of this type, so nothing can be assigned
+            return np.full(len(codes), None, dtype=object)
+        return np.where(codes >= 0, ids[np.maximum(codes, 0)], None)
+
+    def assign_resources(self, column: str, positions, resource_ids):
+        """
+        Records resource IDs (one per position, or None to clear) for the given row positions and marks those rows dirty.
+
+        Raises:
+            ValueError: If an ID is not one of the store's known resource IDs.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        if resource_ids is None:
+            codes = -1
+        else:
+            codes = self.resource_dtypes[column].categories.get_indexer(pd.Index(resource_ids, dtype=object))
+            if (codes < 0).any():
+                unknown = pd.Index(resource_ids, dtype=object)[codes < 0]
+                raise ValueError(f"Unknown {column} values: {list(unknown[:5])}")
+        self.resource_codes[column][positions] = codes
+        self._touch(positions)
+        self.rows_written += len(positions)
+
+    def mark_dirty(self, positions):
+        """
+        Flags rows as changed (e.g. after an in-place pandas write).
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        self._touch(positions)
+        self.rows_written += len(positions)
+
+    def track_changes(self) -> DirtySet:
+        """
+        Returns a new DirtySet that receives every row changed from now on (all rows start marked).
+        """
+        tracker = DirtySet(len(self))
+        self._trackers.append(tracker)
+        return tracker
+
+    def _touch(self, positions: np.ndarray):
+        """
+        Marks rows dirty in the store and in every DirtySet.
+        """
+        self.dirty[positions] = True
+        for tracker in self._trackers:
+            tracker.add(positions)
+
+    def dirty_positions(self) -> np.ndarray:
+        """
+        Returns the positions of rows changed since the last clear_dirty().
+        """
+        return np.flatnonzero(self.dirty)
+
+    def clear_dirty(self) -> np.ndarray:
+        """
+        Returns the dirty positions and resets the tracking.
+        """
+        positions = np.flatnonzero(self.dirty)
+        self.dirty[positions] = False
+        return positions
+
+    def memory_usage(self) -> int:
+        """
+        Bytes used by the store-managed columns (codes plus their category labels).
+        """
+        usage = self.status.nbytes + self.dirty.nbytes
+        for column, codes in self.resource_codes.items():
+            usage += codes.nbytes + int(self.resource_dtypes[column].categories.memory_usage(deep=True))
+        return usage
+
+
+def _code_dtype(size: int):
+    """
+    Returns the code dtype pandas uses for a Categorical with size categories.
+
+    Code arrays of exactly this dtype are wrapped by Categorical.from_codes without a copy.
+    """
+    for dtype in (np.int8, np.int16, np.int32):
+        if size < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
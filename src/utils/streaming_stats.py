@@ -0,0 +1,308 @@
+"""
+Streaming aggregates for event streams: per-key rates with z-scores and per-entity transition rarity.
+
+Both trackers keep O(1) state per key (numpy arrays indexed by integer key codes) and take whole
+batches of events at once; a batch is processed with a few sorts and array operations, and the
+results do not depend on how the stream is split into batches.
+"""
+import numpy as np
+import pandas as pd
+
+# Largest rescaling factor in RateTracker's prefix sums (bounds their rounding error)
+MAX_RESCALE = 1e3
+
+
+class KeyCodes:
+    """
+    Assigns stable integer codes to hashable values as they appear (missing values get -1).
+    """
+
+    def __init__(self):
+        self._codes = {}
+        self.values = []  # code -> value
+
+    def __len__(self):
+        return len(self.values)
+
+    def encode(self, values) -> np.ndarray:
+        """
+        Returns the codes of a sequence of values, adding unseen values.
+        """
+        local, uniques = pd.factorize(np.asarray(values, dtype=object), use_na_sentinel=True)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for i, value in enumerate(uniques):
+            code = self._codes.get(value)
+            if code is None:
+                code = self._codes[value] = len(self.values)
+                self.values.append(value)
+            mapping[i] = code
+        codes = np.full(len(local), -1, dtype=np.int64)
+        known = local >= 0
+        codes[known] = mapping[local[known]]
+        return codes
+
+
+class RateTracker:
+    """
+    Event counts per key in fixed time buckets, compared with an exponentially weighted history.
+
+    For every key the tracker keeps the count of its current bucket and exponentially weighted
+    means of past bucket counts and their squares. Buckets in which a key saw no events are folded
+    in lazily (a closed-form decay) when its next event arrives, and the buckets a batch spans are
+    folded with one segmented prefix sum. A key is reported once per bucket when its count is
+    z_threshold standard deviations above its history; the variance is floored at the mean
+    (Poisson) and at 1 so rare keys need min_count events to be reported.
+    """
+
+    def __init__(self, smoothing: float = 0.1, z_threshold: float = 4.0, min_count: int = 5, warmup: int = 5):
+        """
+        Initializes the RateTracker.
+
+        Args:
+            smoothing (float): Weight of the newest closed bucket in the moving averages (0 < smoothing < 1).
+            z_threshold (float): z-score above which a key's current bucket is reported.
+            min_count (int): Smallest bucket count that can be reported.
+            warmup (int): Buckets of history a key needs before it can be reported.
+        """
+        if not 0 < smoothing < 1:
+            raise ValueError(f"smoothing must be between 0 and 1: {smoothing}")
+        self.smoothing = smoothing
+        self.z_threshold = z_threshold
+        self.min_count = min_count
+        self.warmup = warmup
+        # Buckets folded in one prefix sum; keeps the rescaling factor keep ** -span below MAX_RESCALE
+        self._span = max(1, int(np.log(MAX_RESCALE) / -np.log(1 - smoothing)))
+        self.mean = np.zeros(0)  # Weighted mean of past bucket counts (not bias-corrected)
+        self.square = np.zeros(0)  # Weighted mean of past squared bucket counts
+        self.count = np.zeros(0, dtype=np.int64)  # Events in the current bucket
+        self.bucket = np.zeros(0, dtype=np.int64)  # Current bucket (-1 = key not seen yet)
+        self.first_bucket = np.zeros(0, dtype=np.int64)
+        self.reported = np.zeros(0, dtype=bool)  # Current bucket already reported
+
+    def update(self, codes: np.ndarray, buckets: np.ndarray) -> tuple:
+        """
+        Adds one batch of events given as key codes (-1 = no key) and bucket numbers.
+
+        Events should arrive in time order; an event for a bucket older than its key's current one
+        is counted in the current bucket.
+
+        Returns:
+            tuple: (positions, keys, counts, expected, z_scores) of the reports, in position order;
+            positions are the batch positions of the events at which each reported key's bucket
+            count first became reportable, and counts and z_scores are taken at those events.
+        """
+        positions = np.flatnonzero(codes >= 0)
+        if not len(positions):
+            return (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                    np.zeros(0), np.zeros(0))
+        codes, buckets = codes[positions], buckets[positions]
+        self._grow(int(codes.max()) + 1)
+        chunks = (buckets - buckets.min()) // self._span
+        if not chunks.any():
+            reports = [self._update_chunk(positions, codes, buckets)]
+        else:
+            reports = [self._update_chunk(positions[chunks == chunk], codes[chunks == chunk], buckets[chunks == chunk])
+                       for chunk in np.unique(chunks)]
+        reports = [np.concatenate(part) for part in zip(*reports)]
+        order = np.argsort(reports[0], kind='stable')
+        return tuple(part[order] for part in reports)
+
+    def _update_chunk(self, positions: np.ndarray, codes: np.ndarray, buckets: np.ndarray) -> tuple:
+        """
+        Adds events spanning fewer than self._span buckets.
+        """
+        keep = 1 - self.smoothing
+        buckets = np.maximum(buckets, self.bucket[codes])
+
+        # One group per (key, bucket), in bucket order within each key
+        order = np.lexsort((buckets, codes))
+        sorted_codes, sorted_buckets = codes[order], buckets[order]
+        starts = np.flatnonzero(np.r_[True, (sorted_codes[1:] != sorted_codes[:-1]) |
+                                      (sorted_buckets[1:] != sorted_buckets[:-1])])
+        keys, group_buckets = sorted_codes[starts], sorted_buckets[starts]
+        counts = np.diff(np.r_[starts, len(order)])
+        key_starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        key_ends = np.r_[key_starts[1:], len(keys)] - 1
+        first_keys = keys[key_starts]
+
+        # Bring every key's history up to its first bucket in this chunk
+        new = self.bucket[first_keys] < 0
+        self.bucket[first_keys[new]] = self.first_bucket[first_keys[new]] = group_buckets[key_starts][new]
+        advanced = group_buckets[key_starts] > self.bucket[first_keys]
+        self._close(first_keys[advanced], group_buckets[key_starts][advanced])
+        prior = np.zeros(len(keys), dtype=np.int64)  # Events of the group's bucket seen in earlier batches
+        prior[key_starts] = self.count[first_keys]
+        counts += prior
+        reported = np.zeros(len(keys), dtype=bool)
+        reported[key_starts] = self.reported[first_keys]
+
+        # History at each group's bucket: history at the key's first bucket decayed to it, plus the
+        # decayed counts of the key's earlier groups (segmented exclusive prefix sums)
+        offsets = group_buckets - np.repeat(group_buckets[key_starts], np.diff(np.r_[key_starts, len(keys)]))
+        scale = keep ** -offsets.astype(float)
+        mean = self._decayed_history(self.mean[keys], counts * scale, scale, key_starts)
+        square = self._decayed_history(self.square[keys], counts * counts * scale, scale, key_starts)
+
+        closed = group_buckets - self.first_bucket[keys]
+        hit, expected, deviation = self._check(mean, square, counts, closed, reported)
+        # A bucket is reported at the event whose running count first crosses the threshold, so the
+        # reports do not depend on where the batches end
+        hits = np.flatnonzero(hit)
+        crossing = self._crossing_count(expected[hits], deviation[hits])
+        first_event = np.clip(crossing - prior[hits] - 1, 0, counts[hits] - prior[hits] - 1)
+        report_counts = prior[hits] + 1 + first_event
+
+        last_keys = keys[key_ends]
+        self.bucket[last_keys] = group_buckets[key_ends]
+        self.count[last_keys] = counts[key_ends]
+        self.mean[last_keys] = mean[key_ends]
+        self.square[last_keys] = square[key_ends]
+        self.reported[last_keys] = reported[key_ends] | hit[key_ends]
+        return (positions[order[starts[hits] + first_event]], keys[hits], report_counts, expected[hits],
+                (report_counts - expected[hits]) / deviation[hits])
+
+    def _decayed_history(self, start: np.ndarray, terms: np.ndarray, scale: np.ndarray,
+                         key_starts: np.ndarray) -> np.ndarray:
+        """
+        Evaluates history_i = keep^d_i * (start + smoothing / keep * sum of earlier terms of the key).
+        """
+        keep = 1 - self.smoothing
+        earlier = np.cumsum(terms) - terms
+        earlier -= np.repeat(earlier[key_starts], np.diff(np.r_[key_starts, len(terms)]))
+        return (start + self.smoothing / keep * earlier) / scale
+
+    def _close(self, keys: np.ndarray, bucket: np.ndarray):
+        """
+        Folds the current bucket of keys into their history, followed by the empty buckets up to bucket.
+        """
+        keep = 1 - self.smoothing
+        count = self.count[keys]
+        decay = keep ** (bucket - self.bucket[keys] - 1)
+        self.mean[keys] = (keep * self.mean[keys] + self.smoothing * count) * decay
+        self.square[keys] = (keep * self.square[keys] + self.smoothing * count * count) * decay
+        self.count[keys] = 0
+        self.bucket[keys] = bucket
+        self.reported[keys] = False
+
+    def _check(self, mean: np.ndarray, square: np.ndarray, count: np.ndarray, closed: np.ndarray,
+               reported: np.ndarray) -> tuple:
+        """
+        Returns (reportable mask, expected counts, standard deviations) of bucket counts given their raw history.
+        """
+        weight = 1 - (1 - self.smoothing) ** closed
+        safe_weight = np.where(weight > 0, weight, 1)
+        expected = mean / safe_weight
+        deviation = np.sqrt(np.maximum(square / safe_weight - expected * expected, np.maximum(expected, 1.0)))
+        hit = (closed >= self.warmup) & (count >= self.min_count) & ~reported & \
+            ((count - expected) / deviation > self.z_threshold)
+        return hit, expected, deviation
+
+    def _crossing_count(self, expected: np.ndarray, deviation: np.ndarray) -> np.ndarray:
+        """
+        Returns the smallest bucket counts that are reportable given their history (see _check).
+        """
+        count = np.maximum(np.floor(expected + self.z_threshold * deviation).astype(np.int64) + 1, self.min_count)
+        # Settle rounding at the boundary with the same comparison _check makes
+        count -= (count > self.min_count) & ((count - 1 - expected) / deviation > self.z_threshold)
+        count += (count - expected) / deviation <= self.z_threshold
+        return count
+
+    def _grow(self, size: int):
+        if size <= len(self.count):
+            return
+        capacity = max(size, 2 * len(self.count), 64)
+        extra = capacity - len(self.count)
+        self.mean = np.r_[self.mean, np.zeros(extra)]
+        self.square = np.r_[self.square, np.zeros(extra)]
+        self.count = np.r_[self.count, np.zeros(extra, dtype=np.int64)]
+        self.bucket = np.r_[self.bucket, np.full(extra, -1, dtype=np.int64)]
+        self.first_bucket = np.r_[self.first_bucket, np.zeros(extra, dtype=np.int64)]
+        self.reported = np.r_[self.reported, np.zeros(extra, dtype=bool)]
+
+
+class TransitionTracker:
+    """
+    First-order transition counts between symbols (e.g. agent actions) per entity (e.g. equipment).
+
+    Each event is scored by the probability of its symbol following the entity's previous symbol,
+    estimated from the transitions seen before it (add-one smoothed over the known symbols).
+    Events whose previous symbol has at least min_support outgoing transitions and whose
+    probability is below rare_probability are reported. Symbols should come from a small
+    vocabulary: the counts are a dense symbol x symbol matrix.
+    """
+
+    def __init__(self, rare_probability: float = 0.01, min_support: int = 50):
+        """
+        Initializes the TransitionTracker.
+
+        Args:
+            rare_probability (float): Transition probability below which an event is reported.
+            min_support (int): Transitions out of the previous symbol needed before reporting.
+        """
+        self.rare_probability = rare_probability
+        self.min_support = min_support
+        self.symbols = 0  # Number of known symbols (the caller's code range)
+        self.transitions = np.zeros((0, 0), dtype=np.int64)  # previous x next symbol counts
+        self.outgoing = np.zeros(0, dtype=np.int64)  # Transitions out of each symbol
+        self.last = np.zeros(0, dtype=np.int64)  # entity -> last symbol (-1 = none)
+
+    def update(self, entities: np.ndarray, symbols: np.ndarray) -> tuple:
+        """
+        Adds one batch of events (in time order) given as entity and symbol codes (-1 = missing).
+
+        Returns:
+            tuple: (positions, previous symbols, probabilities) of the reported events.
+        """
+        positions = np.flatnonzero((entities >= 0) & (symbols >= 0))
+        if not len(positions):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+        entities, symbols = entities[positions], symbols[positions]
+        self._grow(int(entities.max()) + 1, int(symbols.max()) + 1)
+
+        # Previous symbol of every event: the one before it in its entity's sequence
+        order = np.argsort(entities, kind='stable')
+        sorted_entities, sorted_symbols = entities[order], symbols[order]
+        first = np.r_[True, sorted_entities[1:] != sorted_entities[:-1]]
+        previous_sorted = np.r_[-1, sorted_symbols[:-1]]
+        previous_sorted[first] = self.last[sorted_entities[first]]
+        previous = np.empty_like(previous_sorted)
+        previous[order] = previous_sorted
+        last = np.r_[first[1:], True]
+        self.last[sorted_entities[last]] = sorted_symbols[last]
+
+        has = previous >= 0
+        positions, previous, symbols = positions[has], previous[has], symbols[has]
+        pairs = previous * self.transitions.shape[1] + symbols
+        seen = self.transitions.ravel()[pairs] + _occurrence(pairs)
+        support = self.outgoing[previous] + _occurrence(previous)
+        probability = (seen + 1) / (support + self.symbols)
+        np.add.at(self.transitions.ravel(), pairs, 1)
+        self.outgoing += np.bincount(previous, minlength=len(self.outgoing))
+
+        rare = (support >= self.min_support) & (probability < self.rare_probability)
+        return positions[rare], previous[rare], probability[rare]
+
+    def _grow(self, entities: int, symbols: int):
+        if entities > len(self.last):
+            self.last = np.r_[self.last, np.full(max(entities, 2 * len(self.last), 64) - len(self.last), -1)]
+        self.symbols = max(self.symbols, symbols)
+        size = self.transitions.shape[0]
+        if symbols > size:
+            capacity = max(symbols, 2 * size, 16)
+            transitions = np.zeros((capacity, capacity), dtype=np.int64)
+            transitions[:size, :size] = self.transitions
+            self.transitions = transitions
+            self.outgoing = np.r_[self.outgoing, np.zeros(capacity - size, dtype=np.int64)]
+
+
+def _occurrence(values: np.ndarray) -> np.ndarray:
+    """
+    Returns, for every element, how many equal elements precede it.
+    """
+    order = np.argsort(values, kind='stable')
+    sorted_values = values[order]
+    starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+    ranks = np.arange(len(values)) - np.repeat(starts, np.diff(np.r_[starts, len(values)]))
+    occurrence = np.empty(len(values), dtype=np.int64)
+    occurrence[order] = ranks
+    return occurrence
@@ -0,0 +1,200 @@
+"""
+Deterministic synthetic shipyard and supply chain datasets for benchmarks and demos.
+
+The generated frames use the columns the agents read (work_order_id, task_status,
+linked_shipyard_event, prerequisite_tasks, tasks_done, pending_issues, required_resources on the
+shipyard side; linked_shipyard_event and delay_reason on the supply chain side) plus attack flags,
+in the same cell formats as the CSV datasets (e.g. "['WO-0000001', 'WO-0000002']" prerequisites).
+The same arguments and seed always give the same data.
+"""
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+# File names written by write_datasets (the names of the real datasets)
+SHIPYARD_FILE = "Digital_Shipyard_50k_With_Attacks.csv"
+SUPPLY_CHAIN_FILE = "Supply_Chain_50k_With_Attacks.csv"
+
+STATUSES = np.array(['Pending', 'In Progress', 'Completed', 'Delayed'], dtype=object)
+STATUS_WEIGHTS = [0.5, 0.3, 0.15, 0.05]
+DELAY_REASONS = np.array(['Supply Delay', 'Equipment Failure', 'Severe Weather'], dtype=object)
+ATTACK_TYPES = np.array(['GPS Spoofing', 'Data Tampering', 'DoS', 'Malware'], dtype=object)
+REQUIRED_RESOURCES = np.array(['crane:1', 'agv:1', 'forklift:1', 'crane:1,agv:1', 'crane:1,forklift:2', ''],
+                              dtype=object)
+
+
+def generate_shipyard_data(rows: int, dag_depth: int = 8, max_prerequisites: int = 3, link_rate: float = 0.5,
+                           events: int = None, attack_rate: float = 0.02, yards: int = 0, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates work orders.
+
+    Args:
+        rows (int): Number of work orders.
+        dag_depth (int): Prerequisite levels; a work order only depends on orders of lower levels,
+            so the longest prerequisite chain has at most dag_depth orders (1 = no prerequisites).
+        max_prerequisites (int): Upper bound of prerequisites per work order.
+        link_rate (float): Share of work orders linked to a shipyard event.
+        events (int): Number of distinct shipyard events (defaults to rows // 10).
+        attack_rate (float): Share of rows flagged as attacks.
+        yards (int): If set, adds a 'yard' column (Yard-1, Yard-2, ...) and only draws prerequisites
+            within a yard; linked events are still shared across yards.
+        seed (int): Random seed.
+    """
+    rng = np.random.default_rng(seed)
+    events = events or max(rows // 10, 1)
+    ids = work_order_ids(rows)
+    yard = np.random.default_rng(seed + 3).integers(0, yards, rows) if yards else None
+
+    # Twice as many event IDs as events, so some links have no supply chain row
+    linked = event_ids(rng.integers(0, events * 2, rows))
+    linked[rng.random(rows) >= link_rate] = None
+
+    attack = rng.random(rows) < attack_rate
+    frame = pd.DataFrame({
+        'work_order_id': ids,
+        'task_status': STATUSES[rng.choice(len(STATUSES), rows, p=STATUS_WEIGHTS)],
+        'linked_shipyard_event': linked,
+        'prerequisite_tasks': _prerequisites(rng, ids, dag_depth, max_prerequisites, yard),
+        'tasks_done': rng.random(rows) < 0.6,
+        'pending_issues': rng.random(rows) < 0.1,
+        'required_resources': REQUIRED_RESOURCES[rng.integers(0, len(REQUIRED_RESOURCES), rows)],
+        'attack_flag': attack,
+        'attack_type': np.where(attack, ATTACK_TYPES[rng.integers(0, len(ATTACK_TYPES), rows)], None),
+    })
+    if yards:
+        frame['yard'] = np.char.add('Yard-', (yard + 1).astype(str)).astype(object)
+    return frame
+
+
+def generate_supply_chain_data(rows: int, events: int, delay_density: float = 0.3, attack_rate: float = 0.02,
+                               seed: int = 0) -> pd.DataFrame:
+    """
+    Generates supply chain rows linked to shipyard events.
+
+    Args:
+        rows (int): Number of supply chain rows.
+        events (int): Number of distinct shipyard events the rows link to.
+        delay_density (float): Share of rows that carry a delay_reason.
+        attack_rate (float): Share of rows flagged as attacks.
+        seed (int): Random seed.
+    """
+    rng = np.random.default_rng(seed + 1)
+    reasons = DELAY_REASONS[rng.integers(0, len(DELAY_REASONS), rows)]
+    reasons[rng.random(rows) >= delay_density] = None
+    attack = rng.random(rows) < attack_rate
+    return pd.DataFrame({
+        'linked_shipyard_event': event_ids(rng.integers(0, max(events, 1), rows)),
+        'delay_reason': reasons,
+        'attack_flag': attack,
+        'attack_type': np.where(attack, ATTACK_TYPES[rng.integers(0, len(ATTACK_TYPES), rows)], None),
+    })
+
+
+def generate_datasets(rows: int, supply_chain_rows: int = None, dag_depth: int = 8, delay_density: float = 0.3,
+                      attack_rate: float = 0.02, yards: int = 0, seed: int = 0) -> tuple:
+    """
+    Generates a matching (shipyard_data, supply_chain_data) pair; supply_chain_rows defaults to rows.
+    """
+    events = max(rows // 10, 1)
+    shipyard_data = generate_shipyard_data(rows, dag_depth=dag_depth, events=events, attack_rate=attack_rate,
+                                           yards=yards, seed=seed)
+    supply_chain_data = generate_supply_chain_data(supply_chain_rows or rows, events, delay_density=delay_density,
+                                                   attack_rate=attack_rate, seed=seed)
+    return shipyard_data, supply_chain_data
+
+
+def generate_events(count: int, shipyard_data: pd.DataFrame, supply_chain_data: pd.DataFrame,
+                    resource_ids: list = None, time: float = 0, seed: int = 0) -> list:
+    """
+    Generates a burst of engine events due at the given time: supply chain delays for linked
+    events, equipment failures (if resource_ids are given) and security attacks.
+    """
+    rng = np.random.default_rng(seed + 2)
+    linked = supply_chain_data['linked_shipyard_event'].dropna().to_numpy(dtype=object)
+    kinds = rng.choice(3 if resource_ids else 2, count)
+    events = []
+    for i, kind in enumerate(kinds):
+        if kind == 0 and len(linked):
+            events.append({'type': 'supply_chain_delay', 'event_id': linked[rng.integers(len(linked))],
+                           'reason': DELAY_REASONS[i % len(DELAY_REASONS)], 'time': time})
+        elif kind == 2:
+            events.append({'type': 'shipyard_equipment_failure',
+                           'equipment_id': resource_ids[rng.integers(len(resource_ids))], 'time': time})
+        else:
+            events.append({'type': 'security_attack', 'attack_type': ATTACK_TYPES[i % len(ATTACK_TYPES)],
+                           'work_order_id': shipyard_data['work_order_id'].iat[rng.integers(len(shipyard_data))],
+                           'time': time})
+    return events
+
+
+def write_datasets(directory: str, rows: int, **options) -> tuple:
+    """
+    Writes generated datasets as CSV files named like the real ones; returns their paths.
+
+    Args:
+        directory (str): Target directory (created if missing).
+        rows (int): Number of work orders.
+        **options: generate_datasets arguments.
+    """
+    os.makedirs(directory, exist_ok=True)
+    shipyard_data, supply_chain_data = generate_datasets(rows, **options)
+    paths = (os.path.join(directory, SHIPYARD_FILE), os.path.join(directory, SUPPLY_CHAIN_FILE))
+    for frame, path in zip((shipyard_data, supply_chain_data), paths):
+        frame.to_csv(path, index=False)
+        logging.info("Wrote %d rows to %s", len(frame), path)
+    return paths
+
+
+def work_order_ids(rows: int) -> np.ndarray:
+    """
+    Returns the IDs WO-0000000, WO-0000001, ... as an object array.
+    """
+    width = max(7, len(str(rows - 1)))
+    return np.array([f"WO-{i:0{width}d}" for i in range(rows)], dtype=object)
+
+
+def event_ids(numbers: np.ndarray) -> np.ndarray:
+    """
+    Formats event numbers as EVT-000123 IDs (object array).
+    """
+    return np.array([f"EVT-{i:06d}" for i in numbers.tolist()], dtype=object)
+
+
+def _prerequisites(rng: np.random.Generator, ids: np.ndarray, dag_depth: int, max_prerequisites: int,
+                   groups: np.ndarray = None) -> np.ndarray:
+    """
+    Draws prerequisite lists that form a DAG of at most dag_depth levels, formatted like the CSV cells.
+
+    With groups (one integer per row), prerequisites are only drawn from rows of the same group.
+    """
+    rows = len(ids)
+    depth = max(dag_depth, 1)
+    level = rng.integers(0, depth, rows)
+    key = level if groups is None else groups * depth + level
+    by_level = np.argsort(key, kind='stable')
+    # Number of rows of the same group on lower levels; prerequisites are drawn from those
+    group_start = np.zeros(rows, dtype=np.int64) if groups is None else \
+        np.searchsorted(key[by_level], groups * depth, side='left')
+    lower = np.searchsorted(key[by_level], key, side='left') - group_start
+    counts = np.where(lower > 0, rng.integers(0, max_prerequisites + 1, rows), 0)
+    picks = by_level[group_start[:, None] + (rng.random((rows, max_prerequisites)) * lower[:, None]).astype(np.int64)]
+
+    cells = np.full(rows, '[', dtype=object)
+    for j in range(max_prerequisites):
+        has = counts > j
+        part = np.full(rows, '', dtype=object)
+        part[has] = ("'" + ids[picks[has, j]] + "'") if j == 0 else (", '" + ids[picks[has, j]] + "'")
+        cells = cells + part
+    return cells + ']'
+
+
+if __name__ == "__main__":
+    # Configure logging (you might want to do this at the app level)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # Example usage: a small pair of datasets
+    shipyard_data, supply_chain_data = generate_datasets(10, dag_depth=3)
+    print(shipyard_data)
+    print(supply_chain_data)
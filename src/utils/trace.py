@@ -0,0 +1,110 @@
+import collections
+import json
+import logging
+
+# Template for counters whose event was never registered (logged at INFO)
+DEFAULT_TEMPLATE = "%(count)d x %(event)s %(key)s"
+
+
+class TraceSink:
+    """
+    Structured, low-overhead event sink for the simulation hot path.
+
+    Agents count occurrences (e.g. work orders delayed, keyed by delay reason) instead of logging
+    one line per work order. flush() turns each step's counters into one log record per
+    (event, key), using lazy %-formatting that is skipped entirely when the level is disabled.
+    An optional ring buffer keeps the latest structured trace records for dumping on demand.
+    """
+
+    def __init__(self, capacity: int = 0):
+        """
+        Initializes the TraceSink.
+
+        Args:
+            capacity (int): Size of the trace ring buffer; 0 disables tracing.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.counters = collections.Counter()  # (event, key) -> count since the last flush
+        self.last_counters = {}  # Counters of the last flushed step
+        self.totals = collections.Counter()  # (event, key) -> count over the whole run
+        self.step = 0
+        self._formats = {}  # event -> (logger, level, template)
+        self.ring = None
+        self.enable_trace(capacity)
+
+    def register(self, formats: dict, logger: logging.Logger = None):
+        """
+        Registers how counters are logged.
+
+        Args:
+            formats (dict): Event -> (level, template); the template may use %(count)d and %(key)s.
+            logger (logging.Logger): Logger the summaries are emitted on (defaults to this module's).
+        """
+        for event, (level, template) in formats.items():
+            self._formats[event] = (logger or self.logger, level, template)
+
+    def enable_trace(self, capacity: int):
+        """
+        Turns the ring buffer on with the given capacity (keeping the newest records), or off with 0.
+        """
+        if capacity:
+            self.ring = collections.deque(self.ring or (), maxlen=capacity)
+        else:
+            self.ring = None
+
+    @property
+    def tracing(self) -> bool:
+        """
+        True when trace records are kept; callers check this before building expensive records.
+        """
+        return self.ring is not None
+
+    def count(self, event: str, key=None, n: int = 1):
+        """
+        Adds n occurrences of event (optionally split by key) to the current step's counters.
+        """
+        if n:
+            self.counters[event, key] += n
+
+    def record(self, event: str, **fields):
+        """
+        Appends a structured record to the ring buffer; a no-op when tracing is off.
+        """
+        if self.ring is not None:
+            fields['event'] = event
+            fields['step'] = self.step
+            self.ring.append(fields)
+
+    def flush(self, step: int = None):
+        """
+        Logs the current counters (one line per event and key) and starts a new step.
+        """
+        counters = self.counters
+        for (event, key), count in counters.items():
+            logger, level, template = self._formats.get(event, (self.logger, logging.INFO, DEFAULT_TEMPLATE))
+            if logger.isEnabledFor(level):
+                logger.log(level, template, {'count': count, 'key': key, 'event': event})
+        if self.ring is not None and counters:
+            self.ring.append({'event': 'counters', 'step': self.step, 'counters': self.summary(counters)})
+        self.totals.update(counters)
+        self.last_counters = dict(counters)
+        self.counters = collections.Counter()
+        self.step = self.step + 1 if step is None else step
+
+    @staticmethod
+    def summary(counters: dict) -> dict:
+        """
+        Flattens (event, key) counters to {'event:key': count} (just 'event' when there is no key).
+        """
+        return {f"{event}:{key}" if key is not None else event: count for (event, key), count in counters.items()}
+
+    def dump(self, path: str = None) -> list:
+        """
+        Returns the buffered trace records, oldest first, and optionally writes them as JSON lines.
+        """
+        records = list(self.ring or ())
+        if path is not None:
+            with open(path, 'w') as f:
+                for record in records:
+                    f.write(json.dumps(record, default=str) + "\n")
+        return records
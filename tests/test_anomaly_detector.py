@@ -0,0 +1,120 @@
+"""
+Behavioral tests for AnomalyDetector rate and sequence alerts, alone and inside a SimulationEngine.
+"""
+import pandas as pd
+import pytest
+
+from src.agents.anomaly_detector import AnomalyDetector
+from src.simulation.simulation_engine import SimulationEngine
+
+ACTIONS = ['lift', 'move']
+
+
+def steady_stream(buckets: int, equipment=('crane1', 'crane2')) -> list:
+    """
+    One event per equipment and time unit, alternating lift/move, flagged as attacks every tenth unit.
+    """
+    events = []
+    for t in range(buckets):
+        for name in equipment:
+            event = {'type': 'shipyard_event', 'equipment_id': name, 'agent_action': ACTIONS[t % 2], 'time': t}
+            if t % 10 == 9:
+                event.update(type='security_attack', attack_type='DoS')
+            events.append(event)
+    return events
+
+
+def burst(name: str, time: int, count: int) -> list:
+    """
+    count events of one equipment within one time unit; the action keeps the lift/move cycle.
+    """
+    return [{'type': 'shipyard_event', 'equipment_id': name, 'agent_action': ACTIONS[(time + i) % 2],
+             'time': time + i / count} for i in range(count)]
+
+
+def rate_alerts(alerts: list, dimension: str = 'equipment') -> list:
+    return [(alert['key'], int(alert['time'])) for alert in alerts
+            if alert['kind'] == 'rate' and alert['dimension'] == dimension]
+
+
+def test_burst_raises_one_rate_alert_for_its_equipment_and_bucket():
+    detector = AnomalyDetector()
+    alerts = detector.observe(steady_stream(20) + burst('crane1', 20, 30) + steady_stream(5, ('crane2',)))
+    assert rate_alerts(alerts) == [('crane1', 20)]  # One alert per key and bucket, not one per event
+    assert ('shipyard_event', 20) in rate_alerts(alerts, 'event_type')
+    alert = next(alert for alert in alerts if alert['kind'] == 'rate')
+    # Reported at the event that made the bucket unusual, not at the end of the bucket
+    assert alert['type'] == 'security_alert' and alert['count'] == 6 and alert['z_score'] > 4
+    assert alert['time'] == pytest.approx(20 + 5 / 30)
+    assert detector.alert_counts['rate'] == sum(alert['kind'] == 'rate' for alert in alerts)
+    assert detector.flagged_attacks == {'DoS': 4}
+
+
+@pytest.mark.parametrize('options, burst_time', [
+    ({'min_count': 40}, 20),  # The bucket holds 30 events
+    ({'z_threshold': 50.0}, 20),
+    ({'warmup_buckets': 5}, 3),  # Too little history
+])
+def test_thresholds_suppress_rate_alerts(options, burst_time):
+    detector = AnomalyDetector(**options)
+    assert rate_alerts(detector.observe(steady_stream(burst_time) + burst('crane1', burst_time, 30))) == []
+
+
+def test_buckets_follow_bucket_size():
+    # Six events per time unit for ten units: a burst for 1-unit buckets, normal for 100-unit ones
+    events = steady_stream(200) + [{'type': 'shipyard_event', 'equipment_id': 'crane1', 'agent_action': 'lift',
+                                    'time': 200 + i / 6} for i in range(60)]
+    assert rate_alerts(AnomalyDetector(bucket_size=1.0).observe(events))
+    assert rate_alerts(AnomalyDetector(bucket_size=1.0, min_count=10).observe(events)) == []
+    assert rate_alerts(AnomalyDetector(bucket_size=100.0, warmup_buckets=1).observe(events)) == []
+
+
+def test_alerts_do_not_depend_on_batch_boundaries():
+    events = steady_stream(100) + burst('crane1', 100, 30) + [
+        {'type': 'shipyard_event', 'equipment_id': 'crane2', 'agent_action': 'override_safety', 'time': 101}]
+    def ordered(alerts):
+        # Each observe() call lists its rate alerts by dimension, so batches interleave them differently
+        return sorted(alerts, key=lambda alert: (alert['time'], alert['kind'], alert.get('dimension', '')))
+
+    expected = ordered(AnomalyDetector().observe(events))
+    assert {alert['kind'] for alert in expected} == {'rate', 'sequence'}
+    for batch_size in (1, 7, 64):
+        detector = AnomalyDetector()
+        alerts = [alert for i in range(0, len(events), batch_size)
+                  for alert in detector.observe(events[i:i + batch_size])]
+        # Equal up to the rounding of the prefix sums, which depends on the batches
+        assert ordered(alerts) == [pytest.approx(alert) for alert in expected], f"batches of {batch_size}"
+
+
+def test_rare_transition_raises_a_sequence_alert_after_enough_support():
+    events = steady_stream(100)
+    detector = AnomalyDetector()
+    detector.observe(events[:20])
+    # Before min_support transitions out of 'move', nothing is scored
+    assert detector.observe([{'type': 'shipyard_event', 'equipment_id': 'crane1', 'agent_action': 'override_safety',
+                              'time': 20}]) == []
+
+    detector = AnomalyDetector()
+    detector.observe(events)
+    alerts = detector.observe([{'type': 'shipyard_event', 'equipment_id': 'crane2', 'agent_action': 'override_safety',
+                                'time': 100}])
+    assert [(alert['kind'], alert['entity'], alert['previous'], alert['action']) for alert in alerts] == \
+        [('sequence', 'crane2', 'move', 'override_safety')]
+    assert alerts[0]['probability'] < 0.01
+
+
+def test_engine_round_trip_of_security_alerts():
+    shipyard_data = pd.DataFrame({'work_order_id': ['WO-1'], 'task_status': ['Completed']})
+    supply_chain_data = pd.DataFrame({'linked_shipyard_event': [], 'delay_reason': []})
+    engine = SimulationEngine(shipyard_data, supply_chain_data, agents=['anomaly_detector'])
+    engine.add_events([dict(event, type='security_attack', attack_type='DoS')
+                       for event in steady_stream(20) + burst('crane1', 20, 30)])
+    engine.run_n_steps(23)
+
+    detector = engine.agents['anomaly_detector']
+    assert detector.events_observed == 70  # Every due event, but none of the alerts it emitted
+    assert ('crane1', 20) in rate_alerts(list(detector.recent_alerts))
+    # The emitted alerts were queued, handled by the engine and counted by kind
+    assert engine.trace.totals[('security_alert', 'rate')] == detector.alert_counts['rate'] > 0
+    assert engine.trace.totals[('security_attack', 'DoS')] == 70
+    assert not engine.event_queue
@@ -0,0 +1,42 @@
+"""
+Tests for the NumPy min-cost assignment against brute force.
+"""
+import itertools
+
+import numpy as np
+import pytest
+
+from src.utils.assignment import linear_sum_assignment
+
+
+def brute_force_cost(cost: np.ndarray) -> float:
+    """
+    Returns the minimum total cost over every assignment of the smaller side.
+    """
+    if cost.shape[0] > cost.shape[1]:
+        cost = cost.T
+    n, m = cost.shape
+    return min(cost[np.arange(n), list(columns)].sum() for columns in itertools.permutations(range(m), n))
+
+
+@pytest.mark.parametrize('shape', [(1, 1), (3, 3), (5, 5), (2, 4), (4, 2), (2, 7), (6, 3)])
+@pytest.mark.parametrize('integers', [False, True])
+def test_matches_brute_force(shape, integers):
+    rng = np.random.default_rng([shape[0], shape[1], integers])
+    for _ in range(20):
+        # Small integer costs give many ties
+        cost = rng.integers(0, 4, shape).astype(float) if integers else rng.random(shape) * 100
+        rows, cols = linear_sum_assignment(cost)
+        assert len(rows) == min(shape)
+        assert len(set(rows)) == len(rows) and len(set(cols)) == len(cols)
+        assert (np.diff(rows) > 0).all()
+        assert cost[rows, cols].sum() == pytest.approx(brute_force_cost(cost))
+
+
+def test_rejects_bad_input():
+    rows, cols = linear_sum_assignment(np.empty((0, 3)))
+    assert len(rows) == len(cols) == 0
+    with pytest.raises(ValueError, match='2-D'):
+        linear_sum_assignment(np.zeros(3))
+    with pytest.raises(ValueError, match='infinite'):
+        linear_sum_assignment([[0.0, np.inf]])
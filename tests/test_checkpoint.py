@@ -0,0 +1,73 @@
+"""
+Tests for checkpoint save/restore of engine state.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.simulation import checkpoint
+from src.simulation.checkpoint import Checkpointer, fork, restore
+from src.simulation.simulation_engine import SimulationEngine
+from src.utils.resource_pool import ResourcePool
+
+ROWS = 500
+
+
+def make_engine() -> SimulationEngine:
+    # Work orders that start, finish and get delayed over the first steps, competing for resources
+    rng = np.random.default_rng(4)
+    events = np.array([f"EV-{i}" for i in range(ROWS // 10)], dtype=object)
+    shipyard_data = pd.DataFrame({
+        'work_order_id': [f"WO-{i:04d}" for i in range(ROWS)],
+        'task_status': np.where(rng.random(ROWS) < 0.7, 'Pending', 'In Progress'),
+        'linked_shipyard_event': np.where(rng.random(ROWS) < 0.3, events[rng.integers(0, len(events), ROWS)], None),
+        'tasks_done': rng.random(ROWS) < 0.5,
+        'pending_issues': rng.random(ROWS) < 0.1,
+    })
+    supply_chain_data = pd.DataFrame({
+        'linked_shipyard_event': events,
+        'delay_reason': np.where(rng.random(len(events)) < 0.2, 'Supply Delay', None),
+    })
+    pool = ResourcePool.from_counts({'crane': 20, 'agv': 20, 'forklift': 20})
+    engine = SimulationEngine(shipyard_data, supply_chain_data, resource_pool=pool)
+    engine.add_events([{'type': 'supply_chain_delay', 'event_id': event_id, 'time': 1}
+                       for event_id in events[rng.integers(0, len(events), 10)]])
+    return engine
+
+
+def test_restore_and_fork_match_the_running_engine(tmp_path):
+    engine = make_engine()
+    checkpointer = Checkpointer(engine, str(tmp_path))
+    for _ in range(4):
+        engine.run_simulation_step()
+        checkpointer.save()
+    engine.add_event({'type': 'shipyard_event', 'time': 10, 'timestamp': pd.Timestamp('2024-01-01 08:00')})
+    checkpointer.save()
+
+    for copy in (restore(str(tmp_path)), fork(engine)):
+        assert copy.shipyard_data['task_status'].equals(engine.shipyard_data['task_status'])
+        assert copy.trace.totals == engine.trace.totals
+        assert copy.step_count == engine.step_count
+        engine_events = [entry[2] for entry in engine.event_queue]
+        assert [event['type'] for event in engine_events] == [entry[2]['type'] for entry in copy.event_queue]
+
+
+def test_failed_save_keeps_the_delta_baseline(tmp_path):
+    engine = make_engine()
+    checkpointer = Checkpointer(engine, str(tmp_path))
+    engine.run_simulation_step()
+    checkpointer.save()
+    engine.run_simulation_step()
+
+    engine.add_event({'type': 'shipyard_event', 'time': 10, 'payload': object()})
+    with pytest.raises(TypeError):
+        checkpointer.save()
+    assert checkpoint.list_checkpoints(str(tmp_path)) == [0]
+
+    engine.event_queue = [entry for entry in engine.event_queue if 'payload' not in entry[2]]
+    checkpointer.save()
+    restored = restore(str(tmp_path))
+    # The delta after the failed save still holds every row changed since checkpoint 0
+    assert restored.shipyard_data['task_status'].equals(engine.shipyard_data['task_status'])
+    for column in ('crane_id', 'agv_id', 'forklift_id'):
+        assert restored.shipyard_data[column].astype(object).equals(engine.shipyard_data[column].astype(object))
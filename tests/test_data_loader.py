@@ -0,0 +1,49 @@
+"""
+Tests for load_dataset: the Arrow cache and the direct parse give the same frame.
+"""
+import os
+
+import pandas as pd
+
+from src.utils import data_loader
+from src.utils.data_loader import load_dataset
+
+CSV = """work_order_id,task_status,timestamp,tasks_done,cost
+WO-1,Pending,2024-01-01T08:00:00,True,1
+WO-2,Completed,2024-01-01T08:30:00,False,2.5
+WO-3,,2024-01-01T09:00:00,True,
+"""
+
+
+def write_csv(directory) -> str:
+    path = os.path.join(directory, 'orders.csv')
+    with open(path, 'w') as f:
+        f.write(CSV)
+    return path
+
+
+def test_cache_and_direct_parse_load_the_same_dtypes(tmp_path):
+    path = write_csv(tmp_path)
+    cached = load_dataset(path)
+    direct = load_dataset(path, use_cache=False)
+    assert pd.api.types.is_datetime64_any_dtype(cached['timestamp'])
+    pd.testing.assert_frame_equal(cached, direct)
+    assert load_dataset(path).equals(cached)  # Second load memory-maps the cache
+    assert not [name for name in os.listdir(tmp_path / data_loader.CACHE_DIR_NAME) if name.endswith('.tmp')]
+
+
+def test_unusable_cache_falls_back_to_parsing(tmp_path, monkeypatch, caplog):
+    path = write_csv(tmp_path)
+
+    def read_only(filepath):
+        raise PermissionError(f"Read-only file system: {filepath}")
+
+    monkeypatch.setattr(data_loader, '_ensure_cache', read_only)
+    frame = load_dataset(path)
+    assert frame is not None
+    pd.testing.assert_frame_equal(frame, load_dataset(path, use_cache=False))
+    assert any(record.levelname == 'WARNING' and 'cache' in record.getMessage() for record in caplog.records)
+
+
+def test_missing_dataset_returns_none(tmp_path):
+    assert load_dataset(str(tmp_path / 'missing.csv')) is None
@@ -0,0 +1,67 @@
+"""
+Tests for DelayIndex lookups and in-place refreshes.
+"""
+import numpy as np
+import pandas as pd
+
+from src.utils.delay_index import DelayIndex
+
+
+def make_index() -> DelayIndex:
+    # EV-1 is linked by rows 0 and 2 (row 0 is first), EV-2 by row 1 only; row 3 links nothing
+    supply_chain_data = pd.DataFrame({
+        'linked_shipyard_event': ['EV-1', 'EV-2', 'EV-1', None],
+        'delay_reason': ['Supply Delay', None, 'Customs', 'Weather'],
+    }, index=[10, 11, 12, 13])
+    return DelayIndex(supply_chain_data)
+
+
+def test_lookup_returns_the_first_row_of_duplicate_events():
+    index = make_index()
+    assert index.lookup('EV-1') == 'Supply Delay'
+    assert index.lookup('EV-2') is None
+    assert index.lookup_many(['EV-1', 'EV-2']).tolist() == ['Supply Delay', None]
+
+
+def test_lookup_of_missing_and_unknown_events_is_none():
+    index = make_index()
+    assert index.lookup(None) is None
+    assert index.lookup(float('nan')) is None
+    assert index.lookup('EV-9') is None
+    assert index.lookup_many([None, np.nan, 'EV-9']).tolist() == [None, None, None]
+
+
+def test_rows_of_lists_every_row_of_an_event():
+    positions, owners = make_index().rows_of(['EV-9', 'EV-1', None, 'EV-2'])
+    assert positions.tolist() == [0, 2, 1]
+    assert owners.tolist() == [1, 1, 3]
+
+
+def test_refresh_rows_follows_edits_of_reasons_and_keys():
+    index = make_index()
+    data = index.supply_chain_data
+    assert index.take_changes() is None  # Built from scratch: everything may have changed
+
+    data.loc[12, 'delay_reason'] = 'Strike'  # Not the first row of EV-1
+    index.refresh_rows([12])
+    assert index.lookup('EV-1') == 'Supply Delay'
+    assert index.take_changes() == {'EV-1'}
+
+    data.loc[10, 'linked_shipyard_event'] = 'EV-2'  # Row 12 becomes EV-1's first row
+    index.refresh_rows([10])
+    assert index.lookup('EV-1') == 'Strike'
+    assert index.lookup('EV-2') == 'Supply Delay'
+    assert index.take_changes() == {'EV-1', 'EV-2'}
+
+    data.loc[12, 'linked_shipyard_event'] = None  # EV-1 is no longer linked
+    index.refresh_rows([12, 99])  # Unknown labels are ignored
+    assert index.lookup('EV-1') is None
+    assert index.take_changes() == {'EV-1'}
+
+
+def test_refresh_rows_rebuilds_after_rows_are_added():
+    index = make_index()
+    index.supply_chain_data.loc[14] = ['EV-3', 'Customs']
+    index.refresh_rows([14])
+    assert index.lookup('EV-3') == 'Customs'
+    assert index.take_changes() is None
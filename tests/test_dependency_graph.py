@@ -0,0 +1,79 @@
+"""
+Tests for DependencyGraph on small hand-built prerequisite graphs.
+"""
+import pandas as pd
+import pytest
+
+from src.utils.dependency_graph import DependencyGraph
+
+
+def make_graph() -> DependencyGraph:
+    # A -> B -> C and A, B -> D; E waits for a work order that does not exist; F has no prerequisites
+    shipyard_data = pd.DataFrame({
+        'work_order_id': ['A', 'B', 'C', 'D', 'E', 'F'],
+        'task_status': ['Completed', 'Pending', 'Pending', 'Pending', 'Pending', 'Pending'],
+        'prerequisite_tasks': [None, 'A', 'B', 'A;B', 'X', None],
+    })
+    return DependencyGraph(shipyard_data)
+
+
+def test_unmet_counters_and_ready_set():
+    graph = make_graph()
+    assert graph.unmet.tolist() == [0, 0, 1, 1, 1, 0]
+    assert graph.ready_positions().tolist() == [1, 5]
+    assert graph.topological_levels().tolist() == [0, 1, 2, 2, 0, 0]
+
+
+def test_ready_set_follows_status_updates():
+    graph = make_graph()
+    graph.update_status([1], ['Completed'])
+    assert graph.unmet.tolist() == [0, 0, 0, 0, 1, 0]
+    assert graph.ready_positions().tolist() == [2, 3, 5]
+
+    graph.update_status([2, 5], ['In Progress', 'In Progress'])
+    assert graph.ready_positions().tolist() == [3]
+
+    graph.update_status([1], ['Delayed'])  # B leaves Completed, so C and D wait again
+    assert graph.unmet.tolist() == [0, 0, 1, 1, 1, 0]
+    assert graph.ready_positions().tolist() == []
+
+
+def test_sync_picks_up_statuses_written_to_the_frame():
+    graph = make_graph()
+    graph.shipyard_data.loc[1, 'task_status'] = 'Completed'
+    graph.sync()
+    assert graph.ready_positions().tolist() == [2, 3, 5]
+
+
+def test_critical_path():
+    graph = make_graph()
+    # Completed orders do not count by default, so the path starts at B
+    assert graph.critical_path() == ['B', 'C']
+    assert graph.critical_path(durations=[1, 1, 1, 5, 1, 1]) == ['B', 'D']
+    assert graph.critical_path(include_completed=True) == ['A', 'B', 'C']
+
+
+def test_acyclic_graph_has_no_cycle():
+    graph = make_graph()
+    assert not graph.has_cycle()
+    assert graph.find_cycle() == []
+
+
+def test_cycle_detection():
+    # P1 -> P2 -> P3 -> P1, and P4 waits behind the cycle
+    shipyard_data = pd.DataFrame({
+        'work_order_id': ['P1', 'P2', 'P3', 'P4', 'P5'],
+        'task_status': 'Pending',
+        'prerequisite_tasks': ['P3', 'P1', 'P2', 'P1', None],
+    })
+    graph = DependencyGraph(shipyard_data)
+    assert graph.has_cycle()
+    assert graph.topological_levels().tolist() == [-1, -1, -1, -1, 0]
+
+    cycle = graph.find_cycle()
+    assert sorted(cycle) == ['P1', 'P2', 'P3']
+    # Each order in the cycle is a prerequisite of the next one
+    prerequisites = dict(zip(shipyard_data['work_order_id'], shipyard_data['prerequisite_tasks']))
+    assert all(prerequisites[cycle[(i + 1) % 3]] == cycle[i] for i in range(3))
+    with pytest.raises(ValueError, match='cycle'):
+        graph.critical_path()
@@ -0,0 +1,66 @@
+"""
+Tests for dataset replay and the engine's per-step intake from event streams.
+"""
+import threading
+
+import pandas as pd
+
+from src.simulation import event_stream
+from src.simulation.event_stream import EventStream, replay_dataset, replay_shipyard_events, shipyard_row_to_event
+from src.simulation.simulation_engine import SimulationEngine
+
+
+def test_replay_yields_every_row_in_time_order(monkeypatch):
+    monkeypatch.setattr(event_stream, 'REPLAY_CHUNK_ROWS', 2)
+    data = pd.DataFrame({
+        'work_order_id': ['WO-1', 'WO-2', 'WO-3', 'WO-4', 'WO-5'],
+        'timestamp': ['2024-01-01 08:02', None, '2024-01-01 08:00', '2024-01-01 08:01', '2024-01-01 08:00'],
+        'cost': [1, 2, 3, 4, 5],
+    }, index=[10, 10, 11, 12, 13])  # Duplicate labels are replayed as separate rows
+    records = list(replay_dataset(data, seconds_per_time_unit=60)(threading.Event()))
+    assert [record['work_order_id'] for record in records] == ['WO-3', 'WO-5', 'WO-4', 'WO-1']
+    assert [record['time'] for record in records] == [0.0, 0.0, 1.0, 2.0]
+    assert records[0] == {'work_order_id': 'WO-3', 'timestamp': '2024-01-01 08:00', 'cost': 3, 'time': 0.0}
+
+
+def test_engine_takes_at_most_max_polled_events_per_step():
+    shipyard_data = pd.DataFrame({'work_order_id': [f"WO-{i}" for i in range(1000)], 'task_status': 'Pending'})
+    supply_chain_data = pd.DataFrame({'linked_shipyard_event': ['EV-1'], 'delay_reason': [None]})
+    engine = SimulationEngine(shipyard_data, supply_chain_data)
+    engine.max_polled_events = 250
+    stream = EventStream(replay_dataset(shipyard_data, rows_per_time_unit=1000), batch_size=50,
+                         max_batches=20).start()
+    engine.add_event_source(stream)
+    while not stream.finished:
+        stream._stop.wait(0.01)
+
+    engine.begin_step()
+    assert stream.events_delivered == 250
+    engine.begin_step()
+    assert stream.events_delivered == 500
+    engine.max_polled_events = None
+    engine.begin_step()
+    assert stream.events_delivered == 1000
+    assert stream.exhausted
+
+
+def test_shipyard_replay_matches_row_conversion(monkeypatch):
+    monkeypatch.setattr(event_stream, 'REPLAY_CHUNK_ROWS', 3)
+    data = pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=7, freq='min'),
+        'event_type': ['move', None, 'lift', 'move', None, 'place', 'lift'],
+        'equipment_status': ['Operational', 'Failure', 'Down', None, 'Fault', 'operational', 'Broken'],
+        'equipment_id': [None, None, 'E3', None, None, 'E6', None],
+        'crane_id': ['crane1', None, 'crane3', 'crane4', None, None, 'crane7'],
+        'agv_id': [None, None, None, None, 'agv5', None, None],
+        'attack_flag': ['0', 'no', 'yes', '1', None, 'true', '0'],
+        'attack_type': [None, 'Normal', 'DoS', None, 'GPS Spoofing', None, 'none'],
+        'cost': [1.0, float('nan'), 3.0, 4.0, None, 6.0, 7.0],
+    })
+    rows = [shipyard_row_to_event(record) for record in replay_dataset(data)(threading.Event())]
+    events = list(replay_shipyard_events(data)(threading.Event()))
+    assert events == rows
+    assert [event['type'] for event in events] == [
+        'move', 'shipyard_equipment_failure', 'shipyard_equipment_failure', 'security_attack',
+        'shipyard_equipment_failure', 'security_attack', 'shipyard_equipment_failure']
+    assert [event.get('equipment_id') for event in events] == [None, None, 'E3', None, 'agv5', 'E6', 'crane7']
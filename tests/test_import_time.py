@@ -0,0 +1,51 @@
+"""
+Import structure of the simulation entry points, checked in fresh interpreters.
+
+Agents and other heavy modules must only be imported when first used. These tests check which
+modules an import leaves in sys.modules rather than timing it; the import-time budgets are
+reported by `python -m benchmarks.bench_import_time`, which depends on the machine.
+"""
+import json
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.bench_import_time import LAZY_MODULES, OWN_BUDGETS_MS, ROOT, import_profile
+
+# Third-party packages the agent registry must not import
+HEAVY_PACKAGES = ['numpy', 'pandas', 'pyarrow', 'scipy', 'streamlit']
+
+
+def loaded_modules(code: str) -> set:
+    """
+    Runs code in a fresh interpreter and returns the names in its sys.modules afterwards.
+    """
+    script = f"{code}\nimport json, sys\nprint(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True, cwd=ROOT)
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+def test_import_profile_runs_python_importtime():
+    profile = import_profile('src.simulation.simulation_engine')
+    assert 'src.simulation.simulation_engine' in profile
+    assert 'pandas' in profile  # Third-party imports are reported but not budgeted
+
+
+def test_agent_registry_imports_no_agents_or_heavy_packages():
+    modules = loaded_modules("import src.agents\nsrc.agents.registered_agents()")
+    assert 'src.agents' in modules
+    assert not {name for name in modules if name.startswith('src.agents.')}
+    assert not {name.split('.')[0] for name in modules} & set(HEAVY_PACKAGES)
+
+
+@pytest.mark.parametrize('module', sorted(OWN_BUDGETS_MS))
+def test_entry_points_do_not_import_lazy_modules(module):
+    modules = loaded_modules(f"import {module}")
+    assert module in modules
+    assert not modules & set(LAZY_MODULES), f"{module} imports {sorted(modules & set(LAZY_MODULES))} eagerly"
+
+
+def test_loading_an_agent_imports_only_its_module():
+    modules = loaded_modules("from src.agents import load_agent_class\nload_agent_class('anomaly_detector')")
+    assert {name for name in modules if name.startswith('src.agents.')} == {'src.agents.anomaly_detector'}
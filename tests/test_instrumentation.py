@@ -0,0 +1,29 @@
+"""
+Tests for Instrumentation.measure memory accounting.
+"""
+import tracemalloc
+
+from src.simulation.instrumentation import Instrumentation
+
+BLOCK = 4 * 2 ** 20
+
+
+def test_nested_phase_keeps_the_outer_peak():
+    instrumentation = Instrumentation()
+
+    def inner():
+        return bytearray(BLOCK // 4)
+
+    def outer():
+        block = bytearray(BLOCK)  # Freed before the inner phase resets the tracemalloc peak
+        del block
+        instrumentation.measure('inner', inner)
+
+    tracemalloc.start()
+    try:
+        instrumentation.measure('outer', outer)
+    finally:
+        tracemalloc.stop()
+    assert instrumentation.phases['outer'].peak_bytes >= BLOCK
+    assert BLOCK // 4 <= instrumentation.phases['inner'].peak_bytes < BLOCK
+    assert instrumentation.traced_peak_bytes >= BLOCK
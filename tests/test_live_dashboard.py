@@ -0,0 +1,24 @@
+"""
+Tests for the background runner's stop conditions.
+"""
+import pandas as pd
+
+from src.simulation.live_dashboard import BackgroundRunner
+from src.simulation.simulation_engine import SimulationEngine
+
+
+def test_runner_stops_when_the_engine_stalls():
+    # Work order 2 stays In Progress (its tasks never finish), so it is active but nothing changes
+    shipyard_data = pd.DataFrame({
+        'work_order_id': [1, 2],
+        'task_status': ['Completed', 'In Progress'],
+        'linked_shipyard_event': [None, 'event1'],
+        'tasks_done': [True, False],
+    })
+    supply_chain_data = pd.DataFrame({'linked_shipyard_event': ['event1'], 'delay_reason': [None]})
+    runner = BackgroundRunner(SimulationEngine(shipyard_data, supply_chain_data)).start()
+    runner._thread.join(5)
+    assert not runner.running
+    assert runner.error is None
+    assert runner.metrics.active_work_orders()
+    assert runner.engine.step_count == 1
@@ -0,0 +1,143 @@
+"""
+Tests for ResourceAllocator leases, optimal assignment and the resource IDs recorded in the state store.
+"""
+import pandas as pd
+import pytest
+
+from src.agents.resource_allocator import ResourceAllocator
+from src.simulation.simulation_engine import SimulationEngine
+from src.utils.resource_pool import RESOURCE_COLUMNS, ResourcePool
+from src.utils.state_store import TaskStatus
+from src.utils.synthetic_data import generate_datasets, generate_events
+
+
+def make_allocator() -> ResourceAllocator:
+    shipyard_data = pd.DataFrame({
+        'work_order_id': [1, 2, 3],
+        'task_status': ['Pending', 'Pending', 'Pending'],
+    })
+    return ResourceAllocator(shipyard_data, ResourcePool.from_counts({'crane': 2, 'agv': 1, 'forklift': 0}))
+
+
+def test_finished_work_orders_release_and_clear_their_resources():
+    allocator = make_allocator()
+    allocator.allocate_resources()
+    store = allocator.store
+    assert store.resource_ids('crane_id').tolist() == ['crane1', 'crane2', None]
+    assert store.resource_ids('agv_id').tolist() == ['agv1', None, None]
+
+    store.set_status([0], TaskStatus.COMPLETED)
+    allocator.allocate_resources()
+    # Row 0's crane and AGV went back to the pool and on to the next pending rows
+    assert store.resource_ids('crane_id').tolist() == [None, 'crane2', 'crane1']
+    assert store.resource_ids('agv_id').tolist() == [None, 'agv1', None]
+    assert allocator.resource_pool.holders() == [1, 2]
+
+
+def test_shortage_is_warned_once_per_resource_type(caplog):
+    allocator = make_allocator()
+    with caplog.at_level('DEBUG', logger='src.agents.resource_allocator'):
+        allocator.allocate_resources()
+        allocator.allocate_resources()
+    warnings = [record.getMessage() for record in caplog.records if record.levelname == 'WARNING']
+    assert len(warnings) == 3
+    assert sorted(message.split(':')[0] for message in warnings) == \
+        ['Not enough agvs', 'Not enough cranes', 'Not enough forklifts']
+
+
+def make_blocked_data() -> pd.DataFrame:
+    # WO-1 waits for WO-3, which is still In Progress; WO-2 can start
+    return pd.DataFrame({
+        'work_order_id': ['WO-1', 'WO-2', 'WO-3'],
+        'task_status': ['Pending', 'Pending', 'In Progress'],
+        'prerequisite_tasks': ['WO-3', None, None],
+        'tasks_done': [False, False, False],
+    })
+
+
+def test_blocked_pending_order_does_not_take_the_last_unit():
+    allocator = ResourceAllocator(make_blocked_data(), ResourcePool.from_counts({'crane': 1, 'agv': 1, 'forklift': 1}))
+    allocator.allocate_resources()
+    store = allocator.store
+    assert store.resource_ids('crane_id').tolist() == [None, 'crane1', None]
+    assert allocator.resource_pool.holders() == [1]
+
+    # WO-2 finishes and WO-3 completes, so WO-1 is ready and gets the units back
+    store.set_status([1, 2], TaskStatus.COMPLETED)
+    allocator.allocate_resources()
+    assert store.resource_ids('crane_id').tolist() == ['crane1', None, None]
+    assert allocator.resource_pool.holders() == [0]
+
+
+@pytest.mark.parametrize('vectorized', [True, False])
+def test_work_orders_start_only_with_a_lease(vectorized):
+    pool = ResourcePool.from_counts({'crane': 1, 'agv': 1, 'forklift': 1})
+    engine = SimulationEngine(make_blocked_data(), pd.DataFrame({'linked_shipyard_event': [], 'delay_reason': []}),
+                              vectorized=vectorized, resource_pool=pool)
+    engine.run_simulation_step()
+    # The coordinator ran before the allocator, so WO-2 holds its lease but has not started yet
+    assert engine.shipyard_data['task_status'].tolist() == ['Pending', 'Pending', 'In Progress']
+    assert engine.store.resource_ids('crane_id').tolist() == [None, 'crane1', None]
+
+    engine.run_simulation_step()
+    assert engine.shipyard_data['task_status'].tolist() == ['Pending', 'In Progress', 'In Progress']
+    assert engine.store.resource_ids('crane_id').tolist() == [None, 'crane1', None]
+
+
+def test_incremental_allocation_matches_full_allocation():
+    shipyard_data, supply_chain_data = generate_datasets(400, seed=4)
+    counts = {'crane': 15, 'agv': 10, 'forklift': 5}  # Scarce, so leases move between work orders
+    ids = [resource_id for ids in ResourcePool.from_counts(counts).inventory().values() for resource_id in ids]
+    events = [event for time in range(1, 4)
+              for event in generate_events(30, shipyard_data, supply_chain_data, ids, time=time, seed=time)]
+    engines = [SimulationEngine(shipyard_data, supply_chain_data.copy(), resource_pool=ResourcePool.from_counts(counts),
+                                incremental=incremental)
+               for incremental in (True, False)]
+    for engine in engines:
+        engine.add_events([dict(event) for event in events])
+
+    incremental, full = engines
+    for step in range(8):
+        for engine in engines:
+            engine.run_simulation_step()
+        for column in RESOURCE_COLUMNS.values():
+            assert (incremental.store.resource_codes[column] == full.store.resource_codes[column]).all(), \
+                f"{column} differs after step {step + 1}"
+        assert (incremental.store.status == full.store.status).all(), f"statuses differ after step {step + 1}"
+    assert incremental.resource_pool.get_state() == full.resource_pool.get_state()
+    assert incremental.resource_pool.holders()
+
+
+def make_zoned_allocator(zones: bool) -> ResourceAllocator:
+    # Across zones, WO-1 and WO-2 would be closer to each other's crane
+    shipyard_data = pd.DataFrame({
+        'work_order_id': ['WO-1', 'WO-2', 'WO-3'],
+        'task_status': ['Pending', 'Pending', 'Pending'],
+        'location_x': [1.0, 9.0, 0.0],
+        'location_y': [0.0, 0.0, 0.0],
+        'zone': ['A', 'B', 'C'],
+    })
+    resources = pd.DataFrame({
+        'location_x': [10.0, 0.0, 0.0],
+        'location_y': [0.0, 0.0, 0.0],
+        'zone': ['A', 'B', 'A'],
+    }, index=['crane1', 'crane2', 'crane3'])
+    if not zones:
+        shipyard_data, resources = shipyard_data.drop(columns='zone'), resources.drop(columns='zone')
+    return ResourceAllocator(shipyard_data, ResourcePool.from_counts({'crane': 3, 'agv': 0, 'forklift': 0}),
+                             assignment='optimal', resources=resources)
+
+
+def test_optimal_assignment_matches_within_zones_first():
+    allocator = make_zoned_allocator(zones=True)
+    allocator.allocate_resources()
+    # Zone A: WO-1 takes the nearer crane3; zone B: WO-2 takes crane2; WO-3 (zone C) gets what is left
+    assert allocator.store.resource_ids('crane_id').tolist() == ['crane3', 'crane2', 'crane1']
+    assert allocator.resource_pool.holders() == [0, 1, 2]
+
+
+def test_optimal_assignment_minimizes_total_distance():
+    allocator = make_zoned_allocator(zones=False)
+    allocator.allocate_resources()
+    cranes = allocator.store.resource_ids('crane_id')
+    assert cranes[1] == 'crane1' and set(cranes[[0, 2]]) == {'crane2', 'crane3'}  # Total distance 2
@@ -0,0 +1,33 @@
+"""
+Tests for parallel scenario sweeps.
+"""
+from src.simulation.scenario_sweep import run_scenarios
+from src.utils.resource_pool import ResourcePool
+from src.utils.synthetic_data import generate_datasets, generate_events
+
+
+def make_scenarios(shipyard_data, supply_chain_data) -> list:
+    ids = [resource_id for ids in ResourcePool.from_counts({'crane': 5, 'agv': 5, 'forklift': 5}).inventory().values()
+           for resource_id in ids]
+    return [
+        {'name': 'baseline'},
+        {'name': 'events', 'resource_counts': {'crane': 5, 'agv': 5, 'forklift': 5},
+         'events': generate_events(50, shipyard_data, supply_chain_data, ids, time=1, seed=1)},
+        {'name': 'more_resources', 'resource_counts': {'crane': 20, 'agv': 20, 'forklift': 20}},
+        {'name': 'row_wise', 'vectorized': False, 'steps': 3},
+    ]
+
+
+def test_one_and_two_workers_give_the_same_results():
+    shipyard_data, supply_chain_data = generate_datasets(300, seed=2)
+    scenarios = make_scenarios(shipyard_data, supply_chain_data)
+    serial = run_scenarios(shipyard_data, supply_chain_data, scenarios, max_workers=1, until_complete=True,
+                           max_steps=20)
+    parallel = run_scenarios(shipyard_data, supply_chain_data, scenarios, max_workers=2, until_complete=True,
+                             max_steps=20)
+
+    assert serial.index.tolist() == ['baseline', 'events', 'more_resources', 'row_wise']
+    # Everything but the timing columns must match
+    serial = serial.drop(columns='wall_seconds')
+    assert serial.equals(parallel.drop(columns='wall_seconds'))
+    assert serial.loc['more_resources', 'completed'] >= serial.loc['baseline', 'completed']
@@ -0,0 +1,56 @@
+"""
+Tests for shard planning and the sharded multi-yard simulation against a single engine.
+"""
+import logging
+
+import numpy as np
+import pytest
+
+from benchmarks.bench_sharded_simulation import differences, make_inputs, run
+from src.simulation.sharding import ShardedSimulation, plan_shards
+from src.simulation.simulation_engine import SimulationEngine
+from src.utils.resource_pool import ResourcePool
+
+
+def make_linked_inputs() -> tuple:
+    """
+    Four yards where Yard-1 and Yard-2 work orders depend on each other's, so they share a shard.
+    """
+    shipyard_data, supply_chain_data, counts, events = make_inputs(rows=600, yards=4, bursts=3, events_per_burst=15,
+                                                                   seed=3)
+    yard = shipyard_data['yard'].to_numpy(dtype=object)
+    ids = shipyard_data['work_order_id'].to_numpy(dtype=object)
+    yard_1, yard_2 = np.flatnonzero(yard == 'Yard-1'), np.flatnonzero(yard == 'Yard-2')
+    column = shipyard_data.columns.get_loc('prerequisite_tasks')
+    # Later rows of each yard wait for early rows of the other one (no cycle: the edges only cross once)
+    shipyard_data.iloc[yard_1[-5:], column] = [f"['{ids[position]}']" for position in yard_2[:5]]
+    shipyard_data.iloc[yard_2[-3:], column] = [f"['{ids[position]}']" for position in yard_1[5:8]]
+    return shipyard_data, supply_chain_data, counts, events
+
+
+def test_plan_shards_keeps_linked_yards_together(caplog):
+    shipyard_data, *_ = make_linked_inputs()
+    yard = shipyard_data['yard'].to_numpy(dtype=object)
+    with caplog.at_level(logging.WARNING, logger='src.simulation.sharding'):
+        shard_of = plan_shards(shipyard_data, yard, max_shards=4)
+    assert 'share prerequisite tasks' in caplog.text
+    assert shard_of.max() == 2  # Three shards for four yards
+    for name in ('Yard-1', 'Yard-2', 'Yard-3', 'Yard-4'):
+        assert len(np.unique(shard_of[yard == name])) == 1, name
+    assert shard_of[yard == 'Yard-1'][0] == shard_of[yard == 'Yard-2'][0]
+    assert len(np.unique(plan_shards(shipyard_data, yard, max_shards=2))) == 2
+
+
+@pytest.mark.parametrize('processes', [False, True])
+def test_sharded_simulation_matches_single_engine(processes):
+    shipyard_data, supply_chain_data, counts, events = make_linked_inputs()
+    engine = SimulationEngine(shipyard_data, supply_chain_data.copy(), resource_pool=ResourcePool.from_counts(counts))
+    single_result, _ = run(engine, events, max_steps=60)
+
+    with ShardedSimulation(shipyard_data, supply_chain_data.copy(), partition='yard', max_shards=4,
+                           processes=processes, resource_pool=ResourcePool.from_counts(counts)) as sharded:
+        assert len(sharded.shards) == 3
+        sharded_result, _ = run(sharded, events, max_steps=60)
+        assert differences(engine, sharded, single_result, sharded_result) == []
+    assert single_result[0] > 5
+    assert engine.trace.totals[('equipment_failure', 'crane')] > 0
@@ -0,0 +1,144 @@
+"""
+Tests for the SimulationEngine event queue, event handlers and run_until stop conditions.
+"""
+import heapq
+import threading
+
+import pandas as pd
+
+from src.simulation.event_stream import EventStream
+from src.simulation.simulation_engine import SimulationEngine
+from src.utils.resource_pool import ResourcePool
+from src.utils.synthetic_data import generate_datasets, generate_events
+
+
+def make_engine() -> SimulationEngine:
+    # Work order 2 is In Progress with unfinished tasks, so nothing changes on its own
+    shipyard_data = pd.DataFrame({
+        'work_order_id': [1, 2],
+        'task_status': ['Completed', 'In Progress'],
+        'linked_shipyard_event': [None, 'event1'],
+        'tasks_done': [True, False],
+        'crane_id': [None, None],
+        'agv_id': [None, None],
+        'forklift_id': [None, None],
+    })
+    supply_chain_data = pd.DataFrame({'linked_shipyard_event': ['event1'], 'delay_reason': [None]})
+    return SimulationEngine(shipyard_data, supply_chain_data)
+
+
+def test_run_until_complete_stops_when_stalled():
+    engine = make_engine()
+    assert engine.run_until(until_complete=True, max_steps=10) == (1, 'stalled')
+
+
+def test_run_until_complete_waits_for_queued_events():
+    engine = make_engine()
+    engine.add_event({'type': 'supply_chain_delay', 'event_id': 'event1', 'time': 3})
+    assert engine.run_until(until_complete=True, max_steps=10) == (5, 'complete')
+    assert engine.shipyard_data['task_status'].tolist() == ['Completed', 'Delayed']
+
+
+def test_run_until_complete_does_not_stall_while_a_source_is_live():
+    def idle_source(stop: threading.Event):
+        while not stop.wait(0.01):
+            yield None
+
+    engine = make_engine()
+    stream = EventStream(idle_source).start()
+    engine.add_event_source(stream)
+    try:
+        assert engine.run_until(until_complete=True, max_steps=5) == (5, 'max_steps')
+    finally:
+        stream.stop()
+    assert engine.run_until(until_complete=True, max_steps=5) == (1, 'stalled')
+
+
+def test_start_simulation_stops_when_stalled():
+    engine = make_engine()
+    assert engine.start_simulation() == 'stalled'
+    assert not engine.simulation_running
+    assert engine.step_count == 1
+
+
+def test_events_at_the_same_time_are_processed_in_insertion_order():
+    engine = make_engine()
+    batches = []
+    engine.add_event_listener(batches.append)
+    engine.add_event({'type': 'inspection', 'name': 'a', 'time': 1})
+    engine.add_events([{'type': 'inspection', 'name': name, 'time': time}
+                       for name, time in [('b', 0), ('c', 1), ('d', 0)]])
+    engine.add_event({'type': 'inspection', 'name': 'e', 'time': 0})
+    engine.run_n_steps(2)
+    assert [[event['name'] for event in batch] for batch in batches] == [['b', 'd', 'e'], ['a', 'c']]
+
+
+def test_jump_to_next_event_skips_idle_steps():
+    engine = make_engine()
+    engine.time_step = 2
+    batches = []
+    engine.add_event_listener(batches.append)
+    engine.add_events([{'type': 'inspection', 'name': 'a', 'time': 5}, {'type': 'inspection', 'name': 'b', 'time': 9}])
+
+    engine.run_simulation_step(jump_to_next_event=True)  # Jumps from 0 to 6, the first step covering time 5
+    assert [[event['name'] for event in batch] for batch in batches] == [['a']]
+    assert (engine.step_count, engine.current_time) == (1, 8)
+
+    engine.run_simulation_step(jump_to_next_event=True)
+    engine.run_simulation_step(jump_to_next_event=True)  # Nothing queued: a normal step
+    assert [[event['name'] for event in batch] for batch in batches] == [['a'], ['b']]
+    assert (engine.step_count, engine.current_time) == (3, 14)
+
+
+class PerEventEngine(SimulationEngine):
+    """
+    Engine that handles due events one at a time, as before the grouped handlers.
+    """
+
+    def _process_events(self):
+        while self.event_queue and self.event_queue[0][0] <= self.current_time:
+            _, _, event = heapq.heappop(self.event_queue)
+            self.events_processed += 1
+            self._handle_event(event)
+
+
+def test_grouped_event_handlers_match_per_event_handling():
+    shipyard_data, supply_chain_data = generate_datasets(500, seed=5)
+    counts = {'crane': 10, 'agv': 10, 'forklift': 10}
+    resource_ids = [resource_id for ids in ResourcePool.from_counts(counts).inventory().values() for resource_id in ids]
+    events = []
+    for time in range(1, 4):
+        events += generate_events(100, shipyard_data, supply_chain_data, resource_ids, time=time, seed=time)
+    linked = supply_chain_data['linked_shipyard_event'].dropna().iat[0]
+    events += [
+        # The same event twice in one step (the later reason wins), a missing and an unknown event ID
+        {'type': 'supply_chain_delay', 'event_id': linked, 'reason': 'Customs', 'time': 2},
+        {'type': 'supply_chain_delay', 'event_id': linked, 'reason': 'Strike', 'time': 2},
+        {'type': 'supply_chain_delay', 'event_id': None, 'time': 2},
+        {'type': 'supply_chain_delay', 'event_id': 'EV-unknown', 'time': 2},
+        # A crane failing twice and equipment the pool does not know
+        {'type': 'shipyard_equipment_failure', 'equipment_id': 'crane1', 'time': 2},
+        {'type': 'shipyard_equipment_failure', 'equipment_id': 'crane1', 'time': 2},
+        {'type': 'shipyard_equipment_failure', 'equipment_id': 'drone1', 'time': 2},
+    ]
+
+    engines = [cls(shipyard_data, supply_chain_data.copy(), resource_pool=ResourcePool.from_counts(counts))
+               for cls in (SimulationEngine, PerEventEngine)]
+    for engine in engines:
+        engine.add_events([dict(event) for event in events])
+        engine.run_n_steps(5)
+
+    grouped, per_event = engines
+    assert grouped.events_processed == per_event.events_processed == len(events)
+    assert grouped.shipyard_data.equals(per_event.shipyard_data)
+    assert grouped.supply_chain_data.equals(per_event.supply_chain_data)
+    assert grouped.resource_pool.get_state() == per_event.resource_pool.get_state()
+    # The grouped handlers count each delayed event ID and failed unit once per step; per event,
+    # repeats within a step are counted again. Every other counter must match exactly.
+    deduplicated = ('supply_chain_delay', 'equipment_failure')
+    grouped_totals, per_event_totals = +grouped.trace.totals, +per_event.trace.totals
+    assert {key: count for key, count in grouped_totals.items() if key[0] not in deduplicated} == \
+        {key: count for key, count in per_event_totals.items() if key[0] not in deduplicated}
+    for event in deduplicated:
+        assert 0 < sum(count for key, count in grouped_totals.items() if key[0] == event) <= \
+            sum(count for key, count in per_event_totals.items() if key[0] == event)
@@ -0,0 +1,67 @@
+"""
+Tests for WorkOrderStore codes, its pandas view and change tracking.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.state_store import TaskStatus, WorkOrderStore
+
+
+def make_store() -> WorkOrderStore:
+    shipyard_data = pd.DataFrame({
+        'work_order_id': ['WO-1', 'WO-2', 'WO-3', 'WO-4'],
+        'task_status': ['Pending', 'Completed', 'On Hold', None],
+        'crane_id': [None, 'crane7', None, None],
+    })
+    return WorkOrderStore(shipyard_data, {'crane': ['crane1', 'crane2'], 'agv': ['agv1']})
+
+
+def test_codes_follow_task_status_and_known_resources():
+    store = make_store()
+    # Known states keep their TaskStatus codes; other statuses come after them, missing ones are -1
+    assert store.status.tolist() == [TaskStatus.PENDING, TaskStatus.COMPLETED, 4, -1]
+    assert store.status_code('On Hold') == 4
+    assert store.status_code('Cancelled') == -1
+    assert store.status.dtype == np.int8
+    assert store.resource_codes['crane_id'].tolist() == [-1, 2, -1, -1]
+    assert store.resource_ids('crane_id').tolist() == [None, 'crane7', None, None]
+    assert store.resource_ids('forklift_id').tolist() == [None] * 4
+
+
+def test_writes_are_shared_with_the_pandas_view():
+    store = make_store()
+    frame = store.to_pandas()
+    store.set_status([0, 3], TaskStatus.IN_PROGRESS)
+    store.assign_resources('crane_id', [0], ['crane2'])
+    assert frame['task_status'].tolist() == ['In Progress', 'Completed', 'On Hold', 'In Progress']
+    assert frame['crane_id'].iloc[0] == 'crane2'
+
+    frame.loc[frame.index[1], 'task_status'] = 'Delayed'  # In-place pandas write of a known category
+    assert store.status[1] == TaskStatus.DELAYED
+    assert store.status_labels([1, 2]).tolist() == ['Delayed', 'On Hold']
+
+    store.assign_resources('crane_id', [0, 1], None)
+    assert store.resource_ids('crane_id').tolist() == [None, None, None, None]
+    with pytest.raises(ValueError, match='Unknown crane_id'):
+        store.assign_resources('crane_id', [0], ['crane9'])
+
+
+def test_dirty_sets_round_trip():
+    store = make_store()
+    first = store.track_changes()
+    assert first.take().tolist() == [0, 1, 2, 3]  # A new consumer starts with a full pass
+    assert first.take().tolist() == []
+
+    store.set_status([0, 1], TaskStatus.COMPLETED)  # Row 1 is Completed already and is not marked
+    second = store.track_changes()
+    store.assign_resources('agv_id', [2], ['agv1'])
+    store.mark_dirty([3])
+    assert first.take().tolist() == [0, 2, 3]
+    assert second.take().tolist() == [0, 1, 2, 3]
+
+    second.add_all()
+    assert first.take().tolist() == []
+    assert second.take().tolist() == [0, 1, 2, 3]
+    assert store.clear_dirty().tolist() == [0, 2, 3]
+    assert store.dirty_positions().tolist() == []
@@ -0,0 +1,52 @@
+"""
+Tests for the changed-row diff the Streamlit app shows after running steps.
+"""
+import pandas as pd
+
+from src import digtwin_streamlit_app as app
+from src.simulation.live_dashboard import BackgroundRunner
+from src.simulation.simulation_engine import SimulationEngine
+from src.utils.resource_pool import ResourcePool
+
+
+def make_session(monkeypatch) -> tuple:
+    # WO-1 can start once it holds resources, WO-2 completes, WO-3 is done and WO-4 waits for WO-5
+    shipyard_data = pd.DataFrame({
+        'work_order_id': ['WO-1', 'WO-2', 'WO-3', 'WO-4', 'WO-5'],
+        'task_status': ['Pending', 'In Progress', 'Completed', 'Pending', 'In Progress'],
+        'prerequisite_tasks': [None, None, None, 'WO-5', None],
+        'tasks_done': [False, True, True, False, False],
+    })
+    supply_chain_data = pd.DataFrame({'linked_shipyard_event': [], 'delay_reason': []})
+    engine = SimulationEngine(shipyard_data, supply_chain_data,
+                              resource_pool=ResourcePool.from_counts({'crane': 1, 'agv': 1, 'forklift': 1}))
+    session_state = {'runner': BackgroundRunner(engine)}
+    monkeypatch.setattr(app.st, 'session_state', session_state)
+    return engine, session_state
+
+
+def test_run_steps_keeps_only_changed_rows(monkeypatch):
+    engine, session_state = make_session(monkeypatch)
+    app.run_steps(engine, 2)
+
+    steps, changes = session_state['last_changes']
+    assert steps == 2
+    assert changes['work_order_id'].tolist() == ['WO-1', 'WO-2']
+    assert changes['previous_task_status'].astype(str).tolist() == ['Pending', 'In Progress']
+    assert changes['task_status'].astype(str).tolist() == ['In Progress', 'Completed']
+    assert changes['crane_id'].iloc[0] == 'crane1' and pd.isna(changes['crane_id'].iloc[1])
+
+
+def test_run_steps_reports_resource_only_changes(monkeypatch):
+    engine, session_state = make_session(monkeypatch)
+    app.run_steps(engine, 1)
+    _, changes = session_state['last_changes']
+    # WO-1 only received its resources in this step; it starts in the next one
+    assert changes['work_order_id'].tolist() == ['WO-1', 'WO-2']
+    assert changes['task_status'].astype(str).tolist() == ['Pending', 'Completed']
+    assert changes['agv_id'].iloc[0] == 'agv1' and pd.isna(changes['agv_id'].iloc[1])
+
+    app.run_steps(engine, 1)
+    _, changes = session_state['last_changes']
+    assert changes['work_order_id'].tolist() == ['WO-1']
+    assert changes['previous_task_status'].astype(str).tolist() == ['Pending']
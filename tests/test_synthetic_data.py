@@ -0,0 +1,44 @@
+"""
+Tests for the seeded synthetic dataset and event generators.
+"""
+import numpy as np
+import pandas as pd
+
+from src.utils.dependency_graph import DependencyGraph
+from src.utils.synthetic_data import generate_datasets, generate_events, write_datasets
+
+
+def test_same_seed_gives_the_same_data():
+    first = generate_datasets(500, yards=3, seed=7)
+    second = generate_datasets(500, yards=3, seed=7)
+    other = generate_datasets(500, yards=3, seed=8)
+    for frame, again, different in zip(first, second, other):
+        pd.testing.assert_frame_equal(frame, again)
+        assert not frame.equals(different)
+
+    shipyard_data, supply_chain_data = first
+    events = generate_events(200, shipyard_data, supply_chain_data, ['crane1', 'agv1'], time=3, seed=1)
+    assert events == generate_events(200, shipyard_data, supply_chain_data, ['crane1', 'agv1'], time=3, seed=1)
+    assert events != generate_events(200, shipyard_data, supply_chain_data, ['crane1', 'agv1'], time=3, seed=2)
+    assert {event['type'] for event in events} == {'supply_chain_delay', 'shipyard_equipment_failure',
+                                                   'security_attack'}
+
+
+def test_written_csv_files_hold_the_generated_data(tmp_path):
+    shipyard_path, supply_chain_path = write_datasets(str(tmp_path), 200, seed=3)
+    shipyard_data, supply_chain_data = generate_datasets(200, seed=3)
+    pd.testing.assert_frame_equal(pd.read_csv(shipyard_path)[['work_order_id', 'prerequisite_tasks']],
+                                  shipyard_data[['work_order_id', 'prerequisite_tasks']])
+    assert pd.read_csv(supply_chain_path)['linked_shipyard_event'].tolist() == \
+        supply_chain_data['linked_shipyard_event'].tolist()
+
+
+def test_prerequisites_form_a_dag_within_each_yard():
+    shipyard_data, _ = generate_datasets(2000, dag_depth=4, yards=3, seed=5)
+    graph = DependencyGraph(shipyard_data)
+    levels = graph.topological_levels()
+    assert levels.min() == 0 and levels.max() <= 3  # No cycles, and at most dag_depth levels
+    src, dst = graph.out_edges(np.arange(len(shipyard_data)))
+    assert len(src)
+    yard = shipyard_data['yard'].to_numpy(dtype=object)
+    assert (yard[src] == yard[dst]).all()
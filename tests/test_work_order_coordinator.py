@@ -0,0 +1,118 @@
+"""
+Regression tests: the vectorized WorkOrderCoordinator passes match the row-wise pass, and
+incremental passes match full ones.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.agents.work_order_coordinator import WorkOrderCoordinator
+from src.simulation.simulation_engine import SimulationEngine
+
+ROWS = 2000
+PASSES = 4
+STATUSES = np.array(['Pending', 'In Progress', 'Completed', 'Delayed'], dtype=object)
+
+
+def make_datasets(seed: int) -> tuple:
+    """
+    Builds random work orders (prerequisites, linked events, flags) and supply chain delays.
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.array([f"WO-{i:05d}" for i in range(ROWS)], dtype=object)
+    prerequisites = [';'.join(rng.choice(ids, rng.integers(0, 3), replace=False)) or None for _ in range(ROWS)]
+    events = np.array([f"EV-{i}" for i in range(ROWS // 10)], dtype=object)
+    shipyard_data = pd.DataFrame({
+        'work_order_id': ids,
+        'task_status': STATUSES[rng.choice(4, ROWS, p=[0.6, 0.25, 0.1, 0.05])],
+        'prerequisite_tasks': prerequisites,
+        'linked_shipyard_event': np.where(rng.random(ROWS) < 0.3, events[rng.integers(0, len(events), ROWS)], None),
+        'tasks_done': rng.random(ROWS) < 0.5,
+        'pending_issues': rng.random(ROWS) < 0.1,
+        'required_resources': np.where(rng.random(ROWS) < 0.5, 'crane:1,agv:1', 'forklift'),
+    })
+    supply_chain_data = pd.DataFrame({
+        'linked_shipyard_event': events,
+        'delay_reason': np.where(rng.random(len(events)) < 0.2, 'Supply Delay', None),
+    })
+    return shipyard_data, supply_chain_data
+
+
+def make_coordinators(seed: int) -> dict:
+    """
+    Returns coordinators over independent copies of the same data, keyed by mode.
+    """
+    shipyard_data, supply_chain_data = make_datasets(seed)
+    return {
+        'row-wise': WorkOrderCoordinator(shipyard_data.copy(), supply_chain_data.copy()),
+        'vectorized': WorkOrderCoordinator(shipyard_data.copy(), supply_chain_data.copy(), vectorized=True),
+        'full pass': WorkOrderCoordinator(shipyard_data.copy(), supply_chain_data.copy(), vectorized=True,
+                                          incremental=False),
+    }
+
+
+def edit_between_passes(woc: WorkOrderCoordinator, rng: np.random.Generator):
+    """
+    Finishes some tasks and changes some delay reasons, the way a simulation step would.
+    """
+    data = woc.shipyard_data
+    positions = np.flatnonzero(rng.random(len(data)) < 0.05)
+    data.iloc[positions, data.columns.get_loc('tasks_done')] = True
+    woc.store.mark_dirty(positions)
+
+    supply_chain = woc.supply_chain_data
+    rows = supply_chain.index[rng.random(len(supply_chain)) < 0.05]
+    supply_chain.loc[rows, 'delay_reason'] = np.where(rng.random(len(rows)) < 0.5, 'Supply Delay', None)
+    woc.delay_index.refresh_rows(rows)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_vectorized_matches_row_wise(seed):
+    coordinators = make_coordinators(seed)
+    for step in range(PASSES):
+        for name, woc in coordinators.items():
+            woc.process_work_orders()
+            edit_between_passes(woc, np.random.default_rng([seed, step]))  # Same edits in every mode
+
+        expected = coordinators['row-wise'].shipyard_data['task_status']
+        for name, woc in coordinators.items():
+            assert woc.shipyard_data['task_status'].equals(expected), f"{name} differs after pass {step + 1}"
+
+
+def test_vectorized_matches_row_wise_with_resource_levels():
+    coordinators = make_coordinators(seed=3)
+    for woc in coordinators.values():
+        woc.available_resources = {'crane': 1, 'agv': 0, 'forklift': 1}
+        woc.process_work_orders()
+
+    expected = coordinators['row-wise'].shipyard_data['task_status']
+    assert expected.value_counts()['In Progress'] > 0
+    for name, woc in coordinators.items():
+        assert woc.shipyard_data['task_status'].equals(expected), name
+
+
+def test_incremental_pass_wakes_rows_that_were_not_written():
+    # WO-1 waits for WO-2, which completes in the first pass; WO-3 is linked to EV-1
+    shipyard_data = pd.DataFrame({
+        'work_order_id': ['WO-1', 'WO-2', 'WO-3'],
+        'task_status': ['Pending', 'In Progress', 'In Progress'],
+        'prerequisite_tasks': ['WO-2', None, None],
+        'linked_shipyard_event': [None, None, 'EV-1'],
+        'tasks_done': [False, True, False],
+    })
+    supply_chain_data = pd.DataFrame({'linked_shipyard_event': ['EV-1'], 'delay_reason': [None]})
+    engines = {incremental: SimulationEngine(shipyard_data, supply_chain_data.copy(),
+                                             agents=['work_order_coordinator'], incremental=incremental)
+               for incremental in (True, False)}
+    for engine in engines.values():
+        engine.add_event({'type': 'supply_chain_delay', 'event_id': 'EV-1', 'reason': 'Customs', 'time': 1})
+
+    changes = engines[True].agents['work_order_coordinator']._changes
+    expected = [(None, ['Pending', 'Completed', 'In Progress']),
+                (0, ['In Progress', 'Completed', 'In Progress']),  # WO-1 is woken through the ready set
+                (2, ['In Progress', 'Completed', 'Delayed'])]  # WO-3 is woken through the changed delay reason
+    for woken, statuses in expected:
+        assert woken is None or not changes.mask[woken]  # The row was not written since the last pass
+        for engine in engines.values():
+            engine.run_simulation_step()
+            assert engine.shipyard_data['task_status'].tolist() == statuses